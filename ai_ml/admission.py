@@ -0,0 +1,205 @@
+"""Admission control for the API server.
+
+Without it, every request that arrives is started at once. Under a burst, all of them
+slow down together until providers throttle and everything times out. The
+:class:`AdmissionController` gives each endpoint class a lane instead:
+
+* a lane runs at most ``max_concurrency`` requests. Further requests wait in a FIFO queue
+  of at most ``max_queue`` entries, for at most ``queue_timeout`` seconds;
+* a request that finds the queue full, or times out in it, is rejected at once with
+  :class:`AdmissionRejected`, which the server turns into ``429`` with ``Retry-After``;
+* the ``interactive`` lane (QA, chat) and the ``batch`` lane (full analyses) have separate
+  slots and queues, so a burst of deep analyses cannot delay quick questions.
+
+The time each admitted request waited, rejections, and active and queued requests are
+exported per lane. Lanes live in one event loop, so limits apply per server process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from ai_ml.core.metrics import get_metrics_registry
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+_QUEUE_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_admission_queue_seconds",
+    "Time admitted requests waited for a slot, by lane.",
+    ("lane",),
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+_REJECTED = get_metrics_registry().counter(
+    "docuthinker_admission_rejected_total",
+    "Requests rejected with 429, by lane and reason (queue_full, timeout).",
+    ("lane", "reason"),
+)
+_ACTIVE = get_metrics_registry().gauge(
+    "docuthinker_admission_active",
+    "Requests currently holding a slot, by lane.",
+    ("lane",),
+)
+_QUEUED = get_metrics_registry().gauge(
+    "docuthinker_admission_queued",
+    "Requests currently waiting for a slot, by lane.",
+    ("lane",),
+)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised instead of queueing a request on a saturated lane."""
+
+    def __init__(self, lane: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"The {lane} lane is saturated ({reason}); retry in {retry_after:.0f}s.")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class LanePolicy:
+    max_concurrency: int
+    max_queue: int
+    queue_timeout: float
+
+
+class Lane:
+    """Bounded concurrency with a bounded FIFO queue for one endpoint class."""
+
+    def __init__(self, name: str, policy: LanePolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self._active = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        # Moving average of how long a request holds its slot, for Retry-After estimates.
+        self._service_seconds = 1.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after(self) -> float:
+        """Seconds until a slot is likely to free up for a new request."""
+
+        slots = max(1, self.policy.max_concurrency)
+        return max(1.0, math.ceil((self.queued + 1) * self._service_seconds / slots))
+
+    async def acquire(self) -> None:
+        if self._active < self.policy.max_concurrency and not self.queued:
+            self._active += 1
+            _ACTIVE.set(self._active, lane=self.name)
+            _QUEUE_SECONDS.observe(0.0, lane=self.name)
+            return
+        if self.queued >= self.policy.max_queue:
+            self._reject("queue_full")
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        _QUEUED.set(self.queued, lane=self.name)
+        started = time.monotonic()
+        try:
+            await asyncio.wait({waiter}, timeout=self.policy.queue_timeout)
+        except BaseException:
+            # The client went away; give back a slot handed over meanwhile.
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            self._reject("timeout")
+        _QUEUE_SECONDS.observe(time.monotonic() - started, lane=self.name)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        if held_seconds is not None:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes straight to the next waiter; _active is unchanged.
+                waiter.set_result(None)
+                _QUEUED.set(self.queued, lane=self.name)
+                return
+        self._active -= 1
+        _ACTIVE.set(self._active, lane=self.name)
+        _QUEUED.set(0, lane=self.name)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": self.queued,
+            "max_concurrency": self.policy.max_concurrency,
+            "max_queue": self.policy.max_queue,
+            "retry_after": self.retry_after(),
+        }
+
+    def _abandon(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+        else:
+            waiter.cancel()
+        _QUEUED.set(self.queued, lane=self.name)
+
+    def _reject(self, reason: str) -> None:
+        _REJECTED.inc(lane=self.name, reason=reason)
+        raise AdmissionRejected(self.name, reason, self.retry_after())
+
+
+class AdmissionController:
+    """Lanes by endpoint class; a disabled controller admits everything."""
+
+    def __init__(self, lanes: Optional[Dict[str, LanePolicy]] = None) -> None:
+        self.lanes = {name: Lane(name, policy) for name, policy in (lanes or {}).items()}
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "AdmissionController":
+        if not settings.admission_control:
+            return cls()
+        return cls(
+            {
+                INTERACTIVE: LanePolicy(
+                    max_concurrency=settings.admission_interactive_concurrency,
+                    max_queue=settings.admission_interactive_queue,
+                    queue_timeout=settings.admission_interactive_timeout,
+                ),
+                BATCH: LanePolicy(
+                    max_concurrency=settings.admission_batch_concurrency,
+                    max_queue=settings.admission_batch_queue,
+                    queue_timeout=settings.admission_batch_timeout,
+                ),
+            }
+        )
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> AsyncIterator[None]:
+        """Hold a slot of ``lane`` for the duration of the block, or raise :class:`AdmissionRejected`."""
+
+        target = self.lanes.get(lane)
+        if target is None:
+            yield
+            return
+        async with target.slot():
+            yield
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: lane.snapshot() for name, lane in self.lanes.items()}
+
+
+__all__ = ["AdmissionController", "AdmissionRejected", "BATCH", "INTERACTIVE", "Lane", "LanePolicy"]
@@ -1,5 +1,5 @@
 """CrewAI agent factories used by the agentic RAG pipeline."""
 
-from .crew_agents import build_document_crew
+from .crew_agents import CREW_PROCESSES, CrewRun, DocumentCrewTemplate, build_document_crew
 
-__all__ = ["build_document_crew"]
+__all__ = ["build_document_crew", "DocumentCrewTemplate", "CrewRun", "CREW_PROCESSES"]
@@ -2,13 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
 from crewai import Agent, Crew, Process, Task
 
 from ai_ml.providers.registry import LLMConfig, LLMProviderRegistry
 from ai_ml.tools import DocumentSearchTool, InsightsExtractionTool
 
+CREW_PROCESSES = ("sequential", "parallel")
+
+DRAFT_TASK = "Draft Summary"
+REVIEW_TASK = "Evidence Review"
+INSIGHTS_TASK = "Executive Insights"
+
 
 def build_document_crew(
     registry: LLMProviderRegistry,
@@ -16,14 +27,252 @@ def build_document_crew(
     retriever_tool: DocumentSearchTool,
     insights_tool: InsightsExtractionTool,
     additional_context: Dict[str, str] | None = None,
+    llm_configs: Mapping[str, LLMConfig] | None = None,
 ) -> Crew:
-    """Construct a collaborative CrewAI setup across multiple model providers."""
+    """Construct a collaborative CrewAI setup across multiple model providers.
+
+    ``llm_configs`` maps the ``analyst``, ``researcher`` and ``reviewer`` roles to explicit
+    configs (e.g. from settings); otherwise the model names in ``additional_context`` apply.
+    """
+
+    agents = _build_agents(
+        registry,
+        llm_configs=llm_configs,
+        additional_context=additional_context,
+        search_tool=retriever_tool.to_langchain_tool,
+        topics_tool=insights_tool.to_langchain_tool,
+    )
+    tasks = [
+        Task(name=name, description=description, agent=agents[role], expected_output=expected)
+        for name, (role, description, expected) in _TASK_SPECS.items()
+    ]
+    crew = Crew(agents=list(agents.values()), tasks=tasks, process=Process.sequential, verbose=False)
+    return crew
+
+
+# ------------------------------------------------------------------
+# Reusable crew template
+
+
+@dataclass
+class _CrewBinding:
+    """Per-run tools the template's shared tool wrappers dispatch to."""
+
+    retriever_tool: DocumentSearchTool
+    insights_tool: InsightsExtractionTool
+
+
+_BINDING: contextvars.ContextVar[Optional[_CrewBinding]] = contextvars.ContextVar("docuthinker_crew_binding", default=None)
+
+
+def _bound() -> _CrewBinding:
+    binding = _BINDING.get()
+    if binding is None:
+        raise RuntimeError("Crew tools were invoked outside DocumentCrewTemplate.run().")
+    return binding
+
+
+@dataclass
+class CrewRun:
+    """Merged outcome of one templated crew run."""
+
+    process: str
+    tasks: Dict[str, str]
+    timings: Dict[str, float]
+    token_usage: Dict[str, int] = field(default_factory=dict)
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "raw": "\n\n".join(f"## {name}\n{output}" for name, output in self.tasks.items()),
+            "tasks": dict(self.tasks),
+            "timings": dict(self.timings),
+            "process": self.process,
+        }
+
+
+@dataclass
+class _CrewParts:
+    crews: Dict[str, Crew]
+    usage_seen: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+class DocumentCrewTemplate:
+    """Build the document crew once per worker thread and rebind it to each document's tools.
+
+    Agents, LLM clients, tool wrappers and tasks are created on a thread's first run and
+    reused afterwards; the tool wrappers look up the current document's tools through a
+    context variable set by :meth:`run`. Each task runs as its own single-task crew with
+    the earlier outputs passed as inputs, so with ``process="parallel"`` the Evidence
+    Review and Executive Insights tasks both start from the draft and run concurrently
+    (the insights then no longer see the review), trading that hand-off for latency.
+    """
+
+    def __init__(
+        self,
+        registry: LLMProviderRegistry,
+        *,
+        llm_configs: Mapping[str, LLMConfig] | None = None,
+        additional_context: Dict[str, str] | None = None,
+        process: str = "sequential",
+        max_workers: int = 4,
+    ) -> None:
+        if process not in CREW_PROCESSES:
+            raise ValueError(f"Unsupported crew process '{process}'; expected one of {CREW_PROCESSES}.")
+        self.registry = registry
+        self.llm_configs = dict(llm_configs or {})
+        self.additional_context = dict(additional_context or {})
+        self.process = process
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def run(
+        self,
+        inputs: Dict[str, Any],
+        *,
+        retriever_tool: DocumentSearchTool,
+        insights_tool: InsightsExtractionTool,
+    ) -> CrewRun:
+        parts = self._parts()
+        token = _BINDING.set(_CrewBinding(retriever_tool=retriever_tool, insights_tool=insights_tool))
+        try:
+            outputs: Dict[str, Tuple[str, float, Dict[str, int]]] = {}
+            outputs[DRAFT_TASK] = self._run_task(parts, DRAFT_TASK, inputs)
+            draft = outputs[DRAFT_TASK][0]
+            if self.process == "parallel":
+                executor = self._get_executor()
+                # Each submission needs its own context copy: a Context cannot be entered by two threads.
+                futures = {
+                    name: executor.submit(
+                        contextvars.copy_context().run,
+                        self._run_task,
+                        parts,
+                        name,
+                        {**inputs, "draft_summary": draft, "prior_findings": draft},
+                    )
+                    for name in (REVIEW_TASK, INSIGHTS_TASK)
+                }
+                outputs.update({name: future.result() for name, future in futures.items()})
+            else:
+                outputs[REVIEW_TASK] = self._run_task(parts, REVIEW_TASK, {**inputs, "draft_summary": draft})
+                findings = f"{draft}\n\n{outputs[REVIEW_TASK][0]}"
+                outputs[INSIGHTS_TASK] = self._run_task(parts, INSIGHTS_TASK, {**inputs, "prior_findings": findings})
+        finally:
+            _BINDING.reset(token)
+
+        usage: Dict[str, int] = {}
+        for _, _, task_usage in outputs.values():
+            for key, value in task_usage.items():
+                usage[key] = usage.get(key, 0) + value
+        return CrewRun(
+            process=self.process,
+            tasks={name: text for name, (text, _, _) in outputs.items()},
+            timings={_TASK_SPECS[name][0]: seconds for name, (_, seconds, _) in outputs.items()},
+            token_usage=usage,
+        )
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
+    def _run_task(self, parts: _CrewParts, name: str, inputs: Dict[str, Any]) -> Tuple[str, float, Dict[str, int]]:
+        started = time.perf_counter()
+        result = parts.crews[name].kickoff(inputs=inputs)
+        elapsed = round(time.perf_counter() - started, 4)
+        return _output_text(result), elapsed, _usage_delta(parts, name, result)
+
+    def _parts(self) -> _CrewParts:
+        parts = getattr(self._local, "parts", None)
+        if parts is None:
+            parts = self._local.parts = self._build_parts()
+        return parts
+
+    def _build_parts(self) -> _CrewParts:
+        search_tool = _shared_tool(DocumentSearchTool, lambda query: _bound().retriever_tool(query))
+        topics_tool = _shared_tool(InsightsExtractionTool, lambda query=None: _bound().insights_tool(query))
+        agents = _build_agents(
+            self.registry,
+            llm_configs=self.llm_configs,
+            additional_context=self.additional_context,
+            search_tool=lambda: search_tool,
+            topics_tool=lambda: topics_tool,
+        )
+        crews: Dict[str, Crew] = {}
+        for name, (role, description, expected) in _TASK_SPECS.items():
+            task = Task(
+                name=name,
+                description=description + _TASK_HANDOFF.get(name, ""),
+                agent=agents[role],
+                expected_output=expected,
+            )
+            crews[name] = Crew(agents=[agents[role]], tasks=[task], process=Process.sequential, verbose=False)
+        return _CrewParts(crews=crews)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="docuthinker-crew")
+        return self._executor
+
+
+# ------------------------------------------------------------------
+# Agent and task definitions
+
+_TASK_SPECS: Dict[str, Tuple[str, str, str]] = {
+    DRAFT_TASK: (
+        "analyst",
+        "Produce a structured summary (overview, key sections, metrics) using the document. "
+        "Leverage semantic search when unsure about specific details.",
+        "A markdown summary with headings and bullet points grounded in citations.",
+    ),
+    REVIEW_TASK: (
+        "researcher",
+        "Review the analyst summary. Validate each major statement, adding supporting quotes "
+        "or pointing out gaps. Highlight any inconsistencies or missing angles.",
+        "A list of verified statements with citations and flagged uncertainties.",
+    ),
+    INSIGHTS_TASK: (
+        "reviewer",
+        "Translate the validated findings into actionable insights and recommended next steps. "
+        "Summarize risks, opportunities, and open questions for stakeholders.",
+        "Executive-ready bullet list of actions, risks, and follow-ups.",
+    ),
+}
+
+# Single-task crews do not share task context, so earlier outputs are interpolated from inputs.
+_TASK_HANDOFF: Dict[str, str] = {
+    REVIEW_TASK: "\n\nAnalyst summary:\n{draft_summary}",
+    INSIGHTS_TASK: "\n\nFindings so far:\n{prior_findings}",
+}
+
+
+def _build_agents(
+    registry: LLMProviderRegistry,
+    *,
+    llm_configs: Mapping[str, LLMConfig] | None,
+    additional_context: Dict[str, str] | None,
+    search_tool: Callable[[], Any],
+    topics_tool: Callable[[], Any],
+) -> Dict[str, Agent]:
     context = additional_context or {}
+    configs = dict(llm_configs or {})
 
-    analyst_llm = registry.chat(LLMConfig(provider="openai", model=context.get("openai_model", "gpt-4o-mini"), temperature=0.15))
-    researcher_llm = registry.chat(LLMConfig(provider="google", model=context.get("gemini_model", "gemini-1.5-pro"), temperature=0.2))
-    reviewer_llm = registry.chat(LLMConfig(provider="anthropic", model=context.get("claude_model", "claude-3-5-sonnet-20241022"), temperature=0.15))
+    analyst_llm = registry.chat(
+        configs.get("analyst")
+        or LLMConfig(provider="openai", model=context.get("openai_model", "gpt-4o-mini"), temperature=0.15)
+    )
+    researcher_llm = registry.chat(
+        configs.get("researcher")
+        or LLMConfig(provider="google", model=context.get("gemini_model", "gemini-1.5-pro"), temperature=0.2)
+    )
+    reviewer_llm = registry.chat(
+        configs.get("reviewer")
+        or LLMConfig(provider="anthropic", model=context.get("claude_model", "claude-3-5-sonnet-20241022"), temperature=0.15)
+    )
 
     analyst = Agent(
         name="Document Analyst",
@@ -34,7 +283,7 @@ def build_document_crew(
             "You produce balanced and structured summaries that stay grounded in evidence."
         ),
         llm=analyst_llm,
-        tools=[retriever_tool.to_langchain_tool(), insights_tool.to_langchain_tool()],
+        tools=[search_tool(), topics_tool()],
         verbose=False,
     )
 
@@ -47,7 +296,7 @@ def build_document_crew(
             "verbatim and pointing the analyst to missing perspectives or open questions."
         ),
         llm=researcher_llm,
-        tools=[retriever_tool.to_langchain_tool()],
+        tools=[search_tool()],
         verbose=False,
     )
 
@@ -60,39 +309,42 @@ def build_document_crew(
             "You also capture unresolved follow-up questions for product teams."
         ),
         llm=reviewer_llm,
-        tools=[retriever_tool.to_langchain_tool(), insights_tool.to_langchain_tool()],
+        tools=[search_tool(), topics_tool()],
         verbose=False,
     )
 
-    tasks: List[Task] = [
-        Task(
-            name="Draft Summary",
-            description=(
-                "Produce a structured summary (overview, key sections, metrics) using the document. "
-                "Leverage semantic search when unsure about specific details."
-            ),
-            agent=analyst,
-            expected_output="A markdown summary with headings and bullet points grounded in citations.",
-        ),
-        Task(
-            name="Evidence Review",
-            description=(
-                "Review the analyst summary. Validate each major statement, adding supporting quotes "
-                "or pointing out gaps. Highlight any inconsistencies or missing angles."
-            ),
-            agent=researcher,
-            expected_output="A list of verified statements with citations and flagged uncertainties.",
-        ),
-        Task(
-            name="Executive Insights",
-            description=(
-                "Translate the validated findings into actionable insights and recommended next steps. "
-                "Summarize risks, opportunities, and open questions for stakeholders."
-            ),
-            agent=reviewer,
-            expected_output="Executive-ready bullet list of actions, risks, and follow-ups.",
-        ),
-    ]
+    return {"analyst": analyst, "researcher": researcher, "reviewer": reviewer}
 
-    crew = Crew(agents=[analyst, researcher, reviewer], tasks=tasks, process=Process.sequential, verbose=False)
-    return crew
+
+def _shared_tool(tool_cls: type, func: Callable[..., str]) -> Any:
+    from langchain.tools import Tool
+
+    return Tool(name=tool_cls.name, description=tool_cls.description, func=func)
+
+
+def _output_text(result: Any) -> str:
+    # CrewAI >= 0.30 returns CrewOutput (``raw``); older releases return a plain string.
+    for attr in ("raw", "raw_output"):
+        value = getattr(result, attr, None)
+        if isinstance(value, str):
+            return value
+    return str(result)
+
+
+def _usage_delta(parts: _CrewParts, name: str, result: Any) -> Dict[str, int]:
+    """Token usage of this kickoff; reused agents report cumulative totals on some CrewAI versions."""
+
+    usage = getattr(result, "token_usage", None)
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "model_dump", lambda: vars(usage))()
+    current = {key: int(usage.get(key) or 0) for key in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens")}
+    previous = parts.usage_seen.get(name, {})
+    parts.usage_seen[name] = current
+    if any(current[key] < previous.get(key, 0) for key in current):
+        return current
+    return {key: current[key] - previous.get(key, 0) for key in current}
+
+
+__all__ = ["build_document_crew", "DocumentCrewTemplate", "CrewRun", "CREW_PROCESSES"]
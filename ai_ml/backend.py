@@ -2,9 +2,17 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from ai_ml.services import get_document_service
+from ai_ml.services.jobs import get_job_queue
 
 logger = logging.getLogger(__name__)
-SERVICE = get_document_service()
+
+
+def __getattr__(name: str) -> Any:
+    # ``SERVICE`` used to be built at import time; resolve it on first access instead so
+    # importing the backend (or anything that imports it) does not pay for service setup.
+    if name == "SERVICE":
+        return get_document_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def analyze_document(
@@ -12,65 +20,112 @@ def analyze_document(
     question: Optional[str] = None,
     translate_lang: str = "fr",
     metadata: Optional[Dict[str, Any]] = None,
+    mode: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Analyze a document using the shared DocumentIntelligenceService."""
 
-    logger.debug("Backend analyze_document invoked (question=%s, translate=%s)", question, translate_lang)
-    return SERVICE.analyze_document(
+    logger.debug("Backend analyze_document invoked (question=%s, translate=%s, mode=%s)", question, translate_lang, mode)
+    return get_document_service().analyze_document(
         document,
         question=question,
         translate_lang=translate_lang,
         metadata=metadata,
+        mode=mode,
     )
 
 
 def summarize(document: str) -> str:
-    return SERVICE.summarize(document)
+    return get_document_service().summarize(document)
 
 
 def extract_topics(document: str) -> list[str]:
-    return SERVICE.extract_topics(document)
+    return get_document_service().extract_topics(document)
 
 
 def discussion_points(document: str) -> str:
-    return SERVICE.discussion_points(document)
+    return get_document_service().discussion_points(document)
 
 
 def translate(document: str, target_lang: str) -> Optional[str]:
-    return SERVICE.translate(document, target_lang)
+    return get_document_service().translate(document, target_lang)
 
 
 def sentiment(document: str) -> Dict[str, Any]:
-    return SERVICE.sentiment(document)
+    return get_document_service().sentiment(document)
 
 
 def recommendations(document: str) -> str:
-    return SERVICE.recommendations(document)
+    return get_document_service().recommendations(document)
 
 
 def refined_summary(document: str, draft_summary: str) -> str:
-    return SERVICE.refine_summary(draft_summary, document)
+    return get_document_service().refine_summary(draft_summary, document)
 
 
 def rewritten(document: str, tone: str = "professional") -> str:
-    return SERVICE.rewrite(document, tone=tone)
+    return get_document_service().rewrite(document, tone=tone)
+
+
+def combined_analysis(document: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Summary, bullets, topics, sentiment and recommendations from one structured LLM call."""
+
+    return get_document_service().combined_analysis(document, fields=fields)
+
+
+def ask(document: str, question: str) -> Dict[str, Any]:
+    """Retrieval-only answer with citations; much cheaper than a full ``analyze_document``."""
+
+    return get_document_service().ask(document, question)
+
+
+def chat(message: str, session_id: Optional[str] = None, document: Optional[str] = None) -> Dict[str, Any]:
+    """One chat turn; reuse the returned ``session_id`` to continue the conversation.
+
+    ``document`` binds the session to a document, so turns are answered from its excerpts.
+    """
+
+    return get_document_service().chat(message, session_id=session_id, document=document)
+
+
+def reset_chat(session_id: str) -> bool:
+    """Forget a chat session; returns whether it existed."""
+
+    return get_document_service().chat_sessions.reset(session_id)
+
+
+def submit_job(job_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue ``job_type`` (analyze, combined or qa) to run in the background; returns the job."""
+
+    return get_job_queue().submit(job_type, params).to_dict()
+
+
+def get_job(job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+    job = get_job_queue().get(job_id)
+    return job.to_dict(include_result=include_result) if job is not None else None
+
+
+def cancel_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Cancel a queued job, or discard a running job's result; None if the job is unknown."""
+
+    job = get_job_queue().cancel(job_id)
+    return job.to_dict() if job is not None else None
 
 
 def generate_bullet_summary(document: str) -> str:
-    return SERVICE.bullet_summary(document)
+    return get_document_service().bullet_summary(document)
 
 
 def sync_to_knowledge_graph(document: str, metadata: Dict[str, Any], agentic_payload: Dict[str, Any]) -> Dict[str, Any]:
-    return SERVICE.sync_to_knowledge_graph(document=document, agentic_payload=agentic_payload, metadata=metadata)
+    return get_document_service().sync_to_knowledge_graph(document=document, agentic_payload=agentic_payload, metadata=metadata)
 
 
 def run_graph_query(query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    return SERVICE.run_graph_query(query, params)
+    return get_document_service().run_graph_query(query, params)
 
 
 def upsert_vector_document(document: str, metadata: Optional[Dict[str, Any]] = None, doc_id: Optional[str] = None) -> Dict[str, Any]:
-    return SERVICE.upsert_vector_document(document=document, metadata=metadata, doc_id=doc_id)
+    return get_document_service().upsert_vector_document(document=document, metadata=metadata, doc_id=doc_id)
 
 
 def query_vector_index(query: str, n_results: Optional[int] = None) -> List[Dict[str, Any]]:
-    return SERVICE.query_vector_index(query, n_results=n_results)
+    return get_document_service().query_vector_index(query, n_results=n_results)
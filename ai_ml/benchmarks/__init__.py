@@ -0,0 +1 @@
+"""Offline benchmarks for DocuThinker's AI/ML runtime."""
@@ -0,0 +1,202 @@
+"""Recall/latency benchmark of the FAISS index types against the exact flat baseline.
+
+Builds every index type from :mod:`ai_ml.vectorstores.faiss_index` over the same vectors
+and sweeps its search parameter (``nprobe`` for IVF variants, ``efSearch`` for HNSW). For
+each setting it reports recall@k against exact flat search and single-query latency
+(p50/p95, one query per call, like ``continuous_learning.retrieve_similar``). It also
+reports build time and serialized index size. The smallest setting that reaches the
+target recall can be read straight off the table.
+
+Vectors are synthetic clustered unit vectors by default, which resemble sentence
+embeddings more than uniform noise does. ``--vectors`` loads real embeddings from a
+``.npy`` file instead.
+
+Usage::
+
+    python -m ai_ml.benchmarks.ann --n 200000 --dim 384 --k 10
+    python -m ai_ml.benchmarks.ann --vectors corpus_embeddings.npy --types ivf,ivfpq --nprobe 4,16,64
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_ml.benchmarks.load import _percentile
+from ai_ml.benchmarks.suite import _run_metadata
+
+
+def synthetic_vectors(n: int, dim: int, *, clusters: int = 256, spread: float = 0.35, seed: int = 7) -> Any:
+    """``n`` unit vectors drawn around ``clusters`` random centres."""
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def perturbed_queries(data: Any, count: int, *, seed: int = 7) -> Any:
+    """Unit-norm perturbations of random corpus points, so every query has genuine near neighbours."""
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    picks = data[rng.choice(len(data), count, replace=False)]
+    probe = picks + 0.05 * rng.standard_normal(picks.shape).astype(np.float32)
+    probe /= np.linalg.norm(probe, axis=1, keepdims=True)
+    return probe
+
+
+def exact_neighbours(data: Any, probe: Any, k: int) -> Any:
+    import faiss
+
+    exact = faiss.IndexFlatL2(data.shape[1])
+    exact.add(data)
+    return exact.search(probe, k)[1]
+
+
+def measure_search(index: Any, probe: Any, truth: Any, k: int) -> Dict[str, Any]:
+    """Recall@k against ``truth`` and single-query p50/p95 latency."""
+
+    latencies: List[float] = []
+    found: List[Any] = []
+    for row in probe:
+        started = time.perf_counter()
+        _, ids = index.search(row[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        found.append(ids[0])
+    recall = statistics.fmean(len(set(hit) & set(expected)) / k for hit, expected in zip(found, truth))
+    latencies.sort()
+    return {
+        "recall_at_k": round(recall, 4),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 4),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 4),
+        },
+    }
+
+
+def run_ann(
+    vectors: Any,
+    *,
+    queries: int,
+    k: int,
+    types: Sequence[str],
+    nprobes: Sequence[int],
+    ef_searches: Sequence[int],
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    train_sample: int = 50_000,
+    seed: int = 7,
+) -> Dict[str, Any]:
+    import numpy as np
+
+    from ai_ml.vectorstores.faiss_index import FaissIndexConfig, apply_search_params, build_index, index_stats
+    from ai_ml.vectorstores.quantization import VectorStorageConfig
+
+    data = np.ascontiguousarray(vectors, dtype=np.float32)
+    probe = perturbed_queries(data, queries, seed=seed)
+    truth = exact_neighbours(data, probe, k)
+
+    results: List[Dict[str, Any]] = []
+    for index_type in ("flat", *[kind for kind in types if kind != "flat"]):
+        # Raw index behaviour only; ai_ml.benchmarks.quantization measures rescoring.
+        config = FaissIndexConfig(
+            index_type=index_type,
+            nlist=nlist,
+            pq_m=pq_m,
+            train_sample=train_sample,
+            min_vectors=0,
+            storage=VectorStorageConfig(rescore_factor=0),
+        )
+        started = time.perf_counter()
+        index = build_index(data, config)
+        index.add(data)
+        build_seconds = time.perf_counter() - started
+        stats = index_stats(index)
+        sweep = {"ivf": nprobes, "ivfpq": nprobes, "hnsw": ef_searches}.get(index_type, [None])
+        for value in sweep:
+            if index_type == "hnsw":
+                apply_search_params(index, replace(config, ef_search=value))
+            elif value is not None:
+                apply_search_params(index, replace(config, nprobe=value))
+            results.append(
+                {
+                    "type": index_type,
+                    "param": {"ivf": "nprobe", "ivfpq": "nprobe", "hnsw": "efSearch"}.get(index_type),
+                    "value": value,
+                    **measure_search(index, probe, truth, k),
+                    "build_seconds": round(build_seconds, 3),
+                    "index_mb": round(stats["bytes"] / (1024 * 1024), 2),
+                }
+            )
+    return {"vectors": int(data.shape[0]), "dim": int(data.shape[1]), "queries": queries, "k": k, "results": results}
+
+
+def _ints(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recall and latency of FAISS ANN index types vs. exact search")
+    parser.add_argument("--n", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--vectors", help="Load vectors from a .npy file instead of generating them")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="ivf,hnsw,ivfpq", help="Index types to compare with flat")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="nprobe sweep for ivf / ivfpq")
+    parser.add_argument("--ef-search", default="16,32,64,128", help="efSearch sweep for hnsw")
+    parser.add_argument("--nlist", type=int)
+    parser.add_argument("--pq-m", type=int)
+    parser.add_argument("--train-sample", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.vectors:
+        import numpy as np
+
+        vectors = np.load(args.vectors)
+    else:
+        vectors = synthetic_vectors(args.n, args.dim, seed=args.seed)
+    report = {
+        "meta": _run_metadata(source=args.vectors or "synthetic", nlist=args.nlist, pq_m=args.pq_m),
+        **run_ann(
+            vectors,
+            queries=args.queries,
+            k=args.k,
+            types=[item.strip() for item in args.types.split(",") if item.strip()],
+            nprobes=_ints(args.nprobe),
+            ef_searches=_ints(args.ef_search),
+            nlist=args.nlist,
+            pq_m=args.pq_m,
+            train_sample=args.train_sample,
+            seed=args.seed,
+        ),
+    }
+    for entry in report["results"]:
+        setting = f"{entry['param']}={entry['value']}" if entry["param"] else "exact"
+        print(
+            f"{entry['type']:>6} {setting:<14} recall@{report['k']}={entry['recall_at_k']:<7} "
+            f"p50={entry['latency_ms']['p50']}ms p95={entry['latency_ms']['p95']}ms size={entry['index_mb']}MB",
+            file=sys.stderr,
+        )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
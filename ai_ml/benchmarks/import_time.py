@@ -0,0 +1,185 @@
+"""Cold-start import benchmark for the AI/ML entry points.
+
+Each entry module is imported in a fresh interpreter under ``python -X importtime``. The
+self-reported import tree is used both to measure the cold import cost (excluding the
+interpreter's own start-up imports) and to attribute it to the heaviest dependencies.
+The run also records which heavy libraries ended up in ``sys.modules`` so CI can catch
+eager imports creeping back in.
+
+Usage::
+
+    python -m ai_ml.benchmarks.import_time --repeat 5 --output import_times.json
+    python -m ai_ml.benchmarks.import_time --check --budget ai_ml.server=900
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_MODULES = ("ai_ml.backend", "ai_ml.server", "ai_ml.mcp.server")
+
+# Budgets are medians in milliseconds on a CI runner; FastAPI and the MCP SDK dominate the
+# server entry points, everything DocuThinker-specific should be negligible on top.
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "ai_ml.backend": 250.0,
+    "ai_ml.server": 1200.0,
+    "ai_ml.mcp.server": 1500.0,
+}
+
+# Libraries that must only be imported on first use, never at module import time.
+HEAVY_MODULES = (
+    "langchain",
+    "langchain_core",
+    "langchain_community",
+    "langgraph",
+    "crewai",
+    "transformers",
+    "torch",
+    "sentence_transformers",
+    "chromadb",
+    "neo4j",
+    "faiss",
+)
+
+_PROBE = "import {module}; import json, sys; print(json.dumps(sorted(sys.modules)))"
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parse ``-X importtime`` output into ``(module, depth, self_us, cumulative_us)`` rows."""
+
+    rows: List[Tuple[str, int, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+            self_value, cumulative_value = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # header row
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, depth, self_value, cumulative_value))
+    return rows
+
+
+def _run_probe(statement: str) -> Tuple[List[Tuple[str, int, int, int]], List[str]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=str(REPO_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"Import probe failed: {tail[0]}")
+    modules = json.loads(proc.stdout.strip().splitlines()[-1]) if proc.stdout.strip() else []
+    return parse_importtime(proc.stderr), modules
+
+
+def measure_module(module: str, *, repeat: int = 5, top: int = 10) -> Dict[str, object]:
+    """Measure the cold import cost of ``module`` over ``repeat`` fresh interpreters."""
+
+    baseline_rows, _ = _run_probe("pass")
+    startup = {name for name, depth, _, _ in baseline_rows if depth == 0}
+
+    statement = _PROBE.format(module=module)
+    _run_probe(statement)  # prime bytecode caches so the timed runs measure imports only
+
+    runs_ms: List[float] = []
+    cumulative: Dict[str, List[float]] = {}
+    loaded: List[str] = []
+    for _ in range(max(1, repeat)):
+        rows, loaded = _run_probe(statement)
+        total_us = sum(cum for name, depth, _, cum in rows if depth == 0 and name not in startup)
+        runs_ms.append(total_us / 1000.0)
+        for name, depth, _, cum in rows:
+            if name not in startup:
+                cumulative.setdefault(name, []).append(cum / 1000.0)
+
+    heaviest = sorted(
+        ((name, round(statistics.median(values), 2)) for name, values in cumulative.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    heavy_loaded = sorted({name.split(".")[0] for name in loaded} & set(HEAVY_MODULES))
+    return {
+        "median_ms": round(statistics.median(runs_ms), 2),
+        "min_ms": round(min(runs_ms), 2),
+        "runs_ms": [round(value, 2) for value in runs_ms],
+        "heaviest_imports_ms": heaviest,
+        "heavy_modules_loaded": heavy_loaded,
+    }
+
+
+def run_benchmark(
+    modules: Iterable[str] = DEFAULT_MODULES,
+    *,
+    repeat: int = 5,
+    budgets: Optional[Dict[str, float]] = None,
+) -> Dict[str, Dict[str, object]]:
+    """Benchmark each module and annotate the result with its budget verdict."""
+
+    limits = {**DEFAULT_BUDGETS_MS, **(budgets or {})}
+    report: Dict[str, Dict[str, object]] = {}
+    for module in modules:
+        try:
+            result = measure_module(module, repeat=repeat)
+        except RuntimeError as exc:
+            report[module] = {"error": str(exc), "within_budget": False}
+            continue
+        budget = limits.get(module)
+        result["budget_ms"] = budget
+        result["within_budget"] = (budget is None or result["median_ms"] <= budget) and not result["heavy_modules_loaded"]
+        report[module] = result
+    return report
+
+
+def _parse_budgets(values: Iterable[str]) -> Dict[str, float]:
+    budgets: Dict[str, float] = {}
+    for raw in values:
+        module, _, limit = raw.partition("=")
+        if not limit:
+            raise argparse.ArgumentTypeError(f"Budget '{raw}' must look like module=milliseconds.")
+        budgets[module.strip()] = float(limit)
+    return budgets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import time of DocuThinker AI/ML entry points")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES), help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--budget", action="append", default=[], help="Override a budget, e.g. ai_ml.server=900")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a module exceeds its budget")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.modules, repeat=args.repeat, budgets=_parse_budgets(args.budget))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+
+    if args.check:
+        failures = [module for module, result in report.items() if not result.get("within_budget")]
+        if failures:
+            print(f"Import budget exceeded for: {', '.join(failures)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
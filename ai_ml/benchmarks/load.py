@@ -0,0 +1,193 @@
+"""Closed-loop load test of the service façade without network access.
+
+Every agent role is pointed at the ``fake`` provider (or at recorded cassettes with
+``--replay-mode replay``), so throughput and tail latency reflect DocuThinker's own
+concurrency behaviour under provider-like timing rather than a live API's mood. The crew
+stage uses :class:`~ai_ml.benchmarks.stubs.OfflinePipeline`'s three scripted agent turns.
+
+Usage::
+
+    python -m ai_ml.benchmarks.load --operation analyze --concurrency 8 --requests 200 \\
+        --latency lognormal:800:0.5 --tokens-per-second 60 --error-rate 0.01
+    python -m ai_ml.benchmarks.load --provider configured --replay-mode replay --replay-dir cassettes/
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import math
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ai_ml.benchmarks.suite import _run_metadata, synthetic_document
+from ai_ml.core import load_settings
+
+OPERATIONS: Dict[str, Callable[[Any, str], Any]] = {
+    "analyze": lambda service, document: service.analyze_document(document, translate_lang=None),
+    "summarize": lambda service, document: service.summarize(document),
+    "bullets": lambda service, document: service.bullet_summary(document),
+    "sentiment": lambda service, document: service.sentiment(document),
+    "qa": lambda service, document: service.ask(document, "What are the main risks?"),
+}
+
+
+def build_service(
+    *,
+    provider: str = "fake",
+    fake_options: Optional[Dict[str, Any]] = None,
+    replay_mode: Optional[str] = None,
+    replay_dir: Optional[str] = None,
+    cache_artifacts: bool = False,
+) -> Any:
+    """Create a service whose LLMs come from ``provider`` (``configured`` keeps settings as-is).
+
+    The artifact store is disabled unless ``cache_artifacts`` is set, because the driver
+    cycles through a handful of documents and would otherwise mostly measure cache hits.
+    """
+
+    from ai_ml.benchmarks.stubs import DOCUTHINKER_SCRIPT, OfflinePipeline
+    from ai_ml.core.settings import force_agent_provider
+    from ai_ml.providers.circuit import CircuitBreakerPolicy
+    from ai_ml.providers.registry import LLMProviderRegistry, RoutingPolicy
+    from ai_ml.services import DocumentIntelligenceService
+    from ai_ml.tools import ChunkConfig
+
+    settings = dataclasses.replace(load_settings(), auto_sync_graph=False, auto_sync_vector_store=False)
+    if not cache_artifacts:
+        settings = dataclasses.replace(settings, artifact_cache_dir=None, artifact_memory_items=0)
+    if provider != "configured":
+        settings = dataclasses.replace(
+            settings,
+            agent_models=force_agent_provider(
+                settings.agent_models,
+                provider,
+                {"script": DOCUTHINKER_SCRIPT, **(fake_options or {})} if provider == "fake" else None,
+            ),
+            embedding_provider="fake",
+        )
+    registry = LLMProviderRegistry(
+        replay_mode=replay_mode or settings.replay_mode,
+        replay_dir=replay_dir or settings.replay_dir,
+        routing=RoutingPolicy.from_settings(settings),
+        circuit=CircuitBreakerPolicy.from_settings(settings),
+    )
+    pipeline = OfflinePipeline(
+        registry=registry,
+        default_question=settings.rag_question,
+        chunk_config=ChunkConfig(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap),
+        embedding_provider=settings.embedding_provider,
+        embedding_model=settings.embedding_model,
+        model_pricing=settings.model_pricing,
+        agent_models=settings.agent_models,
+    )
+    return DocumentIntelligenceService(settings=settings, registry=registry, pipeline=pipeline)
+
+
+def run_load(
+    service: Any,
+    *,
+    operation: str,
+    concurrency: int,
+    requests: int,
+    document_chars: int,
+) -> Dict[str, Any]:
+    """Issue ``requests`` calls from ``concurrency`` workers and summarise latency and errors."""
+
+    call = OPERATIONS[operation]
+    documents = [synthetic_document(document_chars, seed=index) for index in range(min(requests, 16))]
+
+    def _one(index: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = call(service, documents[index % len(documents)])
+            error = (result.get("rag") or {}).get("error") if isinstance(result, dict) else None
+        except Exception as exc:  # noqa: BLE001 - every failure counts against the run
+            error = f"{type(exc).__name__}: {exc}"
+        return {"seconds": time.perf_counter() - started, "error": error}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        outcomes = list(pool.map(_one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(outcome["seconds"] for outcome in outcomes)
+    errors = [outcome["error"] for outcome in outcomes if outcome["error"]]
+    return {
+        "operation": operation,
+        "concurrency": concurrency,
+        "requests": requests,
+        "document_chars": document_chars,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 3) if wall else None,
+        "errors": len(errors),
+        "error_rate": round(len(errors) / requests, 4) if requests else 0.0,
+        "sample_errors": sorted(set(errors))[:5],
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+        },
+    }
+
+
+def _percentile(ordered: List[float], quantile: float) -> float:
+    # Nearest-rank, so p99 of 100 samples is the 99th value rather than an interpolation.
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Network-free load test of the DocuThinker service")
+    parser.add_argument("--operation", choices=sorted(OPERATIONS), default="analyze")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--chars", type=int, default=8_000, help="Synthetic document size")
+    parser.add_argument("--provider", default="fake", help="'fake', another provider name, or 'configured'")
+    parser.add_argument("--latency", default="lognormal:800:0.5", help="Fake time-to-first-token distribution (ms)")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--replay-mode", choices=("off", "record", "replay"))
+    parser.add_argument("--replay-dir")
+    parser.add_argument("--cache-artifacts", action="store_true", help="Keep the per-document artifact store enabled")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    service = build_service(
+        provider=args.provider,
+        fake_options={
+            "latency": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+        replay_mode=args.replay_mode,
+        replay_dir=args.replay_dir,
+        cache_artifacts=args.cache_artifacts,
+    )
+    report = {
+        "meta": _run_metadata(provider=args.provider, replay_mode=args.replay_mode, cache_artifacts=args.cache_artifacts),
+        "result": run_load(
+            service,
+            operation=args.operation,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            document_chars=args.chars,
+        ),
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Recall, latency and memory of compact vector storage modes against float32 exact search.
+
+Each storage mode from :mod:`ai_ml.vectorstores.quantization` is built over the same
+vectors: float16, int8, and int8 reduced by PCA or truncation. Every mode runs without
+rescoring and with full-precision rescoring of the top ``k * rescore_factor`` hits. The
+full vectors are written to a temporary directory and memory-mapped, as in the
+continuous-learning store. ``resident_mb`` counts only what stays in memory.
+
+Usage::
+
+    python -m ai_ml.benchmarks.quantization --n 200000 --dim 384 --k 10
+    python -m ai_ml.benchmarks.quantization --vectors corpus_embeddings.npy --modes int8,int8-pca192 --index-type hnsw
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_ml.benchmarks.ann import exact_neighbours, measure_search, perturbed_queries, synthetic_vectors
+from ai_ml.benchmarks.suite import _run_metadata
+
+
+def parse_mode(mode: str, dim: int) -> Dict[str, Any]:
+    """``float16``, ``int8``, ``int8-pca192``, ``float16-trunc128``... into storage config fields."""
+
+    match = re.fullmatch(r"(\w+?)(?:-(pca|trunc)(\d*))?", mode)
+    if not match:
+        raise ValueError(f"Unrecognised storage mode '{mode}'.")
+    dtype, reduction, dimensions = match.groups()
+    fields: Dict[str, Any] = {"dtype": dtype}
+    if reduction:
+        fields.update(
+            reduction="pca" if reduction == "pca" else "truncate",
+            dimensions=int(dimensions) if dimensions else dim // 2,
+        )
+    return fields
+
+
+def run_quantization(
+    vectors: Any,
+    *,
+    queries: int,
+    k: int,
+    modes: Sequence[str],
+    rescore_factors: Sequence[int],
+    index_type: str = "flat",
+    seed: int = 7,
+) -> Dict[str, Any]:
+    import numpy as np
+
+    from ai_ml.vectorstores.faiss_index import FaissIndexConfig, build_index, index_stats
+    from ai_ml.vectorstores.quantization import VectorStorageConfig
+
+    data = np.ascontiguousarray(vectors, dtype=np.float32)
+    probe = perturbed_queries(data, queries, seed=seed)
+    truth = exact_neighbours(data, probe, k)
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="docuthinker-quant-") as workdir:
+        for mode in ("float32", *[item for item in modes if item != "float32"]):
+            for factor in rescore_factors if mode != "float32" else [0]:
+                storage = VectorStorageConfig(rescore_factor=factor, rescore_dir=workdir, **parse_mode(mode, data.shape[1]))
+                config = FaissIndexConfig(index_type=index_type, min_vectors=0, storage=storage)
+                started = time.perf_counter()
+                index = build_index(data, config)
+                index.add(data)
+                build_seconds = time.perf_counter() - started
+                stats = index_stats(index)
+                results.append(
+                    {
+                        "mode": mode,
+                        "rescore_factor": factor if config.rescored else 0,
+                        **measure_search(index, probe, truth, k),
+                        "build_seconds": round(build_seconds, 3),
+                        "resident_mb": round(stats["bytes"] / (1024 * 1024), 2),
+                        "bytes_per_vector": round(stats["bytes"] / len(data), 1),
+                    }
+                )
+    return {
+        "vectors": int(data.shape[0]),
+        "dim": int(data.shape[1]),
+        "index_type": index_type,
+        "queries": queries,
+        "k": k,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recall/latency/memory of float16, int8 and reduced vector storage")
+    parser.add_argument("--n", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--vectors", help="Load vectors from a .npy file instead of generating them")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", default="float16,int8,int8-pca,int8-trunc", help="dtype[-pcaN|-truncN] entries")
+    parser.add_argument("--rescore", default="0,4", help="Rescore factors to compare (0 = no rescoring)")
+    parser.add_argument("--index-type", default="flat", choices=["flat", "ivf", "hnsw"])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.vectors:
+        import numpy as np
+
+        vectors = np.load(args.vectors)
+    else:
+        vectors = synthetic_vectors(args.n, args.dim, seed=args.seed)
+    report = {
+        "meta": _run_metadata(source=args.vectors or "synthetic"),
+        **run_quantization(
+            vectors,
+            queries=args.queries,
+            k=args.k,
+            modes=[item.strip() for item in args.modes.split(",") if item.strip()],
+            rescore_factors=[int(item) for item in args.rescore.split(",") if item.strip()],
+            index_type=args.index_type,
+            seed=args.seed,
+        ),
+    }
+    for entry in report["results"]:
+        print(
+            f"{entry['mode']:>16} rescore={entry['rescore_factor']:<3} recall@{report['k']}={entry['recall_at_k']:<7} "
+            f"p50={entry['latency_ms']['p50']}ms p95={entry['latency_ms']['p95']}ms "
+            f"resident={entry['resident_mb']}MB ({entry['bytes_per_vector']} B/vector)",
+            file=sys.stderr,
+        )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Recall-vs-k benchmark for dense, BM25 and hybrid (RRF) retrieval.
+
+Builds one synthetic document, chunks and embeds it once, then issues two kinds of
+query against each retrieval mode:
+
+* ``exact``: an identifier or figure from the text (``PRJ-4821``, ``$420k``); every chunk
+  containing it is relevant. This is where dense-only retrieval tends to fall short.
+* ``paraphrase``: a shuffled, partially dropped sentence from one chunk; that chunk is
+  relevant.
+
+For each ``k`` it reports mean recall (relevant chunks retrieved / ``min(relevant, k)``)
+and the context size a top-k prompt would carry, so the smallest k reaching a target
+recall can be read straight off the table.
+
+Usage::
+
+    python -m ai_ml.benchmarks.retrieval --chars 200000 --ks 1,3,6,10,20
+    python -m ai_ml.benchmarks.retrieval --embedding-provider huggingface --output recall.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ai_ml.benchmarks.suite import _run_metadata, synthetic_document
+
+_EXACT_RE = re.compile(r"PRJ-\d{4}|\$\d+k")
+
+
+def build_queries(chunks: Sequence[str], *, count: int, seed: int = 7) -> List[Tuple[str, str, Set[int]]]:
+    """Return ``(kind, query, relevant_chunk_indices)`` triples, half exact and half paraphrase."""
+
+    rng = random.Random(seed)
+    tokens = sorted({match for text in chunks for match in _EXACT_RE.findall(text)})
+    queries: List[Tuple[str, str, Set[int]]] = []
+    for token in rng.sample(tokens, min(len(tokens), count // 2)):
+        relevant = {index for index, text in enumerate(chunks) if token in text}
+        queries.append(("exact", f"Which items mention {token}?", relevant))
+
+    while len(queries) < count:
+        index = rng.randrange(len(chunks))
+        sentences = [sentence.split() for sentence in chunks[index].split(". ") if len(sentence.split()) >= 8]
+        if not sentences:
+            continue
+        words = rng.choice(sentences)
+        kept = [word for word in words if rng.random() > 0.3]
+        rng.shuffle(kept)
+        queries.append(("paraphrase", " ".join(kept), {index}))
+    return queries
+
+
+def run_recall(
+    *,
+    chars: int,
+    ks: Sequence[int],
+    queries: int,
+    embedding_provider: str = "fake",
+    embedding_model: Optional[str] = None,
+    chunk_size: int = 900,
+    chunk_overlap: int = 120,
+    rrf_k: int = 60,
+    seed: int = 7,
+) -> Dict[str, Any]:
+    from ai_ml.providers.registry import LLMProviderRegistry
+    from ai_ml.retrieval import RETRIEVAL_MODES, build_retriever
+    from ai_ml.tools import ChunkConfig, RetrievalConfig, chunk_document, embed_chunks
+
+    document = synthetic_document(chars, seed=seed)
+    chunks = chunk_document(document, config=ChunkConfig(chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+    embeddings = LLMProviderRegistry().embeddings(embedding_provider, model=embedding_model)
+    vectors = embed_chunks(chunks, embeddings=embeddings)
+    texts = [chunk.page_content for chunk in chunks]
+    workload = build_queries(texts, count=queries, seed=seed)
+    max_k = max(ks)
+
+    results: List[Dict[str, Any]] = []
+    for mode in RETRIEVAL_MODES:
+        config = RetrievalConfig(mode=mode, top_k=max_k, candidates=max(20, max_k), rrf_k=rrf_k)
+        retriever = build_retriever(chunks, vectors, embeddings=embeddings, config=config)
+        ranked = [
+            (kind, [doc.metadata["chunk"] for doc in retriever.invoke(query, k=max_k)], relevant)
+            for kind, query, relevant in workload
+        ]
+        for k in ks:
+            entry: Dict[str, Any] = {"mode": mode, "k": k}
+            for kind in ("exact", "paraphrase", "all"):
+                recalls = [
+                    len(relevant & set(hits[:k])) / min(len(relevant), k)
+                    for query_kind, hits, relevant in ranked
+                    if kind in {"all", query_kind}
+                ]
+                entry[f"recall_{kind}"] = round(statistics.fmean(recalls), 4) if recalls else None
+            entry["context_chars"] = round(statistics.fmean(sum(len(texts[i]) for i in hits[:k]) for _, hits, _ in ranked))
+            results.append(entry)
+    return {"chunks": len(chunks), "queries": len(workload), "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recall-vs-k for dense, BM25 and hybrid retrieval")
+    parser.add_argument("--chars", type=int, default=100_000, help="Synthetic document size")
+    parser.add_argument("--ks", default="1,3,6,10,20")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embedding-provider", default="fake")
+    parser.add_argument("--embedding-model")
+    parser.add_argument("--chunk-size", type=int, default=900)
+    parser.add_argument("--chunk-overlap", type=int, default=120)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    ks = sorted({int(item) for item in args.ks.split(",") if item.strip()})
+    report = {
+        "meta": _run_metadata(
+            embedding_provider=args.embedding_provider,
+            embedding_model=args.embedding_model,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            rrf_k=args.rrf_k,
+        ),
+        **run_recall(
+            chars=args.chars,
+            ks=ks,
+            queries=args.queries,
+            embedding_provider=args.embedding_provider,
+            embedding_model=args.embedding_model,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            rrf_k=args.rrf_k,
+            seed=args.seed,
+        ),
+    }
+    for entry in report["results"]:
+        print(
+            f"{entry['mode']:>7} k={entry['k']:<3} exact={entry['recall_exact']} "
+            f"paraphrase={entry['recall_paraphrase']} chars={entry['context_chars']}",
+            file=sys.stderr,
+        )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Deterministic, network-free stand-ins for LLM and embedding providers.
+
+The benchmark suite swaps these in through :class:`StubRegistry` so every stage of the
+pipeline runs locally and repeatably. The models come from :mod:`ai_ml.providers.fake`.
+:func:`docuthinker_response` is the script that answers DocuThinker's own prompt shapes
+(the RAG JSON with its ``confidence``, the combined analysis, sentiment), deriving the
+content from the prompt text, which keeps downstream JSON parsing and retrieval
+realistic without calling a provider. Whenever a prompt in :mod:`ai_ml.core.prompts`
+changes shape, update the script here, not in the fake provider.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from ai_ml.pipelines import AgenticRAGPipeline
+from ai_ml.providers.fake import FakeChatModel, FakeEmbeddings, digest_prompt
+from ai_ml.providers.registry import LLMConfig, LLMProviderRegistry
+
+# Name the fake provider resolves lazily; pass it as the ``script`` option (or DOCUTHINKER_FAKE_SCRIPT).
+DOCUTHINKER_SCRIPT = "ai_ml.benchmarks.stubs:docuthinker_response"
+
+
+def docuthinker_response(prompt: str) -> str:
+    """A plausible response for the prompt shapes used across DocuThinker."""
+
+    digest = digest_prompt(prompt)
+    topics, sentences, overview = digest.topics, digest.sentences, digest.overview
+    if "general_overview" in prompt:
+        return json.dumps(
+            {
+                "general_overview": overview,
+                "main_topics": topics,
+                "supporting_context": sentences[:3],
+                "question_answer": sentences[0] if sentences else "",
+                # Deterministic per prompt but spread over 0.50-0.99 so confidence-based routing varies.
+                "confidence": round(0.5 + hashlib.blake2b(prompt.encode("utf-8"), digest_size=1).digest()[0] % 50 / 100, 2),
+            }
+        )
+    if "combined" in prompt and "minified JSON" in prompt:
+        return json.dumps(
+            {
+                "summary": overview,
+                "bullet_summary": sentences[:3],
+                "topics": topics,
+                "sentiment": {"label": "Neutral", "confidence": 0.5, "rationale": overview[:120]},
+                "recommendations": [f"Follow up on {topic}." for topic in topics[:3]],
+            }
+        )
+    if "label, confidence, rationale" in prompt:
+        return json.dumps({"label": "Neutral", "confidence": 0.5, "rationale": overview[:120]})
+    return "\n".join(f"- {topic}" for topic in topics) + f"\n\n{overview}"
+
+
+class StubRegistry(LLMProviderRegistry):
+    """Registry that resolves every chat and embedding request to the ``fake`` provider."""
+
+    def __init__(self, *, latency_s: float = 0.0, dimensions: int = 384) -> None:
+        super().__init__()
+        self._chat = FakeChatModel(model="benchmark-stub", script=DOCUTHINKER_SCRIPT, latency=latency_s * 1000.0)
+        self._embeddings = FakeEmbeddings(dimensions=dimensions)
+
+    def chat(self, config: LLMConfig) -> FakeChatModel:
+        return self._chat
+
+    def embeddings(self, provider: str, model: Optional[str] = None, **kwargs: Any) -> FakeEmbeddings:
+        return self._embeddings
+
+
+class OfflinePipeline(AgenticRAGPipeline):
+    """Pipeline whose crew stage replays the three agent turns against the stub model.
+
+    CrewAI drives providers through its own client stack, so the benchmark substitutes one
+    scripted call per agent to keep the stage's shape (and relative cost) without network.
+    """
+
+    def _crew_collaboration(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        llm = self.registry.chat(self._primary_llm_config)
+        rag_payload = state.get("rag_payload", {})
+        turns = []
+        for role in ("Document Analyst", "Cross-Referencer", "Insights Curator"):
+            prompt = f"{role}: review the findings.\n{rag_payload.get('general_overview', '')}\n{turns[-1] if turns else ''}"
+            turns.append(llm.invoke(prompt).content)
+        return {**state, "crew_payload": {"raw": "\n\n".join(turns)}}
+
+
+__all__ = ["DOCUTHINKER_SCRIPT", "OfflinePipeline", "StubRegistry", "docuthinker_response"]
@@ -0,0 +1,339 @@
+"""Offline performance benchmarks for the AI/ML package.
+
+Covers chunking, FAISS retriever construction, the agentic pipeline, the service façade,
+Chroma upsert/query and ``summarize_text`` across small, medium and huge synthetic
+documents. LLM and embedding providers are replaced with the deterministic stand-ins in
+:mod:`ai_ml.benchmarks.stubs`, so results only reflect DocuThinker's own overhead and are
+comparable between commits.
+
+Usage::
+
+    python -m ai_ml.benchmarks.suite run --sizes small,medium --repeat 5 --output head.json
+    python -m ai_ml.benchmarks.suite compare base.json head.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ai_ml.core import load_settings
+
+DOCUMENT_SIZES: Dict[str, int] = {
+    "small": 2_000,
+    "medium": 50_000,
+    "huge": 1_000_000,
+}
+
+_VOCABULARY = (
+    "revenue budget forecast margin pipeline customer retention churn roadmap milestone "
+    "latency throughput incident postmortem compliance audit vendor contract renewal "
+    "headcount hiring onboarding migration database cluster region availability risk "
+    "mitigation stakeholder launch pricing discount enterprise segment growth quarter"
+).split()
+
+
+def synthetic_document(chars: int, *, seed: int = 7) -> str:
+    """Generate a deterministic business-style document of roughly ``chars`` characters."""
+
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    total = 0
+    section = 1
+    while total < chars:
+        sentences = []
+        for _ in range(rng.randint(4, 8)):
+            words = rng.choices(_VOCABULARY, k=rng.randint(8, 18))
+            if rng.random() < 0.3:
+                words.insert(rng.randrange(len(words)), f"${rng.randint(10, 990)}k")
+            if rng.random() < 0.2:
+                words.insert(rng.randrange(len(words)), f"PRJ-{rng.randint(1000, 9999)}")
+            sentence = " ".join(words)
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        paragraph = f"Section {section}. " + " ".join(sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+        section += 1
+    return "\n\n".join(paragraphs)[:chars]
+
+
+@dataclasses.dataclass
+class BenchmarkContext:
+    """Shared stand-ins and settings for one suite run."""
+
+    registry: Any
+    pipeline: Any
+    service: Any
+    chunk_config: Any
+
+
+def _build_context(latency_s: float, mode: str = "deep") -> BenchmarkContext:
+    from ai_ml.benchmarks.stubs import OfflinePipeline, StubRegistry
+    from ai_ml.pipelines import AnalysisPolicy
+    from ai_ml.services import DocumentIntelligenceService
+    from ai_ml.tools import ChunkConfig
+
+    # Artifact caching is off so repeated iterations measure real work, not cache hits.
+    settings = dataclasses.replace(
+        load_settings(),
+        auto_sync_graph=False,
+        auto_sync_vector_store=False,
+        artifact_cache_dir=None,
+        artifact_memory_items=0,
+    )
+    registry = StubRegistry(latency_s=latency_s)
+    chunk_config = ChunkConfig(chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap)
+    pipeline = OfflinePipeline(
+        registry=registry,
+        default_question=settings.rag_question,
+        chunk_config=chunk_config,
+        embedding_provider=settings.embedding_provider,
+        embedding_model=settings.embedding_model,
+        analysis_policy=AnalysisPolicy(default_mode=mode),
+    )
+    service = DocumentIntelligenceService(settings=settings, registry=registry, pipeline=pipeline)
+    return BenchmarkContext(registry=registry, pipeline=pipeline, service=service, chunk_config=chunk_config)
+
+
+@contextlib.contextmanager
+def _installed_service(service: Any) -> Iterator[None]:
+    """Temporarily make ``service`` the singleton used by module-level helpers."""
+
+    from ai_ml.services import orchestrator
+
+    previous = orchestrator._service_instance
+    orchestrator._service_instance = service
+    try:
+        yield
+    finally:
+        orchestrator._service_instance = previous
+
+
+def _bench_chunk_document(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    from ai_ml.tools import chunk_document
+
+    return lambda: chunk_document(document, config=ctx.chunk_config)
+
+
+def _bench_build_vector_store(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    from ai_ml.tools import build_vector_store
+
+    embeddings = ctx.registry.embeddings("stub")
+    return lambda: build_vector_store(document, config=ctx.chunk_config, embeddings=embeddings)
+
+
+def _bench_pipeline_run(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    return lambda: ctx.pipeline.run(document, question="What are the main risks?")
+
+
+def _bench_analyze_document(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    return lambda: ctx.service.analyze_document(document, question="What are the main risks?", translate_lang=None)
+
+
+def _bench_chroma(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    from ai_ml.tools import chunk_document
+    from ai_ml.vectorstores import ChromaConfig, ChromaVectorClient
+
+    chunks = [doc.page_content for doc in chunk_document(document, config=ctx.chunk_config)]
+    embeddings = ctx.registry.embeddings("stub")
+    vectors = embeddings.embed_documents(chunks)
+    query_vector = embeddings.embed_query("budget risk mitigation")
+    workdir = tempfile.mkdtemp(prefix="docuthinker-bench-")
+    client = ChromaVectorClient(ChromaConfig(persist_directory=workdir, collection_name="bench"))
+    ids = [f"chunk-{index}" for index in range(len(chunks))]
+
+    def _run() -> Any:
+        client.upsert(ids=ids, documents=chunks, embeddings=vectors)
+        return client.similarity_search(query="budget risk mitigation", n_results=6, embedding=query_vector)
+
+    return _run
+
+
+def _bench_summarize_text(ctx: BenchmarkContext, document: str) -> Callable[[], Any]:
+    from ai_ml.processing.summarizer import summarize_text
+
+    def _run() -> Any:
+        with _installed_service(ctx.service):
+            return summarize_text(document)
+
+    return _run
+
+
+BENCHMARKS: Dict[str, Callable[[BenchmarkContext, str], Callable[[], Any]]] = {
+    "chunk_document": _bench_chunk_document,
+    "build_vector_store": _bench_build_vector_store,
+    "pipeline_run": _bench_pipeline_run,
+    "analyze_document": _bench_analyze_document,
+    "chroma_upsert_query": _bench_chroma,
+    "summarize_text": _bench_summarize_text,
+}
+
+
+def measure(func: Callable[[], Any], *, repeat: int, chars: int) -> Dict[str, Any]:
+    """Time ``func`` ``repeat`` times after one warm-up call, then measure its peak heap once."""
+
+    func()
+    samples: List[float] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "latency_ms": {
+            "min": round(ordered[0] * 1000, 3),
+            "p50": round(p50 * 1000, 3),
+            "p95": round(p95 * 1000, 3),
+            "mean": round(statistics.fmean(ordered) * 1000, 3),
+        },
+        "ops_per_s": round(1.0 / p50, 3) if p50 else None,
+        "throughput_chars_per_s": round(chars / p50, 1) if p50 else None,
+        # tracemalloc only sees Python allocations; native FAISS/Chroma buffers are excluded.
+        "peak_python_memory_mb": round(peak / (1024 * 1024), 3),
+    }
+
+
+def run_suite(
+    *,
+    sizes: List[str],
+    benchmarks: List[str],
+    repeat: int = 3,
+    latency_s: float = 0.0,
+    mode: str = "deep",
+) -> Dict[str, Any]:
+    ctx = _build_context(latency_s, mode)
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        document = synthetic_document(DOCUMENT_SIZES[size])
+        for name in benchmarks:
+            entry: Dict[str, Any] = {"benchmark": name, "size": size, "chars": len(document)}
+            try:
+                func = BENCHMARKS[name](ctx, document)
+                entry.update(measure(func, repeat=repeat, chars=len(document)))
+                entry["status"] = "ok"
+            except (ImportError, RuntimeError) as exc:
+                entry.update({"status": "skipped", "reason": str(exc)})
+            results.append(entry)
+            print(f"{name:>22} {size:>6}: {entry.get('latency_ms', {}).get('p50', entry.get('reason'))}", file=sys.stderr)
+    return {"meta": _run_metadata(repeat=repeat, latency_s=latency_s, mode=mode), "results": results}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], *, threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """Return metrics that regressed by more than ``threshold`` (relative) between two runs."""
+
+    def _index(report: Dict[str, Any]) -> Dict[tuple, Dict[str, Any]]:
+        return {(item["benchmark"], item["size"]): item for item in report.get("results", []) if item.get("status") == "ok"}
+
+    checks = (
+        ("latency_ms.p50", lambda item: item["latency_ms"]["p50"], True),
+        ("throughput_chars_per_s", lambda item: item["throughput_chars_per_s"], False),
+        ("peak_python_memory_mb", lambda item: item["peak_python_memory_mb"], True),
+    )
+    base, head = _index(baseline), _index(current)
+    regressions: List[Dict[str, Any]] = []
+    for key in sorted(base.keys() & head.keys()):
+        for metric, getter, higher_is_worse in checks:
+            old, new = getter(base[key]), getter(head[key])
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(
+                    {"benchmark": key[0], "size": key[1], "metric": metric, "baseline": old, "current": new, "change": round(change, 4)}
+                )
+    return regressions
+
+
+def _run_metadata(**extra: Any) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **extra,
+    }
+
+
+def _split(value: str, allowed: Dict[str, Any]) -> List[str]:
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown entries {unknown}; choose from {sorted(allowed)}.")
+    return items
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline DocuThinker AI/ML benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Run benchmarks and write a JSON report")
+    run_parser.add_argument("--sizes", default="small,medium,huge")
+    run_parser.add_argument("--benchmarks", default=",".join(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per stub LLM call")
+    run_parser.add_argument(
+        "--mode",
+        choices=("fast", "standard", "deep"),
+        default="deep",
+        help="Analysis mode for pipeline benchmarks (deep exercises every stage)",
+    )
+    run_parser.add_argument("--output", help="Write the JSON report to this path")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two JSON reports and flag regressions")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--threshold", type=float, default=0.15, help="Relative change treated as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run_suite(
+            sizes=_split(args.sizes, DOCUMENT_SIZES),
+            benchmarks=_split(args.benchmarks, BENCHMARKS),
+            repeat=args.repeat,
+            latency_s=args.llm_latency,
+            mode=args.mode,
+        )
+        payload = json.dumps(report, indent=2)
+        if args.output:
+            Path(args.output).write_text(payload + "\n", encoding="utf-8")
+        print(payload)
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    regressions = compare(baseline, current, threshold=args.threshold)
+    print(json.dumps(regressions, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
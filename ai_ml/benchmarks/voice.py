@@ -0,0 +1,123 @@
+"""Time-to-first-audio benchmark: serial voice chat vs. the streaming pipeline.
+
+Both modes run the same chat turns against the offline fake provider, which streams its
+reply at ``--tokens-per-second`` after ``--latency-ms``. The stand-in TTS sleeps
+``--tts-ms-per-char`` per character. The serial mode waits for the whole reply and
+synthesizes it in one call, as the original ``voice_chat`` did. The streaming mode goes
+through :class:`~ai_ml.extended_features.voice_streaming.StreamingVoicePipeline`. The
+report gives p50/p95 time to first audio and total turn time for each mode.
+
+Usage::
+
+    python -m ai_ml.benchmarks.voice --turns 10 --tokens-per-second 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ai_ml.benchmarks.load import _percentile, build_service
+from ai_ml.benchmarks.suite import _run_metadata
+
+_QUESTIONS = (
+    "What are the main findings of this report?",
+    "Which risks does the document call out?",
+    "Summarize the recommendations in a few sentences.",
+    "What should we do first?",
+)
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50": round(_percentile(samples, 0.50) * 1000, 1),
+        "p95": round(_percentile(samples, 0.95) * 1000, 1),
+    }
+
+
+def run_voice(
+    *,
+    turns: int,
+    latency_ms: float,
+    tokens_per_second: float,
+    tts_ms_per_char: float,
+    min_sentence_chars: int = 24,
+) -> Dict[str, Any]:
+    from ai_ml.extended_features.voice_streaming import SilenceTextToSpeech, StreamingVoicePipeline
+
+    service = build_service(fake_options={"latency": latency_ms, "tokens_per_second": tokens_per_second})
+    tts = SilenceTextToSpeech(seconds_per_char=tts_ms_per_char / 1000)
+    pipeline = StreamingVoicePipeline(tts=tts, min_sentence_chars=min_sentence_chars)
+    results: Dict[str, Dict[str, List[float]]] = {mode: {"first_audio": [], "total": []} for mode in ("serial", "streaming")}
+
+    for turn in range(turns):
+        question = _QUESTIONS[turn % len(_QUESTIONS)]
+
+        started = time.perf_counter()
+        reply = "".join(service.stream_chat(question, session_id=f"serial-{turn}"))
+        tts.synthesize(reply)
+        elapsed = time.perf_counter() - started
+        results["serial"]["first_audio"].append(elapsed)
+        results["serial"]["total"].append(elapsed)
+
+        voice = pipeline.run(
+            [question.encode("utf-8")],
+            lambda text, sid=f"streaming-{turn}": service.stream_chat(text, session_id=sid),
+        )
+        for _ in voice:
+            pass
+        results["streaming"]["first_audio"].append(voice.timings["first_audio"])
+        results["streaming"]["total"].append(voice.timings["total"])
+
+    report = {mode: {metric: _summary(values) for metric, values in metrics.items()} for mode, metrics in results.items()}
+    serial, streaming = report["serial"]["first_audio"]["p50"], report["streaming"]["first_audio"]["p50"]
+    return {
+        "turns": turns,
+        "latency_ms": latency_ms,
+        "tokens_per_second": tokens_per_second,
+        "tts_ms_per_char": tts_ms_per_char,
+        "results_ms": report,
+        "first_audio_speedup": round(serial / streaming, 2) if streaming else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time to first audio of serial vs. streaming voice chat")
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake provider time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Fake provider streaming rate")
+    parser.add_argument("--tts-ms-per-char", type=float, default=1.0, help="Stand-in TTS synthesis cost")
+    parser.add_argument("--min-sentence-chars", type=int, default=24)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": _run_metadata(),
+        **run_voice(
+            turns=args.turns,
+            latency_ms=args.latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            tts_ms_per_char=args.tts_ms_per_char,
+            min_sentence_chars=args.min_sentence_chars,
+        ),
+    }
+    for mode, metrics in report["results_ms"].items():
+        print(
+            f"{mode:>9} first_audio p50={metrics['first_audio']['p50']}ms p95={metrics['first_audio']['p95']}ms "
+            f"total p50={metrics['total']['p50']}ms",
+            file=sys.stderr,
+        )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())
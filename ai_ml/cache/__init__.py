@@ -0,0 +1,13 @@
+"""Caches that let DocuThinker reuse work across calls and processes."""
+
+from .artifact_store import ARTIFACT_VERSIONS, ArtifactStore, document_hash, settings_fingerprint
+from .semantic_cache import CacheLookup, SemanticQACache
+
+__all__ = [
+    "ARTIFACT_VERSIONS",
+    "ArtifactStore",
+    "CacheLookup",
+    "SemanticQACache",
+    "document_hash",
+    "settings_fingerprint",
+]
@@ -0,0 +1,361 @@
+"""Per-document artifact store shared by the service façade and the agentic pipeline.
+
+Artifacts (chunks, chunk embeddings, pipeline reports, summaries, sentiment...) are keyed
+by the SHA-256 of the document text, the artifact kind and any call parameters, and
+scoped by a *settings fingerprint* covering models, chunking and prompt templates. A hot
+in-process LRU tier sits in front of an optional on-disk tier, so a document analysed
+once is not re-chunked, re-embedded or re-prompted by later calls or later processes.
+
+Every disk entry records the artifact's schema version and the fingerprint it was
+computed under; a mismatch on either is treated as a miss, so changing a model, the chunk
+size or a prompt invalidates stale artifacts without any manual purge.
+
+The disk tier is bounded. On first use, directories of other fingerprints are pruned;
+entries older than ``max_age`` are misses and are swept periodically, and once the tier
+exceeds ``max_bytes`` the least recently written entries are evicted on ``put``. Entries
+are pickles, so the tier only loads from a directory that belongs to the current user and
+that no one else can write to. Directories are created ``0700`` and files ``0600``.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from ai_ml.core.metrics import get_metrics_registry
+from ai_ml.core.prompts import prompt_fingerprint
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from ai_ml.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Bump a kind's version whenever the shape of its cached value changes.
+ARTIFACT_VERSIONS: Dict[str, int] = {
+    # 2: reports with a failed crew stage were cached as version 1; drop them.
+    "analysis": 2,
+    "chunks": 1,
+    "chunk_vectors": 1,
+    "retriever": 1,
+    "summary": 1,
+    "bullet_summary": 1,
+    "topics": 1,
+    "discussion": 1,
+    "recommendations": 1,
+    "refined_summary": 1,
+    "rewrite": 1,
+    "sentiment": 1,
+    "translation": 1,
+    "qa": 1,
+    "combined": 1,
+}
+
+_REQUESTS = get_metrics_registry().counter(
+    "docuthinker_artifact_cache_requests_total",
+    "Artifact store lookups by artifact kind and outcome (memory_hit, disk_hit, miss).",
+    ["kind", "result"],
+)
+
+_MISSING = object()
+
+# Eviction trims the disk tier to this fraction of max_bytes, so it doesn't run on every put.
+_EVICT_TARGET = 0.9
+
+
+def document_hash(document: str) -> str:
+    """Content hash identifying a document independently of where it came from."""
+
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+def settings_fingerprint(settings: Settings) -> str:
+    """Hash of every setting that changes what an artifact would contain."""
+
+    payload = {
+        "agent_models": {
+            role: [spec.provider, spec.model, spec.temperature, spec.max_tokens, sorted(spec.extra.items())]
+            for role, spec in sorted(settings.agent_models.items())
+        },
+        "embedding": [settings.embedding_provider, settings.embedding_model],
+        "chunking": [settings.chunk_size, settings.chunk_overlap],
+        "rag_question": settings.rag_question,
+        "bullet_summary_style": settings.bullet_summary_style,
+        "translation_models": sorted(settings.translation_models.items()),
+        "vector_top_k": settings.vector_top_k,
+        "retrieval": [
+            settings.retrieval_mode,
+            settings.retrieval_candidates,
+            settings.rrf_k,
+            settings.context_tokens,
+            settings.mmr_lambda,
+            settings.similarity_cutoff,
+            settings.reranker_backend,
+            settings.reranker_model,
+        ],
+        "analysis": [
+            settings.short_document_chars,
+            settings.fast_direct_max_chars,
+            settings.crew_confidence_threshold,
+            settings.crew_process,
+        ],
+        "prompts": prompt_fingerprint(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class ArtifactStore:
+    """Two-tier (memory LRU + optional disk) cache of per-document artifacts."""
+
+    def __init__(
+        self,
+        *,
+        fingerprint: str,
+        memory_items: int = 256,
+        disk_dir: str | os.PathLike[str] | None = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.fingerprint = fingerprint
+        self.memory_items = max(0, memory_items)
+        self.disk_dir = Path(disk_dir).expanduser() if disk_dir else None
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[Tuple[str, str, str], Tuple[Any, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_ready = False
+        self._disk_bytes = 0
+        self._last_sweep = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ArtifactStore":
+        max_mb = settings.artifact_max_mb
+        return cls(
+            fingerprint=settings_fingerprint(settings),
+            memory_items=settings.artifact_memory_items,
+            disk_dir=settings.artifact_cache_dir,
+            max_age=settings.artifact_max_age,
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+        )
+
+    def get(self, document: str, kind: str, **params: Any) -> Any:
+        """Return the cached artifact or ``None`` when it has not been computed yet."""
+
+        key = self._key(document, kind, params)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None:
+            _REQUESTS.inc(kind=kind, result="memory_hit")
+            value, persist = entry
+            # Persistable artifacts are plain data; hand out copies so callers can't mutate the cache.
+            return copy.deepcopy(value) if persist else value
+
+        value = self._load(key)
+        if value is _MISSING:
+            _REQUESTS.inc(kind=kind, result="miss")
+            return None
+        _REQUESTS.inc(kind=kind, result="disk_hit")
+        self._remember(key, value, persist=True)
+        return copy.deepcopy(value)
+
+    def put(self, document: str, kind: str, value: Any, *, persist: bool = True, **params: Any) -> Any:
+        """Store ``value`` and return it; ``persist=False`` keeps it in memory only (e.g. live indexes)."""
+
+        key = self._key(document, kind, params)
+        self._remember(key, copy.deepcopy(value) if persist else value, persist=persist)
+        if persist and self._disk_available():
+            self._save(key, value)
+            self._enforce_limits()
+        return value
+
+    def clear(self) -> None:
+        """Drop the memory tier; disk entries stay until :meth:`prune` or a fingerprint change."""
+
+        with self._lock:
+            self._memory.clear()
+
+    def prune(self) -> int:
+        """Delete disk artifacts computed under other settings fingerprints; returns directories removed."""
+
+        if self.disk_dir is None or not self.disk_dir.exists():
+            return 0
+        removed = 0
+        for entry in self.disk_dir.iterdir():
+            if entry.is_dir() and entry.name != self.fingerprint:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def sweep(self) -> int:
+        """Delete expired disk entries, then the oldest ones while over ``max_bytes``; returns files removed."""
+
+        if not self._disk_available():
+            return 0
+        with self._disk_lock:
+            return self._sweep_locked()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    def _key(self, document: str, kind: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+        if kind not in ARTIFACT_VERSIONS:
+            raise ValueError(f"Unknown artifact kind '{kind}'; register it in ARTIFACT_VERSIONS.")
+        param_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        return document_hash(document), kind, param_hash
+
+    def _remember(self, key: Tuple[str, str, str], value: Any, *, persist: bool) -> None:
+        if not self.memory_items:
+            return
+        with self._lock:
+            self._memory[key] = (value, persist)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _disk_available(self) -> bool:
+        """Prepare the disk tier on first use: check ownership, then prune and sweep it."""
+
+        if self.disk_dir is None:
+            return False
+        if self._disk_ready:
+            return True
+        with self._disk_lock:
+            if self._disk_ready:
+                return True
+            try:
+                self.disk_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            except OSError as exc:
+                logger.warning("Artifact disk tier disabled, cannot create %s: %s", self.disk_dir, exc)
+                self.disk_dir = None
+                return False
+            problem = _untrusted(self.disk_dir)
+            if problem:
+                logger.warning("Artifact disk tier disabled, %s %s", self.disk_dir, problem)
+                self.disk_dir = None
+                return False
+            removed = self.prune()
+            if removed:
+                logger.info("Pruned %d stale artifact fingerprint directories from %s", removed, self.disk_dir)
+            self._sweep_locked()
+            self._disk_ready = True
+        return True
+
+    def _enforce_limits(self) -> None:
+        sweep_every = min(self.max_age / 10, 3600.0) if self.max_age else None
+        over_size = self.max_bytes is not None and self._disk_bytes > self.max_bytes
+        overdue = sweep_every is not None and time.time() - self._last_sweep > sweep_every
+        if over_size or overdue:
+            with self._disk_lock:
+                self._sweep_locked()
+
+    def _sweep_locked(self) -> int:
+        assert self.disk_dir is not None
+        now = time.time()
+        entries = []
+        for path in (self.disk_dir / self.fingerprint).glob("*/*/*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * _EVICT_TARGET) if self.max_bytes is not None else None
+        removed = 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            if not expired and (target is None or total <= target):
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._disk_bytes = total
+        self._last_sweep = now
+        if removed:
+            logger.debug("Evicted %d artifacts from %s (%d bytes left)", removed, self.disk_dir, total)
+        return removed
+
+    def _path(self, key: Tuple[str, str, str]) -> Path:
+        doc_hash, kind, param_hash = key
+        assert self.disk_dir is not None
+        return self.disk_dir / self.fingerprint / doc_hash[:2] / doc_hash / f"{kind}-{param_hash}.pkl"
+
+    def _load(self, key: Tuple[str, str, str]) -> Any:
+        if not self._disk_available():
+            return _MISSING
+        path = self._path(key)
+        try:
+            with path.open("rb") as stream:
+                problem = _untrusted(path, os.fstat(stream.fileno()))
+                if problem:
+                    logger.warning("Ignoring artifact %s: %s", path, problem)
+                    return _MISSING
+                envelope = pickle.load(stream)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception as exc:  # pragma: no cover - corrupt or unreadable entry
+            logger.warning("Ignoring unreadable artifact %s: %s", path, exc)
+            return _MISSING
+        kind = key[1]
+        if envelope.get("version") != ARTIFACT_VERSIONS[kind] or envelope.get("fingerprint") != self.fingerprint:
+            return _MISSING
+        if self.max_age is not None and time.time() - envelope.get("created_at", 0.0) > self.max_age:
+            return _MISSING
+        return envelope.get("value")
+
+    def _save(self, key: Tuple[str, str, str], value: Any) -> None:
+        path = self._path(key)
+        envelope = {
+            "version": ARTIFACT_VERSIONS[key[1]],
+            "fingerprint": self.fingerprint,
+            "kind": key[1],
+            "created_at": time.time(),
+            "value": value,
+        }
+        try:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Write-then-rename so concurrent workers never read a truncated artifact (mkstemp is 0600).
+            handle, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "wb") as stream:
+                    pickle.dump(envelope, stream, protocol=pickle.HIGHEST_PROTOCOL)
+                    size = stream.tell()
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._disk_bytes += size
+        except Exception as exc:  # pragma: no cover - disk tier is best effort
+            logger.warning("Failed to persist artifact %s: %s", path, exc)
+
+
+def _untrusted(path: Path, stat: Optional[os.stat_result] = None) -> Optional[str]:
+    """Why ``path`` must not be unpickled from, or ``None`` if only the current user can write it."""
+
+    if not hasattr(os, "getuid"):  # pragma: no cover - no POSIX ownership to check
+        return None
+    stat = stat or path.stat()
+    if stat.st_uid != os.getuid():
+        return "is owned by another user"
+    if stat.st_mode & 0o022:
+        return "is writable by group or others"
+    return None
+
+
+__all__ = ["ARTIFACT_VERSIONS", "ArtifactStore", "document_hash", "settings_fingerprint"]
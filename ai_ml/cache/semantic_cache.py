@@ -0,0 +1,242 @@
+"""Semantic cache of question answers, scoped per document.
+
+The artifact store only reuses an answer when the question text matches exactly. Users
+often rephrase the same question about a document ("what's the budget?" / "what is the
+total budget"), and each rephrasing would otherwise cost a retrieval pass and a ``qa``
+model call. :class:`SemanticQACache` keeps, for each document hash, the questions
+already answered together with their unit-normalised embeddings. A new question reuses
+the stored answer and citations when its cosine similarity to a cached question reaches
+``threshold``:
+
+* a question that matches after case and whitespace normalisation is served without
+  embedding it at all;
+* entries expire ``ttl_seconds`` after they were stored. A lookup drops its document's
+  expired entries at once, and every document is swept on ``store`` and at least every
+  tenth of the TTL, so entries of documents nobody asks about again don't linger. The
+  least recently used entry is evicted once ``max_entries`` are held across all documents;
+* lookups, evictions, the entry count and the hit rate are exported as metrics, and
+  :meth:`stats` reports the same counts.
+
+The cache lives in memory only. The artifact store's disk tier still persists exact
+question matches across processes.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ai_ml.cache.artifact_store import document_hash
+from ai_ml.core.metrics import get_metrics_registry
+
+_REQUESTS = get_metrics_registry().counter(
+    "docuthinker_qa_cache_requests_total",
+    "Semantic QA cache lookups by outcome (exact_hit, semantic_hit, miss).",
+    ("result",),
+)
+_EVICTIONS = get_metrics_registry().counter(
+    "docuthinker_qa_cache_evictions_total",
+    "Semantic QA cache entries dropped, by reason (ttl, lru).",
+    ("reason",),
+)
+_ENTRIES = get_metrics_registry().gauge(
+    "docuthinker_qa_cache_entries",
+    "Questions currently held by the semantic QA cache.",
+)
+_HIT_RATIO = get_metrics_registry().gauge(
+    "docuthinker_qa_cache_hit_ratio",
+    "Share of semantic QA cache lookups served from the cache since the process started.",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class _Entry:
+    question: str
+    vector: List[float]
+    value: Any
+    stored_at: float
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """Outcome of :meth:`SemanticQACache.lookup`.
+
+    ``value`` is the cached answer payload on a hit, otherwise None. ``vector`` is the
+    query embedding computed for the lookup (None for exact hits); pass it on to retrieval
+    so a miss does not embed the question twice.
+    """
+
+    value: Any = None
+    question: Optional[str] = None
+    similarity: float = 0.0
+    vector: Optional[List[float]] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.value is not None
+
+
+class SemanticQACache:
+    """Answers keyed by ``(document hash, question)`` and matched by embedding similarity."""
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.92,
+        ttl_seconds: Optional[float] = 3600.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(0, max_entries)
+        self._clock = clock
+        # Global LRU order across documents; _by_document indexes the same entries per document.
+        self._lru: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._by_document: Dict[str, Dict[str, _Entry]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._next_sweep = 0.0
+
+    def lookup(self, document: str, question: str, *, embed_query: Callable[[str], Sequence[float]]) -> CacheLookup:
+        """Return the cached answer closest to ``question`` above ``threshold``, if any."""
+
+        doc_hash = document_hash(document)
+        normalized = _normalize(question)
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._expire_all(now)
+            else:
+                self._expire(doc_hash, now)
+            entry = self._by_document.get(doc_hash, {}).get(normalized)
+            if entry is not None:
+                self._lru.move_to_end((doc_hash, normalized))
+                self._record(hit=True)
+        if entry is not None:
+            _REQUESTS.inc(result="exact_hit")
+            return CacheLookup(value=entry.value, question=entry.question, similarity=1.0)
+
+        vector = _unit(embed_query(question))
+        best_key: Optional[str] = None
+        best: Optional[_Entry] = None
+        similarity = 0.0
+        with self._lock:
+            for key, candidate in self._by_document.get(doc_hash, {}).items():
+                score = sum(a * b for a, b in zip(vector, candidate.vector))
+                if score > similarity:
+                    best_key, best, similarity = key, candidate, score
+            hit = best is not None and similarity >= self.threshold
+            if hit:
+                self._lru.move_to_end((doc_hash, best_key))
+            self._record(hit=hit)
+        if best is not None and similarity >= self.threshold:
+            _REQUESTS.inc(result="semantic_hit")
+            return CacheLookup(value=best.value, question=best.question, similarity=round(similarity, 4), vector=vector)
+        _REQUESTS.inc(result="miss")
+        return CacheLookup(vector=vector)
+
+    def store(self, document: str, question: str, value: Any, *, vector: Sequence[float]) -> None:
+        """Cache ``value`` as the answer to ``question``; ``vector`` is its query embedding."""
+
+        if not self.max_entries:
+            return
+        doc_hash = document_hash(document)
+        normalized = _normalize(question)
+        entry = _Entry(question=question, vector=_unit(vector), value=value, stored_at=self._clock())
+        with self._lock:
+            self._expire_all(entry.stored_at)
+            self._by_document.setdefault(doc_hash, {})[normalized] = entry
+            self._lru[(doc_hash, normalized)] = entry
+            self._lru.move_to_end((doc_hash, normalized))
+            while len(self._lru) > self.max_entries:
+                (old_doc, old_question), _ = self._lru.popitem(last=False)
+                self._drop(old_doc, old_question)
+                _EVICTIONS.inc(reason="lru")
+            _ENTRIES.set(len(self._lru))
+
+    def invalidate(self, document: str) -> int:
+        """Forget every cached answer about ``document``; returns the number removed."""
+
+        doc_hash = document_hash(document)
+        with self._lock:
+            questions = list(self._by_document.pop(doc_hash, {}))
+            for question in questions:
+                self._lru.pop((doc_hash, question), None)
+            _ENTRIES.set(len(self._lru))
+        return len(questions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._by_document.clear()
+            _ENTRIES.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._lru),
+                "documents": len(self._by_document),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (callers hold self._lock)
+
+    def _record(self, *, hit: bool) -> None:
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+        _HIT_RATIO.set(self._hits / (self._hits + self._misses))
+
+    def _expire_all(self, now: float) -> None:
+        if self.ttl_seconds is None:
+            return
+        self._next_sweep = now + self.ttl_seconds / 10
+        for doc_hash in list(self._by_document):
+            self._expire(doc_hash, now)
+
+    def _expire(self, doc_hash: str, now: float) -> None:
+        if self.ttl_seconds is None:
+            return
+        entries = self._by_document.get(doc_hash, {})
+        stale = [question for question, entry in entries.items() if now - entry.stored_at > self.ttl_seconds]
+        for question in stale:
+            self._lru.pop((doc_hash, question), None)
+            self._drop(doc_hash, question)
+        if stale:
+            _EVICTIONS.inc(len(stale), reason="ttl")
+            _ENTRIES.set(len(self._lru))
+
+    def _drop(self, doc_hash: str, question: str) -> None:
+        entries = self._by_document.get(doc_hash)
+        if entries is None:
+            return
+        entries.pop(question, None)
+        if not entries:
+            del self._by_document[doc_hash]
+
+
+def _normalize(question: str) -> str:
+    return _WHITESPACE.sub(" ", question.casefold()).strip().rstrip("?!. ")
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    values = [float(value) for value in vector]
+    norm = math.sqrt(sum(value * value for value in values)) or 1.0
+    return [value / norm for value in values]
+
+
+__all__ = ["CacheLookup", "SemanticQACache"]
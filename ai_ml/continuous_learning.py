@@ -10,16 +10,33 @@ from langchain_community.vectorstores import FAISS
 
 logger = logging.getLogger(__name__)
 VECTOR_STORE_PATH = "vector_store.faiss"  # Persistent file for FAISS index
+FULL_VECTORS_DIR = "vector_store.vectors"  # Full-precision vectors for rescoring compact indexes
 
 from ai_ml.core import load_settings
+from ai_ml.vectorstores.faiss_index import (
+    FaissIndexConfig,
+    apply_search_params,
+    build_faiss_store,
+    empty_faiss_store,
+    ensure_index,
+)
+from ai_ml.vectorstores.quantization import prune_full_vectors
 
 
 # CONTINUOUS LEARNING MODULE - Allows the AI to learn from user interactions and feedback, and improve over time.
 
+def _index_config() -> FaissIndexConfig:
+    """
+    Index type, vector storage and search parameters for the store (DOCUTHINKER_FAISS_* settings).
+    """
+    return FaissIndexConfig.from_settings(load_settings(), rescore_dir=FULL_VECTORS_DIR)
+
+
 def load_vector_store() -> Tuple[FAISS, HuggingFaceEmbeddings]:
     """
     Loads the FAISS vector store if it exists; otherwise, creates a new one using a default embedding model.
     Uses 'sentence-transformers/all-MiniLM-L6-v2' as the default embedding model.
+    Search parameters (nprobe / efSearch) from the current settings are applied to the loaded index.
     """
     try:
         settings = load_settings()
@@ -27,9 +44,10 @@ def load_vector_store() -> Tuple[FAISS, HuggingFaceEmbeddings]:
         if os.path.exists(VECTOR_STORE_PATH):
             with open(VECTOR_STORE_PATH, "rb") as f:
                 vector_store = pickle.load(f)
+            apply_search_params(vector_store.index, _index_config())
             logger.info("Loaded existing vector store from %s.", VECTOR_STORE_PATH)
         else:
-            vector_store = FAISS.from_texts([], embeddings)
+            vector_store = empty_faiss_store(embeddings)
             logger.info("Created new vector store.")
         return vector_store, embeddings
     except Exception as e:
@@ -40,10 +58,12 @@ def load_vector_store() -> Tuple[FAISS, HuggingFaceEmbeddings]:
 def save_vector_store(vector_store: FAISS) -> None:
     """
     Saves the FAISS vector store to disk.
+    Full-precision vector files left behind by earlier index builds are removed afterwards.
     """
     try:
         with open(VECTOR_STORE_PATH, "wb") as f:
             pickle.dump(vector_store, f)
+        prune_full_vectors(FULL_VECTORS_DIR, keep=getattr(vector_store.index, "path", None))
         logger.info("Saved vector store to %s.", VECTOR_STORE_PATH)
     except Exception as e:
         logger.exception("Error saving vector store: %s", e)
@@ -54,10 +74,13 @@ def add_document(document: str, metadata: Optional[Dict] = None) -> None:
     """
     Adds a new document to the vector store along with optional metadata.
     For example, metadata can include 'id', 'source', and 'timestamp'.
+    Once the store reaches DOCUTHINKER_FAISS_MIN_VECTORS documents it is rebuilt (once) with the
+    configured ANN index type.
     """
     try:
-        vector_store, _ = load_vector_store()
+        vector_store, embeddings = load_vector_store()
         vector_store.add_texts([document], metadatas=[metadata] if metadata else None)
+        vector_store = ensure_index(vector_store, _index_config(), embeddings=embeddings)
         save_vector_store(vector_store)
         logger.info("Added new document to vector store. Metadata: %s", metadata)
     except Exception as e:
@@ -114,12 +137,22 @@ def update_document(document_id: str, new_document: str, metadata: Optional[Dict
                 new_texts.append(doc.page_content)
                 new_metadatas.append(doc.metadata)
         # Rebuild the vector store with existing documents except the one to update.
-        new_vector_store = FAISS.from_texts(new_texts, embeddings, metadatas=new_metadatas)
+        if new_texts:
+            new_vector_store = build_faiss_store(
+                new_texts,
+                embeddings.embed_documents(new_texts),
+                embeddings=embeddings,
+                metadatas=new_metadatas,
+                config=_index_config(),
+            )
+        else:
+            new_vector_store = empty_faiss_store(embeddings)
         # Ensure metadata includes the unique id.
         if metadata is None:
             metadata = {}
         metadata["id"] = document_id
         new_vector_store.add_texts([new_document], metadatas=[metadata])
+        new_vector_store = ensure_index(new_vector_store, _index_config(), embeddings=embeddings)
         save_vector_store(new_vector_store)
         logger.info("Updated document with id %s in the vector store.", document_id)
     except Exception as e:
@@ -138,7 +171,17 @@ def reindex_vector_store(new_embedding_model: str) -> None:
         texts = [doc.page_content for doc in vector_store.docstore._dict.values()]
         metadatas = [doc.metadata for doc in vector_store.docstore._dict.values()]
         new_embeddings = HuggingFaceEmbeddings(model_name=new_embedding_model)
-        new_vector_store = FAISS.from_texts(texts, new_embeddings, metadatas=metadatas)
+        if texts:
+            # Retrains IVF centroids / PQ codebooks on the new embedding space.
+            new_vector_store = build_faiss_store(
+                texts,
+                new_embeddings.embed_documents(texts),
+                embeddings=new_embeddings,
+                metadatas=metadatas,
+                config=_index_config(),
+            )
+        else:
+            new_vector_store = empty_faiss_store(new_embeddings)
         save_vector_store(new_vector_store)
         logger.info("Reindexed vector store with new embedding model: %s", new_embedding_model)
     except Exception as e:
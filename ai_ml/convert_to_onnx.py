@@ -29,6 +29,7 @@ def main():
         "onnx_models/discussion",
         "onnx_models/rag",
         "onnx_models/sentiment",
+        "onnx_models/reranker",
     ]
 
     translations = settings.translation_models
@@ -57,6 +58,10 @@ def main():
         run_conversion("distilbert-base-uncased-finetuned-sst-2-english", "sequence-classification",
                        "onnx_models/sentiment")
 
+        # Convert the cross-encoder reranker (point DOCUTHINKER_RERANKER_MODEL at this directory)
+        run_conversion(settings.reranker_model or "cross-encoder/ms-marco-MiniLM-L-6-v2", "sequence-classification",
+                       "onnx_models/reranker")
+
         # Convert Translation models for each target language
         for lang, model in translations.items():
             run_conversion(model, "translation", f"onnx_models/translation/{lang}")
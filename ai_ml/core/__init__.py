@@ -1,5 +1,6 @@
 """Core primitives for DocuThinker's AI/ML runtime."""
 
+from .metrics import MetricsRegistry, get_metrics_registry
 from .settings import Settings, load_settings
 
-__all__ = ["Settings", "load_settings"]
+__all__ = ["Settings", "load_settings", "MetricsRegistry", "get_metrics_registry"]
@@ -0,0 +1,136 @@
+"""Prompt templates shared by the service façade and the agentic pipeline.
+
+Keeping every template in one module lets caches fingerprint the exact prompts in use:
+editing any template here changes :func:`prompt_fingerprint` and therefore invalidates
+artifacts computed with the previous wording.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, Tuple
+
+# Every single-document template starts with this exact prefix, so consecutive calls about
+# one document (summary, bullets, recommendations, rewrite...) share a byte-identical
+# leading block that provider prompt caches can reuse. Keep task instructions after it.
+DOCUMENT_PREFIX = "Document:\n{document}\n\n"
+
+SUMMARY_PROMPT = DOCUMENT_PREFIX + "Summarize the document above. {style}\n\nSummary:"
+
+BULLET_SUMMARY_PROMPT = DOCUMENT_PREFIX + "Summarize the document above into crisp bullet points. {style}\n\nBullet Summary:"
+
+TOPICS_PROMPT = (
+    DOCUMENT_PREFIX + "List the top research-backed themes covered in the document above as short phrases.\n\nThemes:"
+)
+
+DISCUSSION_PROMPT = (
+    DOCUMENT_PREFIX + "Draft discussion prompts stimulating debate about the document above.\n"
+    "Return numbered items.\n\nDiscussion Prompts:"
+)
+
+RECOMMENDATIONS_PROMPT = (
+    DOCUMENT_PREFIX + "Provide actionable recommendations or next steps based on the document above."
+    "\n\nRecommendations:"
+)
+
+REFINE_SUMMARY_PROMPT = (
+    DOCUMENT_PREFIX + "Draft Summary:\n{summary}\n\n"
+    "Refine the draft summary to ensure fidelity with the document above,"
+    " keeping the tone professional.\n\nRefined Summary:"
+)
+
+REWRITE_PROMPT = (
+    DOCUMENT_PREFIX + "Rewrite the document above in the requested tone without losing critical details."
+    "\n\nTone: {tone}\n\nRewritten Text:"
+)
+
+SENTIMENT_PROMPT = (
+    DOCUMENT_PREFIX + "You are a sentiment analyst. Respond about the document above with compact JSON keys"
+    " label, confidence, rationale."
+)
+
+COMBINED_PROMPT_HEADER = (
+    DOCUMENT_PREFIX + "Analyse the document above for a combined report. "
+    "Respond with one minified JSON object with exactly these keys:\n"
+)
+COMBINED_PROMPT_FOOTER = "\nReturn strictly valid JSON, without markdown fences."
+COMBINED_FIELD_INSTRUCTIONS: Dict[str, str] = {
+    "summary": "summary: string, a balanced prose overview of the document.",
+    "bullet_summary": "bullet_summary: array of strings, crisp bullet points without leading markers. {style}",
+    "topics": "topics: array of strings, the top research-backed themes as short phrases.",
+    "sentiment": "sentiment: object with label (string), confidence (number from 0 to 1) and rationale (string).",
+    "recommendations": "recommendations: array of strings, actionable recommendations or next steps.",
+}
+
+RAG_SYSTEM_PROMPT = (
+    "You are an expert analyst. Always respond with minified JSON using keys: "
+    "general_overview, main_topics, supporting_context, question_answer, confidence."
+    " main_topics must be an array of short strings. supporting_context is an array of quotes."
+    " confidence is a number from 0 to 1 rating how fully the text supports your answer."
+)
+RAG_HUMAN_PROMPT = "{excerpt_label}:\n{context}\n\nUser question: {question}\nReturn strictly valid JSON, without markdown fences."
+
+QA_SYSTEM_PROMPT = (
+    "You answer questions about a document using only the numbered excerpts provided."
+    " Cite the excerpts you rely on as [n]. If the excerpts do not contain the answer, say so plainly."
+)
+QA_HUMAN_PROMPT = "Excerpts:\n{context}\n\nQuestion: {question}\nAnswer:"
+
+CHAT_SYSTEM_PROMPT = "You are DocuThinker, a helpful assistant for questions about documents. Answer concisely."
+CHAT_DOCUMENT_SYSTEM_PROMPT = (
+    CHAT_SYSTEM_PROMPT
+    + " Ground your answers in the numbered document excerpts below and cite them as [n]."
+    " If they do not contain the answer, say so plainly.\n\nExcerpts:\n{context}"
+)
+CHAT_SUMMARY_PROMPT = (
+    "Conversation summary so far:\n{summary}\n\nNew lines of conversation:\n{lines}\n\n"
+    "Update the summary so it keeps every fact, name, figure and open question a follow-up"
+    " answer could need, in at most {words} words.\n\nUpdated summary:"
+)
+
+
+def split_document_prefix(template: str) -> Tuple[str, str]:
+    """Split ``template`` into its :data:`DOCUMENT_PREFIX` and the task-specific remainder.
+
+    Templates that do not start with the prefix come back as ``("", template)``.
+    """
+
+    if template.startswith(DOCUMENT_PREFIX):
+        return DOCUMENT_PREFIX, template[len(DOCUMENT_PREFIX) :]
+    return "", template
+
+
+def prompt_fingerprint() -> str:
+    """Stable hash over every template in this module."""
+
+    digest = hashlib.sha256()
+    for name, value in sorted(globals().items()):
+        if name.isupper() and isinstance(value, (str, dict)):
+            digest.update(name.encode("utf-8"))
+            digest.update(repr(sorted(value.items()) if isinstance(value, dict) else value).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+__all__ = [
+    "DOCUMENT_PREFIX",
+    "SUMMARY_PROMPT",
+    "BULLET_SUMMARY_PROMPT",
+    "TOPICS_PROMPT",
+    "DISCUSSION_PROMPT",
+    "RECOMMENDATIONS_PROMPT",
+    "REFINE_SUMMARY_PROMPT",
+    "REWRITE_PROMPT",
+    "SENTIMENT_PROMPT",
+    "COMBINED_PROMPT_HEADER",
+    "COMBINED_PROMPT_FOOTER",
+    "COMBINED_FIELD_INSTRUCTIONS",
+    "RAG_SYSTEM_PROMPT",
+    "RAG_HUMAN_PROMPT",
+    "QA_SYSTEM_PROMPT",
+    "QA_HUMAN_PROMPT",
+    "CHAT_SYSTEM_PROMPT",
+    "CHAT_DOCUMENT_SYSTEM_PROMPT",
+    "CHAT_SUMMARY_PROMPT",
+    "prompt_fingerprint",
+    "split_document_prefix",
+]
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from functools import lru_cache
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+import json
 import os
 
 
@@ -15,6 +16,11 @@ def _env_flag(name: str, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_list(name: str) -> Tuple[str, ...]:
+    value = os.getenv(name, "")
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
 @dataclass(frozen=True)
 class ProviderSpec:
     """Describe how to instantiate a provider-backed LLM."""
@@ -24,6 +30,8 @@ class ProviderSpec:
     temperature: float = 0.2
     max_tokens: int | None = None
     extra: Dict[str, Any] = field(default_factory=dict)
+    # Tried in order when this provider errors or is slower than its tracked p95.
+    fallbacks: Tuple["ProviderSpec", ...] = ()
 
 
 DEFAULT_TRANSLATION_MODELS: Dict[str, str] = {
@@ -37,6 +45,17 @@ DEFAULT_TRANSLATION_MODELS: Dict[str, str] = {
 }
 
 
+# USD per million (prompt, completion) tokens, used to estimate the cost of a pipeline run.
+DEFAULT_MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+}
+
+
 @dataclass(frozen=True)
 class Settings:
     """Container for all runtime knobs used across the AI subsystem."""
@@ -60,6 +79,151 @@ class Settings:
     chroma_persist_directory: str | None = None
     chroma_collection_name: str = "docuthinker"
     vector_top_k: int = 6
+    warmup_on_startup: bool = True
+    warmup_languages: Tuple[str, ...] = ()
+    warmup_ping_llms: bool = True
+    model_pricing: Dict[str, Tuple[float, float]] = field(default_factory=lambda: DEFAULT_MODEL_PRICING.copy())
+    llm_provider_override: str | None = None
+    crew_process: str = "sequential"
+    # "deep" keeps the full pipeline for callers that don't choose; "standard" is opt-in.
+    analysis_mode: str = "deep"
+    short_document_chars: int = 6_000
+    fast_direct_max_chars: int = 24_000
+    crew_confidence_threshold: float = 0.7
+    crew_max_workers: int = 4
+    replay_mode: str | None = None
+    replay_dir: str = "~/.docuthinker/replay"
+    retrieval_mode: str = "hybrid"
+    retrieval_candidates: int = 20
+    rrf_k: int = 60
+    context_tokens: int = 1500
+    mmr_lambda: float = 0.7
+    similarity_cutoff: float | None = None
+    reranker_model: str | None = None
+    reranker_backend: str = "torch"
+    reranker_batch_size: int = 32
+    reranker_cache_size: int = 4096
+    faiss_index_type: str = "flat"
+    faiss_nlist: int | None = None
+    faiss_nprobe: int = 8
+    faiss_hnsw_m: int = 32
+    faiss_ef_search: int = 64
+    faiss_pq_m: int | None = None
+    faiss_train_sample: int = 50_000
+    faiss_min_vectors: int = 10_000
+    faiss_storage: str = "float32"
+    faiss_dimensions: int | None = None
+    faiss_reduction: str = "pca"
+    faiss_rescore_factor: int = 4
+    artifact_cache_dir: str | None = None
+    artifact_memory_items: int = 256
+    artifact_max_age: float | None = 7 * 24 * 3600.0
+    artifact_max_mb: float | None = 2048.0
+    qa_cache_size: int = 1024
+    qa_cache_threshold: float = 0.92
+    qa_cache_ttl: float | None = 3600.0
+    hedge_requests: bool = True
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    circuit_breaker: bool = True
+    circuit_failure_rate: float = 0.5
+    circuit_window: int = 20
+    circuit_min_calls: int = 5
+    circuit_open_seconds: float = 30.0
+    circuit_probes: int = 1
+    chat_memory: str = "summary"
+    chat_history_tokens: int = 1500
+    chat_max_sessions: int = 256
+    chat_session_ttl: float | None = 1800.0
+    chat_session_dir: str | None = None
+    chat_context_tokens: int = 800
+    voice_stt: str = "text"
+    voice_stt_model: str | None = None
+    voice_tts: str = "silence"
+    voice_sample_rate: int = 16000
+    voice_min_sentence_chars: int = 24
+    voice_max_sentence_chars: int = 240
+    voice_token_timeout: float | None = 60.0
+    coalesce_requests: bool = True
+    admission_control: bool = True
+    admission_interactive_concurrency: int = 16
+    admission_interactive_queue: int = 64
+    admission_interactive_timeout: float = 5.0
+    admission_batch_concurrency: int = 4
+    admission_batch_queue: int = 16
+    admission_batch_timeout: float = 30.0
+    job_db: str = "~/.cache/docuthinker/jobs.sqlite3"
+    job_workers: int = 2
+    job_concurrency: Dict[str, int] = field(default_factory=dict)
+    job_poll_seconds: float = 1.0
+    job_lease_seconds: float = 60.0
+    job_max_attempts: int = 3
+    job_run_in_server: bool = False
+    job_retention: float | None = 7 * 24 * 3600.0
+
+
+def force_agent_provider(
+    agent_models: Dict[str, ProviderSpec],
+    provider: str,
+    extra: Dict[str, Any] | None = None,
+) -> Dict[str, ProviderSpec]:
+    """Point every agent role at ``provider``, keeping each role's model name and sampling knobs."""
+
+    def force(spec: ProviderSpec) -> ProviderSpec:
+        return replace(
+            spec,
+            provider=provider,
+            extra={**spec.extra, **(extra or {})},
+            fallbacks=tuple(force(fallback) for fallback in spec.fallbacks),
+        )
+
+    return {role: force(spec) for role, spec in agent_models.items()}
+
+
+def attach_fallbacks(agent_models: Dict[str, ProviderSpec], chains: Dict[str, Any]) -> Dict[str, ProviderSpec]:
+    """Give each role the ``provider:model`` fallback chain listed for it (``*`` applies to the rest).
+
+    Fallbacks inherit the role's sampling knobs and ``extra`` options.
+    """
+
+    def chain(spec: ProviderSpec, entries: Any) -> Tuple[ProviderSpec, ...]:
+        fallbacks = []
+        for entry in entries:
+            provider, _, model = str(entry).partition(":")
+            if not model:
+                raise ValueError(f"Fallback '{entry}' must be written as provider:model.")
+            fallbacks.append(replace(spec, provider=provider.strip().lower(), model=model.strip(), fallbacks=()))
+        return tuple(fallbacks)
+
+    default = chains.get("*", ())
+    return {role: replace(spec, fallbacks=chain(spec, chains.get(role, default))) for role, spec in agent_models.items()}
+
+
+def _prompt_cache_option() -> bool | str:
+    """``DOCUTHINKER_PROMPT_CACHE``: on by default; ``0``/``off`` disables it, a TTL such as ``1h`` sets the lifetime."""
+
+    value = os.getenv("DOCUTHINKER_PROMPT_CACHE", "on").strip().lower()
+    if value in {"0", "false", "no", "off", ""}:
+        return False
+    if value in {"1", "true", "yes", "on"}:
+        return True
+    return value
+
+
+def _fake_provider_options() -> Dict[str, Any]:
+    # Without DOCUTHINKER_FAKE_SCRIPT the fake provider keeps its own default script.
+    options: Dict[str, Any] = {}
+    if os.getenv("DOCUTHINKER_FAKE_SCRIPT"):
+        options["script"] = os.environ["DOCUTHINKER_FAKE_SCRIPT"]
+    if os.getenv("DOCUTHINKER_FAKE_LATENCY"):
+        options["latency"] = os.environ["DOCUTHINKER_FAKE_LATENCY"]
+    if os.getenv("DOCUTHINKER_FAKE_TOKENS_PER_SECOND"):
+        options["tokens_per_second"] = float(os.environ["DOCUTHINKER_FAKE_TOKENS_PER_SECOND"])
+    if os.getenv("DOCUTHINKER_FAKE_ERROR_RATE"):
+        options["error_rate"] = float(os.environ["DOCUTHINKER_FAKE_ERROR_RATE"])
+    if os.getenv("DOCUTHINKER_FAKE_SEED"):
+        options["seed"] = int(os.environ["DOCUTHINKER_FAKE_SEED"])
+    return options
 
 
 @lru_cache(maxsize=1)
@@ -86,6 +250,12 @@ def load_settings() -> Settings:
     chroma_collection = os.getenv("DOCUTHINKER_CHROMA_COLLECTION", "docuthinker")
     vector_top_k = int(os.getenv("DOCUTHINKER_VECTOR_TOP_K", "6"))
 
+    model_pricing = DEFAULT_MODEL_PRICING.copy()
+    pricing_override = os.getenv("DOCUTHINKER_MODEL_PRICING")
+    if pricing_override:
+        # JSON object mapping model name to [prompt_usd_per_mtok, completion_usd_per_mtok].
+        model_pricing.update({name: (float(p), float(c)) for name, (p, c) in json.loads(pricing_override).items()})
+
     agent_models: Dict[str, ProviderSpec] = {
         "analyst": ProviderSpec(provider="openai", model=analyst_model, temperature=0.15, max_tokens=900),
         "researcher": ProviderSpec(provider="google", model=researcher_model, temperature=0.2, max_tokens=1024),
@@ -93,6 +263,19 @@ def load_settings() -> Settings:
         "sentiment": ProviderSpec(provider="anthropic", model=sentiment_model, temperature=0.05, max_tokens=512),
         "qa": ProviderSpec(provider="openai", model=qa_model, temperature=0.05, max_tokens=900),
     }
+    prompt_cache = _prompt_cache_option()
+    if prompt_cache:
+        # Read by LLMProviderRegistry.prompt_cache_control; providers without explicit markers ignore it.
+        agent_models = {role: replace(spec, extra={**spec.extra, "prompt_cache": prompt_cache}) for role, spec in agent_models.items()}
+    fallbacks = os.getenv("DOCUTHINKER_FALLBACKS")
+    if fallbacks:
+        # JSON object mapping role (or "*") to ["provider:model", ...], e.g. {"reviewer": ["openai:gpt-4o"]}.
+        agent_models = attach_fallbacks(agent_models, json.loads(fallbacks))
+    provider_override = os.getenv("DOCUTHINKER_LLM_PROVIDER")
+    if provider_override:
+        # e.g. "fake" for load tests; DOCUTHINKER_FAKE_* shape its latency, throughput and errors.
+        extra = _fake_provider_options() if provider_override.lower() == "fake" else None
+        agent_models = force_agent_provider(agent_models, provider_override.lower(), extra)
 
     return Settings(
         agent_models=agent_models,
@@ -116,4 +299,84 @@ def load_settings() -> Settings:
         chroma_persist_directory=chroma_persist_directory,
         chroma_collection_name=chroma_collection,
         vector_top_k=vector_top_k,
+        warmup_on_startup=_env_flag("DOCUTHINKER_WARMUP_ON_STARTUP", True),
+        warmup_languages=_env_list("DOCUTHINKER_WARMUP_LANGS"),
+        warmup_ping_llms=_env_flag("DOCUTHINKER_WARMUP_PING_LLMS", True),
+        model_pricing=model_pricing,
+        llm_provider_override=provider_override,
+        analysis_mode=os.getenv("DOCUTHINKER_ANALYSIS_MODE", "deep").strip().lower(),
+        short_document_chars=int(os.getenv("DOCUTHINKER_SHORT_DOC_CHARS", "6000")),
+        fast_direct_max_chars=int(os.getenv("DOCUTHINKER_FAST_DIRECT_MAX_CHARS", "24000")),
+        crew_confidence_threshold=float(os.getenv("DOCUTHINKER_CREW_CONFIDENCE", "0.7")),
+        crew_process=os.getenv("DOCUTHINKER_CREW_PROCESS", "sequential").strip().lower(),
+        crew_max_workers=int(os.getenv("DOCUTHINKER_CREW_WORKERS", "4")),
+        replay_mode=os.getenv("DOCUTHINKER_REPLAY_MODE"),
+        replay_dir=os.getenv("DOCUTHINKER_REPLAY_DIR", "~/.docuthinker/replay"),
+        retrieval_mode=os.getenv("DOCUTHINKER_RETRIEVAL_MODE", "hybrid").strip().lower(),
+        retrieval_candidates=int(os.getenv("DOCUTHINKER_RETRIEVAL_CANDIDATES", "20")),
+        rrf_k=int(os.getenv("DOCUTHINKER_RRF_K", "60")),
+        context_tokens=int(os.getenv("DOCUTHINKER_CONTEXT_TOKENS", "1500")),
+        mmr_lambda=float(os.getenv("DOCUTHINKER_MMR_LAMBDA", "0.7")),
+        similarity_cutoff=float(os.environ["DOCUTHINKER_SIMILARITY_CUTOFF"]) if os.getenv("DOCUTHINKER_SIMILARITY_CUTOFF") else None,
+        reranker_model=os.getenv("DOCUTHINKER_RERANKER_MODEL") or None,
+        reranker_backend=os.getenv("DOCUTHINKER_RERANKER_BACKEND", "torch").strip().lower(),
+        reranker_batch_size=int(os.getenv("DOCUTHINKER_RERANKER_BATCH_SIZE", "32")),
+        reranker_cache_size=int(os.getenv("DOCUTHINKER_RERANKER_CACHE_SIZE", "4096")),
+        faiss_index_type=os.getenv("DOCUTHINKER_FAISS_INDEX", "flat").strip().lower(),
+        faiss_nlist=int(os.environ["DOCUTHINKER_FAISS_NLIST"]) if os.getenv("DOCUTHINKER_FAISS_NLIST") else None,
+        faiss_nprobe=int(os.getenv("DOCUTHINKER_FAISS_NPROBE", "8")),
+        faiss_hnsw_m=int(os.getenv("DOCUTHINKER_FAISS_HNSW_M", "32")),
+        faiss_ef_search=int(os.getenv("DOCUTHINKER_FAISS_EF_SEARCH", "64")),
+        faiss_pq_m=int(os.environ["DOCUTHINKER_FAISS_PQ_M"]) if os.getenv("DOCUTHINKER_FAISS_PQ_M") else None,
+        faiss_train_sample=int(os.getenv("DOCUTHINKER_FAISS_TRAIN_SAMPLE", "50000")),
+        faiss_min_vectors=int(os.getenv("DOCUTHINKER_FAISS_MIN_VECTORS", "10000")),
+        faiss_storage=os.getenv("DOCUTHINKER_FAISS_STORAGE", "float32").strip().lower(),
+        faiss_dimensions=int(os.environ["DOCUTHINKER_FAISS_DIMENSIONS"]) if os.getenv("DOCUTHINKER_FAISS_DIMENSIONS") else None,
+        faiss_reduction=os.getenv("DOCUTHINKER_FAISS_REDUCTION", "pca").strip().lower(),
+        faiss_rescore_factor=int(os.getenv("DOCUTHINKER_FAISS_RESCORE", "4")),
+        artifact_cache_dir=os.getenv("DOCUTHINKER_ARTIFACT_DIR"),
+        artifact_memory_items=int(os.getenv("DOCUTHINKER_ARTIFACT_MEMORY_ITEMS", "256")),
+        artifact_max_age=float(os.getenv("DOCUTHINKER_ARTIFACT_MAX_AGE", str(7 * 24 * 3600))) or None,
+        artifact_max_mb=float(os.getenv("DOCUTHINKER_ARTIFACT_MAX_MB", "2048")) or None,
+        qa_cache_size=int(os.getenv("DOCUTHINKER_QA_CACHE_SIZE", "1024")),
+        qa_cache_threshold=float(os.getenv("DOCUTHINKER_QA_CACHE_THRESHOLD", "0.92")),
+        qa_cache_ttl=float(os.getenv("DOCUTHINKER_QA_CACHE_TTL", "3600")) or None,
+        hedge_requests=_env_flag("DOCUTHINKER_HEDGE", True),
+        hedge_quantile=float(os.getenv("DOCUTHINKER_HEDGE_QUANTILE", "0.95")),
+        hedge_min_samples=int(os.getenv("DOCUTHINKER_HEDGE_MIN_SAMPLES", "20")),
+        circuit_breaker=_env_flag("DOCUTHINKER_CIRCUIT_BREAKER", True),
+        circuit_failure_rate=float(os.getenv("DOCUTHINKER_CIRCUIT_FAILURE_RATE", "0.5")),
+        circuit_window=int(os.getenv("DOCUTHINKER_CIRCUIT_WINDOW", "20")),
+        circuit_min_calls=int(os.getenv("DOCUTHINKER_CIRCUIT_MIN_CALLS", "5")),
+        circuit_open_seconds=float(os.getenv("DOCUTHINKER_CIRCUIT_OPEN_SECONDS", "30")),
+        circuit_probes=int(os.getenv("DOCUTHINKER_CIRCUIT_PROBES", "1")),
+        chat_memory=os.getenv("DOCUTHINKER_CHAT_MEMORY", "summary").strip().lower(),
+        chat_history_tokens=int(os.getenv("DOCUTHINKER_CHAT_HISTORY_TOKENS", "1500")),
+        chat_max_sessions=int(os.getenv("DOCUTHINKER_CHAT_MAX_SESSIONS", "256")),
+        chat_session_ttl=float(os.getenv("DOCUTHINKER_CHAT_SESSION_TTL", "1800")) or None,
+        chat_session_dir=os.getenv("DOCUTHINKER_CHAT_SESSION_DIR"),
+        chat_context_tokens=int(os.getenv("DOCUTHINKER_CHAT_CONTEXT_TOKENS", "800")),
+        voice_stt=os.getenv("DOCUTHINKER_VOICE_STT", "text").strip().lower(),
+        voice_stt_model=os.getenv("DOCUTHINKER_VOICE_STT_MODEL"),
+        voice_tts=os.getenv("DOCUTHINKER_VOICE_TTS", "silence").strip().lower(),
+        voice_sample_rate=int(os.getenv("DOCUTHINKER_VOICE_SAMPLE_RATE", "16000")),
+        voice_min_sentence_chars=int(os.getenv("DOCUTHINKER_VOICE_MIN_SENTENCE_CHARS", "24")),
+        voice_max_sentence_chars=int(os.getenv("DOCUTHINKER_VOICE_MAX_SENTENCE_CHARS", "240")),
+        voice_token_timeout=float(os.getenv("DOCUTHINKER_VOICE_TOKEN_TIMEOUT", "60")) or None,
+        coalesce_requests=_env_flag("DOCUTHINKER_COALESCE_REQUESTS", True),
+        admission_control=_env_flag("DOCUTHINKER_ADMISSION_CONTROL", True),
+        admission_interactive_concurrency=max(1, int(os.getenv("DOCUTHINKER_INTERACTIVE_CONCURRENCY", "16"))),
+        admission_interactive_queue=int(os.getenv("DOCUTHINKER_INTERACTIVE_QUEUE", "64")),
+        admission_interactive_timeout=float(os.getenv("DOCUTHINKER_INTERACTIVE_QUEUE_TIMEOUT", "5")),
+        admission_batch_concurrency=max(1, int(os.getenv("DOCUTHINKER_BATCH_CONCURRENCY", "4"))),
+        admission_batch_queue=int(os.getenv("DOCUTHINKER_BATCH_QUEUE", "16")),
+        admission_batch_timeout=float(os.getenv("DOCUTHINKER_BATCH_QUEUE_TIMEOUT", "30")),
+        job_db=os.getenv("DOCUTHINKER_JOB_DB", "~/.cache/docuthinker/jobs.sqlite3"),
+        job_workers=int(os.getenv("DOCUTHINKER_JOB_WORKERS", "2")),
+        job_concurrency={name: int(count) for name, count in json.loads(os.getenv("DOCUTHINKER_JOB_CONCURRENCY", "{}")).items()},
+        job_poll_seconds=float(os.getenv("DOCUTHINKER_JOB_POLL_SECONDS", "1")),
+        job_lease_seconds=float(os.getenv("DOCUTHINKER_JOB_LEASE_SECONDS", "60")),
+        job_max_attempts=int(os.getenv("DOCUTHINKER_JOB_MAX_ATTEMPTS", "3")),
+        job_run_in_server=_env_flag("DOCUTHINKER_JOB_RUN_IN_SERVER", False),
+        job_retention=float(os.getenv("DOCUTHINKER_JOB_RETENTION", str(7 * 24 * 3600))) or None,
     )
@@ -0,0 +1,97 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When a popular document is shared, many clients ask for the same analysis within seconds,
+and each of them would run its own pipeline and pay for the same LLM calls. The artifact
+store only helps once the first run has finished. :class:`SingleFlight` closes that
+window. The first caller for a key runs the computation, and every caller that arrives
+with the same key while it is in flight waits for that run instead of starting another:
+
+* followers receive their own deep copy of the result, so no caller can mutate another's;
+* if the computation raises, every caller waiting for it gets the same exception. The key
+  is released either way, so the next call starts fresh;
+* leaders, coalesced followers and distinct in-flight computations are exported as
+  metrics, per operation.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from ai_ml.core.metrics import get_metrics_registry
+
+T = TypeVar("T")
+
+_REQUESTS = get_metrics_registry().counter(
+    "docuthinker_coalesce_requests_total",
+    "Calls by whether they ran the computation (leader) or shared an in-flight one (coalesced).",
+    ("operation", "result"),
+)
+_IN_FLIGHT = get_metrics_registry().gauge(
+    "docuthinker_coalesce_in_flight",
+    "Distinct computations currently in flight, by operation.",
+    ("operation",),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers share its result."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, operation: str, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of the call already running for ``(operation, key)``."""
+
+        slot = (operation, key)
+        with self._lock:
+            call = self._calls.get(slot)
+            leader = call is None
+            if leader:
+                call = self._calls[slot] = _Call()
+            else:
+                call.followers += 1
+        if not leader:
+            _REQUESTS.inc(operation=operation, result="coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        _REQUESTS.inc(operation=operation, result="leader")
+        _IN_FLIGHT.inc(operation=operation)
+        result: Any = None
+        try:
+            result = fn()
+            return result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[slot]
+                followers = call.followers
+            if followers and call.error is None:
+                # Snapshot before the leader's caller can touch the result.
+                call.result = copy.deepcopy(result)
+            call.done.set()
+            _IN_FLIGHT.dec(operation=operation)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+__all__ = ["SingleFlight"]
@@ -6,7 +6,7 @@ from .key_ideas_extractor import generate_key_ideas
 from .recommendations_generator import generate_recommendations
 from .refine_summary import refine_summary
 from .rewriter import rewrite_document
-from .voice_chat import voice_chat
+from .voice_chat import stream_voice_chat, voice_chat
 
 __all__ = [
     "generate_bullet_summary",
@@ -17,4 +17,5 @@ __all__ = [
     "chat_with_ai",
     "build_conversation_chain",
     "voice_chat",
+    "stream_voice_chat",
 ]
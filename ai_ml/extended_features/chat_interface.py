@@ -12,11 +12,24 @@ def build_conversation_chain() -> ConversationChain:
     return service.create_conversation_chain()
 
 
-def chat_with_ai(user_input: str, conversation_chain: ConversationChain | None = None) -> str:
-    chain = conversation_chain or build_conversation_chain()
+def chat_with_ai(
+    user_input: str,
+    conversation_chain: ConversationChain | None = None,
+    *,
+    session_id: str | None = None,
+    document: str | None = None,
+) -> str:
+    """Reply to ``user_input``; pass the same ``session_id`` across turns to keep context.
+
+    Without an explicit ``conversation_chain`` the turn goes through the service's pooled
+    chat sessions, which bound the history sent with each turn. ``document`` grounds the
+    session in that document's most relevant excerpts.
+    """
+
     try:
-        response = chain.run(input=user_input)
-        return response.strip()
+        if conversation_chain is not None:
+            return conversation_chain.run(input=user_input).strip()
+        return get_document_service().chat(user_input, session_id=session_id, document=document)["response"]
     except Exception as exc:  # pragma: no cover - runtime safety
         return f"Unable to respond: {exc}"
 
@@ -1,16 +1,28 @@
-"""Voice chat stubs that hook into the shared conversation chain."""
+"""Voice chat over the shared document service.
+
+:func:`stream_voice_chat` streams the reply as audio, sentence by sentence, through the
+STT/TTS backends configured in settings (see :mod:`.voice_streaming`). :func:`voice_chat`
+keeps the single-call interface and collects that stream.
+"""
 
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import threading
+from typing import Iterable, Optional
+from uuid import uuid4
 
 from langchain.chains import ConversationChain
 
-from .chat_interface import build_conversation_chain
+from ai_ml.services import get_document_service
+
+from .voice_streaming import StreamingVoicePipeline, VoiceTurn
 
 logger = logging.getLogger(__name__)
 
+_PIPELINE: Optional[StreamingVoicePipeline] = None
+_PIPELINE_LOCK = threading.Lock()
+
 
 def voice_to_text(audio_data: bytes) -> str:
     """Convert audio payloads to text. Replace with the desired STT engine."""
@@ -26,17 +38,55 @@ def text_to_voice(text: str) -> bytes:
     return b"STUB: audio bytes"
 
 
+def voice_pipeline() -> StreamingVoicePipeline:
+    """The process-wide pipeline built from the service settings."""
+
+    global _PIPELINE
+    with _PIPELINE_LOCK:
+        if _PIPELINE is None:
+            _PIPELINE = StreamingVoicePipeline.from_settings(get_document_service().settings)
+        return _PIPELINE
+
+
+def stream_voice_chat(
+    audio: Iterable[bytes],
+    *,
+    session_id: Optional[str] = None,
+    document: Optional[str] = None,
+    pipeline: Optional[StreamingVoicePipeline] = None,
+) -> VoiceTurn:
+    """One voice turn in a chat session; iterate the result for the reply audio.
+
+    ``audio`` may be a live stream of chunks. Turns share the service's chat sessions, so
+    pass the returned ``session_id`` to continue the conversation; ``document`` grounds
+    the session in that document, as with text chat.
+    """
+
+    service = get_document_service()
+    session_id = session_id or str(uuid4())
+    return (pipeline or voice_pipeline()).run(
+        audio,
+        lambda transcript: service.stream_chat(transcript, session_id=session_id, document=document),
+        session_id=session_id,
+    )
+
+
 def voice_chat(audio_data: bytes, conversation_chain: Optional[ConversationChain] = None) -> bytes:
-    """Bridge speech input/output with the document-aware conversation chain."""
+    """Bridge speech input/output with the document-aware conversation chain.
+
+    Without an explicit ``conversation_chain`` the reply goes through
+    :func:`stream_voice_chat` and its audio chunks are joined.
+    """
 
-    chain = conversation_chain or build_conversation_chain()
     try:
-        user_text = voice_to_text(audio_data)
-        ai_response = chain.run(input=user_text)
-        return text_to_voice(ai_response)
+        if conversation_chain is not None:
+            user_text = voice_to_text(audio_data)
+            ai_response = conversation_chain.run(input=user_text)
+            return text_to_voice(ai_response)
+        return b"".join(stream_voice_chat([audio_data]))
     except Exception as exc:  # pragma: no cover - runtime safety
         logger.exception("Voice chat failed: %s", exc)
         return b""
 
 
-__all__ = ["voice_chat", "voice_to_text", "text_to_voice"]
+__all__ = ["stream_voice_chat", "voice_chat", "voice_pipeline", "voice_to_text", "text_to_voice"]
@@ -0,0 +1,351 @@
+"""Streaming voice pipeline: chunked audio in, incremental speech out.
+
+The serial voice chat waits for the whole transcript, then the whole LLM reply, then
+synthesizes the whole reply, so the user hears nothing until every stage has finished.
+:class:`StreamingVoicePipeline` overlaps the stages instead:
+
+* the speech-to-text backend consumes the audio chunks as they arrive;
+* the reply is streamed token by token on a producer thread, so generation keeps going
+  while earlier sentences are being synthesized;
+* :class:`SentenceChunker` cuts the token stream at sentence boundaries. Each sentence is
+  handed to the text-to-speech backend as soon as it is complete, and its audio is
+  yielded right away.
+
+Time to first audio therefore covers one sentence of generation and one synthesis call,
+not the whole reply. It is measured from the end of the input audio, reported per turn in
+:attr:`VoiceTurn.timings`, and exported as a histogram.
+
+Backends are pluggable through the :class:`SpeechToText` and :class:`TextToSpeech`
+protocols. The ``text`` STT and ``silence`` TTS stand-ins need no audio stack, and so
+keep tests and benchmarks offline. ``whisper`` runs a local Whisper model through
+``transformers``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol
+
+from ai_ml.core.metrics import get_metrics_registry
+from ai_ml.providers.registry import MissingDependencyError
+
+_VOICE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0)
+
+_FIRST_AUDIO = get_metrics_registry().histogram(
+    "docuthinker_voice_first_audio_seconds",
+    "Time from the end of the user's audio to the first synthesized audio chunk.",
+    buckets=_VOICE_BUCKETS,
+)
+_STAGE_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_voice_stage_seconds",
+    "Voice turn timings by stage (stt, first_token, total).",
+    ("stage",),
+    buckets=_VOICE_BUCKETS,
+)
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace,
+# or a line break. Requiring whitespace keeps "3.5" and "e.g.," intact.
+_BOUNDARY = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|\n+")
+
+_DONE = object()
+
+
+# ----------------------------------------------------------------------
+# Backends
+
+
+class SpeechToText(Protocol):
+    def transcribe(self, audio: Iterable[bytes]) -> str:
+        """Transcribe a stream of audio chunks; returns once the stream is exhausted."""
+
+
+class TextToSpeech(Protocol):
+    sample_rate: int
+
+    def synthesize(self, text: str) -> bytes:
+        """Audio for ``text``, as 16-bit mono PCM at :attr:`sample_rate`."""
+
+
+class TextSpeechToText:
+    """Stand-in STT whose "audio" chunks are UTF-8 text, e.g. from a typed fallback or a test."""
+
+    def transcribe(self, audio: Iterable[bytes]) -> str:
+        return b"".join(audio).decode("utf-8", errors="ignore").strip()
+
+
+class WhisperSpeechToText:
+    """Local Whisper transcription of 16-bit mono PCM chunks via ``transformers``."""
+
+    def __init__(self, model: str = "openai/whisper-small", *, sample_rate: int = 16000) -> None:
+        self.model = model
+        self.sample_rate = sample_rate
+        self._pipeline: Any = None
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: Iterable[bytes]) -> str:
+        import numpy as np
+
+        samples = np.frombuffer(b"".join(audio), dtype=np.int16).astype(np.float32) / 32768.0
+        if not samples.size:
+            return ""
+        return str(self._load()({"raw": samples, "sampling_rate": self.sample_rate})["text"]).strip()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._pipeline is None:
+                try:
+                    from transformers import pipeline
+                except ImportError as exc:  # pragma: no cover - optional dependency
+                    raise MissingDependencyError("Install transformers to use the Whisper speech-to-text backend.") from exc
+                self._pipeline = pipeline("automatic-speech-recognition", model=self.model)
+            return self._pipeline
+
+
+class SilenceTextToSpeech:
+    """Stand-in TTS: PCM silence lasting as long as the text takes to speak.
+
+    ``seconds_per_char`` adds a synthesis delay proportional to the text, for benchmarks.
+    """
+
+    def __init__(self, *, sample_rate: int = 16000, words_per_minute: int = 160, seconds_per_char: float = 0.0) -> None:
+        self.sample_rate = sample_rate
+        self.words_per_minute = max(1, words_per_minute)
+        self.seconds_per_char = seconds_per_char
+
+    def synthesize(self, text: str) -> bytes:
+        if self.seconds_per_char:
+            time.sleep(self.seconds_per_char * len(text))
+        seconds = len(text.split()) * 60.0 / self.words_per_minute
+        return bytes(2 * int(seconds * self.sample_rate))
+
+
+STT_BACKENDS: Dict[str, Callable[..., SpeechToText]] = {
+    "text": lambda **_: TextSpeechToText(),
+    "whisper": lambda model=None, sample_rate=16000: WhisperSpeechToText(model or "openai/whisper-small", sample_rate=sample_rate),
+}
+TTS_BACKENDS: Dict[str, Callable[..., TextToSpeech]] = {
+    "silence": lambda sample_rate=16000, **_: SilenceTextToSpeech(sample_rate=sample_rate),
+}
+
+
+# ----------------------------------------------------------------------
+# Sentence chunking
+
+
+class SentenceChunker:
+    """Cuts a token stream into sentences for incremental synthesis.
+
+    A sentence shorter than ``min_chars`` is held back and joined with the next one, so
+    short fragments ("Sure.") do not each cost a synthesis call. A buffer that reaches
+    ``max_chars`` without a boundary is cut at its last space.
+    """
+
+    def __init__(self, min_chars: int = 24, max_chars: int = 240) -> None:
+        self.min_chars = max(1, min_chars)
+        self.max_chars = max(self.min_chars, max_chars)
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences it completed."""
+
+        self._buffer += text
+        sentences: List[str] = []
+        while True:
+            cut = self._cut()
+            if cut is None:
+                return sentences
+            sentence, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> List[str]:
+        """The remaining text as a final sentence, if any."""
+
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+    def _cut(self) -> Optional[int]:
+        for match in _BOUNDARY.finditer(self._buffer):
+            if len(self._buffer[: match.end()].strip()) >= self.min_chars:
+                return match.end()
+        if len(self._buffer) >= self.max_chars:
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+
+
+@dataclass
+class VoiceTurn:
+    """One voice exchange; iterate it for the reply audio, chunk by chunk (once only).
+
+    ``transcript``, ``text``, ``sentences`` and ``timings`` are filled in as the iteration
+    proceeds. Timings are seconds from the end of the input audio until the transcript
+    (``stt``), the first reply token (``first_token``), the first audio chunk
+    (``first_audio``) and the last one (``total``).
+    """
+
+    session_id: Optional[str] = None
+    transcript: str = ""
+    text: str = ""
+    sentences: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    _audio: Optional[Iterator[bytes]] = field(default=None, repr=False)
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._audio is None:
+            raise RuntimeError("A VoiceTurn can only be iterated once.")
+        audio, self._audio = self._audio, None
+        return audio
+
+
+class StreamingVoicePipeline:
+    """Speech to text, streamed reply, sentence-by-sentence speech."""
+
+    def __init__(
+        self,
+        stt: Optional[SpeechToText] = None,
+        tts: Optional[TextToSpeech] = None,
+        *,
+        min_sentence_chars: int = 24,
+        max_sentence_chars: int = 240,
+        token_timeout: Optional[float] = 60.0,
+    ) -> None:
+        self.stt = stt or TextSpeechToText()
+        self.tts = tts or SilenceTextToSpeech()
+        self.min_sentence_chars = min_sentence_chars
+        self.max_sentence_chars = max_sentence_chars
+        # Longest wait for the next reply token before the turn fails; None waits forever.
+        self.token_timeout = token_timeout
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "StreamingVoicePipeline":
+        try:
+            stt = STT_BACKENDS[settings.voice_stt](model=settings.voice_stt_model, sample_rate=settings.voice_sample_rate)
+            tts = TTS_BACKENDS[settings.voice_tts](sample_rate=settings.voice_sample_rate)
+        except KeyError as exc:
+            raise ValueError(f"Unsupported voice backend {exc}.") from None
+        return cls(
+            stt,
+            tts,
+            min_sentence_chars=settings.voice_min_sentence_chars,
+            max_sentence_chars=settings.voice_max_sentence_chars,
+            token_timeout=settings.voice_token_timeout,
+        )
+
+    def run(
+        self,
+        audio: Iterable[bytes],
+        respond: Callable[[str], Iterable[str]],
+        *,
+        session_id: Optional[str] = None,
+    ) -> VoiceTurn:
+        """Start a turn: ``respond`` maps the transcript to a stream of reply text.
+
+        Nothing runs until the returned turn is iterated.
+        """
+
+        turn = VoiceTurn(session_id=session_id)
+        turn._audio = self._speak(turn, audio, respond)
+        return turn
+
+    def _speak(self, turn: VoiceTurn, audio: Iterable[bytes], respond: Callable[[str], Iterable[str]]) -> Iterator[bytes]:
+        input_end: List[float] = []
+
+        def chunks() -> Iterator[bytes]:
+            yield from audio
+            input_end.append(time.perf_counter())
+
+        turn.transcript = self.stt.transcribe(chunks())
+        transcribed = time.perf_counter()
+        origin = input_end[0] if input_end else transcribed
+        turn.timings["stt"] = transcribed - origin
+        _STAGE_SECONDS.observe(turn.timings["stt"], stage="stt")
+        if not turn.transcript:
+            return
+
+        tokens: "queue.Queue[Any]" = queue.Queue()
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_produce, respond, turn.transcript, tokens, stop),
+            name="voice-reply",
+            daemon=True,
+        )
+        producer.start()
+        chunker = SentenceChunker(self.min_sentence_chars, self.max_sentence_chars)
+        parts: List[str] = []
+        try:
+            while True:
+                try:
+                    item = tokens.get(timeout=self.token_timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No reply token within {self.token_timeout:g}s.") from None
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if not parts:
+                    turn.timings["first_token"] = time.perf_counter() - origin
+                    _STAGE_SECONDS.observe(turn.timings["first_token"], stage="first_token")
+                parts.append(item)
+                for sentence in chunker.feed(item):
+                    yield self._synthesize(turn, sentence, origin)
+            for sentence in chunker.flush():
+                yield self._synthesize(turn, sentence, origin)
+        finally:
+            stop.set()
+            turn.text = "".join(parts).strip()
+            if turn.sentences:
+                turn.timings["total"] = time.perf_counter() - origin
+                _STAGE_SECONDS.observe(turn.timings["total"], stage="total")
+
+    def _synthesize(self, turn: VoiceTurn, sentence: str, origin: float) -> bytes:
+        chunk = self.tts.synthesize(sentence)
+        turn.sentences.append(sentence)
+        if "first_audio" not in turn.timings:
+            turn.timings["first_audio"] = time.perf_counter() - origin
+            _FIRST_AUDIO.observe(turn.timings["first_audio"])
+        return chunk
+
+
+def _produce(respond: Callable[[str], Iterable[str]], transcript: str, tokens: "queue.Queue[Any]", stop: threading.Event) -> None:
+    stream: Any = None
+    try:
+        stream = iter(respond(transcript))
+        for piece in stream:
+            if stop.is_set():
+                break
+            if piece:
+                tokens.put(str(piece))
+    except BaseException as exc:  # forwarded to the consuming thread
+        tokens.put(exc)
+    finally:
+        try:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            tokens.put(_DONE)
+
+
+__all__ = [
+    "STT_BACKENDS",
+    "SentenceChunker",
+    "SilenceTextToSpeech",
+    "SpeechToText",
+    "StreamingVoicePipeline",
+    "TTS_BACKENDS",
+    "TextSpeechToText",
+    "TextToSpeech",
+    "VoiceTurn",
+    "WhisperSpeechToText",
+]
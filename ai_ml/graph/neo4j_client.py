@@ -5,11 +5,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional
 
-try:
-    from neo4j import GraphDatabase
-except ImportError:  # pragma: no cover - optional dependency
-    GraphDatabase = None  # type: ignore
-
 
 class Neo4jNotConfigured(RuntimeError):
     """Raised when the Neo4j integration is not available or configured."""
@@ -27,10 +22,12 @@ class Neo4jGraphClient:
     """Lightweight wrapper around the Neo4j Python driver."""
 
     def __init__(self, config: Neo4jConfig) -> None:
-        if GraphDatabase is None:
+        try:
+            from neo4j import GraphDatabase
+        except ImportError as exc:  # pragma: no cover - optional dependency
             raise Neo4jNotConfigured(
                 "neo4j driver is not installed. Install the 'neo4j' pip package to enable the knowledge graph."
-            )
+            ) from exc
         if not config.uri or not config.user or not config.password:
             raise Neo4jNotConfigured("Neo4j credentials are incomplete. Set URI, user, and password.")
         self._config = config
@@ -26,6 +26,12 @@ def main():
         help="Target language code for translation (e.g., 'fr', 'de', 'es', 'it', 'zh')",
         default="fr",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["fast", "standard", "deep"],
+        help="Analysis depth: fast skips the crew, deep always runs retrieval and the crew",
+        default=None,
+    )
     parser.add_argument("--doc_id", help="Optional identifier to attach to the document", default=None)
     parser.add_argument("--title", help="Optional title stored alongside the document", default=None)
     args = parser.parse_args()
@@ -48,6 +54,7 @@ def main():
         question=args.question,
         translate_lang=args.translate_lang,
         metadata=metadata or None,
+        mode=args.mode,
     )
 
     print("=== Agentic RAG Overview ===")
@@ -56,8 +63,11 @@ def main():
     print("\n=== Summary ===")
     print(results.get("summary"))
 
+    # Bullets and recommendations are not part of the agentic payload; fetch both in one call.
+    artifacts = backend.combined_analysis(document, fields=["bullet_summary", "recommendations"])
+
     print("\n=== Bullet Summary ===")
-    print(backend.generate_bullet_summary(document))
+    print(artifacts.get("bullet_summary"))
 
     print("\n=== Topics ===")
     print(results.get("topics"))
@@ -76,7 +86,7 @@ def main():
     print(results.get("discussion"))
 
     print("\n=== Recommendations ===")
-    print(backend.recommendations(document))
+    print(artifacts.get("recommendations"))
 
     print("\n=== Translation ({}) ===".format(args.translate_lang))
     print(results.get("translation"))
@@ -5,11 +5,6 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict
 
-try:
-    from transformers import pipeline
-except ImportError:  # pragma: no cover - optional dependency
-    pipeline = None  # type: ignore
-
 from ai_ml.core import load_settings
 logger = logging.getLogger(__name__)
 
@@ -53,8 +48,10 @@ def load_translation_model(target_lang: str):
     model_map = settings.translation_models
     if target_lang not in model_map:
         raise ValueError(f"Translation model for language '{target_lang}' is not configured.")
-    if pipeline is None:
-        raise RuntimeError("transformers is required to instantiate translation models.")
+    try:
+        from transformers import pipeline
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("transformers is required to instantiate translation models.") from exc
     model_name = model_map[target_lang]
     logger.info("Loading translator model for language '%s' (%s)...", target_lang, model_name)
     task_name = f"translation_en_to_{target_lang}"
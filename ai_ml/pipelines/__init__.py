@@ -1,5 +1,6 @@
 """Agentic LangGraph pipelines used by DocuThinker."""
 
-from .rag_graph import AgenticRAGPipeline
+from .rag_graph import ANALYSIS_MODES, AgenticRAGPipeline, AnalysisPolicy
+from .retrieval_qa import RetrievalQAPipeline
 
-__all__ = ["AgenticRAGPipeline"]
+__all__ = ["AgenticRAGPipeline", "AnalysisPolicy", "ANALYSIS_MODES", "RetrievalQAPipeline"]
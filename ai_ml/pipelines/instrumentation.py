@@ -0,0 +1,317 @@
+"""Timing, token and cost instrumentation for the agentic RAG pipeline.
+
+``UsageTracker`` is a LangChain callback handler collecting prompt/completion tokens and
+latency for every LLM call made during a single pipeline run. It also collects the prompt
+tokens a provider served from its prompt cache (``cached_tokens``) or wrote to it
+(``cache_write_tokens``). ``timed_stage`` wraps a
+LangGraph node to record its wall time. Both feed the process-wide metrics registry so
+``/metrics`` exposes the same data as histograms and counters.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ai_ml.core.metrics import DEFAULT_SIZE_BUCKETS, get_metrics_registry
+
+_METRICS = get_metrics_registry()
+STAGE_SECONDS = _METRICS.histogram(
+    "docuthinker_pipeline_stage_seconds",
+    "Wall time spent in each agentic pipeline stage.",
+    ["stage"],
+)
+LLM_CALL_SECONDS = _METRICS.histogram(
+    "docuthinker_llm_call_seconds",
+    "Latency of individual LLM calls.",
+    ["provider", "model"],
+)
+LLM_TOKENS = _METRICS.counter(
+    "docuthinker_llm_tokens_total",
+    "Tokens consumed by LLM calls.",
+    ["provider", "model", "kind"],
+)
+LLM_COST = _METRICS.counter(
+    "docuthinker_llm_cost_usd_total",
+    "Estimated LLM spend in USD.",
+    ["provider", "model"],
+)
+# Price multipliers on the prompt rate for (cache reads, cache writes), by provider prefix.
+CACHE_PRICE_MULTIPLIERS: Dict[str, Tuple[float, float]] = {
+    "anthropic": (0.10, 1.25),
+    "openai": (0.50, 1.00),
+    "google": (0.25, 1.00),
+}
+RETRIEVAL_DOCUMENTS = _METRICS.histogram(
+    "docuthinker_retrieval_documents",
+    "Number of chunks returned by a retrieval step.",
+    ["stage"],
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+RETRIEVAL_CONTEXT_CHARS = _METRICS.histogram(
+    "docuthinker_retrieval_context_chars",
+    "Characters of retrieved context sent to the model.",
+    ["stage"],
+    buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536),
+)
+
+
+class UsageTracker(BaseCallbackHandler):
+    """Collect per-call token usage, latency and estimated cost for one pipeline run."""
+
+    def __init__(self, pricing: Optional[Mapping[str, Tuple[float, float]]] = None) -> None:
+        super().__init__()
+        self.pricing = dict(pricing or {})
+        self.calls: List[Dict[str, Any]] = []
+        self._pending: Dict[UUID, Tuple[float, str, str]] = {}
+        self._lock = threading.Lock()
+
+    # -- LangChain callback hooks -------------------------------------------------
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(serialized, run_id, kwargs)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(serialized, run_id, kwargs)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens, cached_tokens, cache_write_tokens = _extract_token_usage(response)
+        with self._lock:
+            started, provider, model = self._pending.pop(run_id, (time.perf_counter(), "unknown", "unknown"))
+        # Routed models answer from whichever candidate won; bill that provider, not the primary.
+        provider, model = _routed_to(response) or (provider, model)
+        self.record(
+            provider=provider,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            cache_write_tokens=cache_write_tokens,
+            seconds=time.perf_counter() - started,
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            started, provider, model = self._pending.pop(run_id, (time.perf_counter(), "unknown", "unknown"))
+        LLM_CALL_SECONDS.observe(time.perf_counter() - started, provider=provider, model=model)
+
+    # -- Aggregation --------------------------------------------------------------
+
+    def record(
+        self,
+        *,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        seconds: Optional[float] = None,
+        stage: Optional[str] = None,
+    ) -> None:
+        """Record usage for one call; also used for usage reported outside LangChain (e.g. CrewAI).
+
+        ``cached_tokens`` and ``cache_write_tokens`` are the parts of ``prompt_tokens`` read
+        from or written to the provider's prompt cache.
+        """
+
+        cost = self.estimate_cost(
+            model,
+            prompt_tokens,
+            completion_tokens,
+            cached_tokens=cached_tokens,
+            cache_write_tokens=cache_write_tokens,
+            provider=provider,
+        )
+        call = {
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "cache_write_tokens": cache_write_tokens,
+            "cost_usd": cost,
+            "seconds": round(seconds, 4) if seconds is not None else None,
+            "stage": stage,
+        }
+        with self._lock:
+            self.calls.append(call)
+        if seconds is not None:
+            LLM_CALL_SECONDS.observe(seconds, provider=provider, model=model)
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, model=model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider=provider, model=model, kind="completion")
+        if cached_tokens:
+            LLM_TOKENS.inc(cached_tokens, provider=provider, model=model, kind="cache_read")
+        if cache_write_tokens:
+            LLM_TOKENS.inc(cache_write_tokens, provider=provider, model=model, kind="cache_write")
+        if cost:
+            LLM_COST.inc(cost, provider=provider, model=model)
+
+    def estimate_cost(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        *,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        provider: str = "",
+    ) -> float:
+        rates = self.pricing.get(model)
+        if rates is None:
+            # Dated snapshots ("gpt-4o-mini-2024-07-18") fall back to the longest priced prefix.
+            prefixes = [name for name in self.pricing if model.startswith(name)]
+            rates = self.pricing[max(prefixes, key=len)] if prefixes else None
+        if rates is None:
+            return 0.0
+        prompt_rate, completion_rate = rates
+        read_multiplier, write_multiplier = next(
+            (value for name, value in CACHE_PRICE_MULTIPLIERS.items() if provider.startswith(name)),
+            (1.0, 1.0),
+        )
+        uncached = max(0, prompt_tokens - cached_tokens - cache_write_tokens)
+        prompt_cost = prompt_rate * (
+            uncached + cached_tokens * read_multiplier + cache_write_tokens * write_multiplier
+        )
+        return round((prompt_cost + completion_tokens * completion_rate) / 1_000_000, 6)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+        by_model: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            bucket = by_model.setdefault(
+                f"{call['provider']}/{call['model']}",
+                {
+                    "calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "cache_write_tokens": 0,
+                    "cost_usd": 0.0,
+                    "seconds": 0.0,
+                },
+            )
+            bucket["calls"] += 1
+            bucket["prompt_tokens"] += call["prompt_tokens"]
+            bucket["completion_tokens"] += call["completion_tokens"]
+            bucket["cached_tokens"] += call["cached_tokens"]
+            bucket["cache_write_tokens"] += call["cache_write_tokens"]
+            bucket["cost_usd"] = round(bucket["cost_usd"] + call["cost_usd"], 6)
+            bucket["seconds"] = round(bucket["seconds"] + (call["seconds"] or 0.0), 4)
+        prompt_total = sum(call["prompt_tokens"] for call in calls)
+        completion_total = sum(call["completion_tokens"] for call in calls)
+        cached_total = sum(call["cached_tokens"] for call in calls)
+        return {
+            "llm_calls": len(calls),
+            "prompt_tokens": prompt_total,
+            "completion_tokens": completion_total,
+            "total_tokens": prompt_total + completion_total,
+            "cached_tokens": cached_total,
+            "cache_write_tokens": sum(call["cache_write_tokens"] for call in calls),
+            "cached_prompt_ratio": round(cached_total / prompt_total, 4) if prompt_total else 0.0,
+            "cost_usd": round(sum(call["cost_usd"] for call in calls), 6),
+            "by_model": by_model,
+        }
+
+    def _start(self, serialized: Optional[Dict[str, Any]], run_id: UUID, kwargs: Dict[str, Any]) -> None:
+        provider, model = _identify_model(serialized or {}, kwargs)
+        with self._lock:
+            self._pending[run_id] = (time.perf_counter(), provider, model)
+
+
+def timed_stage(name: str, node: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Wrap a LangGraph node so its wall time lands in ``state["timings"]`` and the stage histogram."""
+
+    @wraps(node)
+    def _wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = node(state)
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = dict(result.get("timings") or state.get("timings") or {})
+        timings[name] = round(elapsed, 4)
+        return {**result, "timings": timings}
+
+    return _wrapper
+
+
+def record_retrieval(stage: str, documents: Sequence[Any], *, context_chars: Optional[int] = None) -> Dict[str, int]:
+    """Observe retrieval size metrics and return them for the pipeline output.
+
+    ``context_chars`` overrides the summed chunk length when the prompt carries trimmed text.
+    """
+
+    if context_chars is None:
+        context_chars = sum(len(getattr(doc, "page_content", "") or "") for doc in documents)
+    RETRIEVAL_DOCUMENTS.observe(len(documents), stage=stage)
+    RETRIEVAL_CONTEXT_CHARS.observe(context_chars, stage=stage)
+    return {"documents": len(documents), "context_chars": context_chars}
+
+
+def _identify_model(serialized: Dict[str, Any], kwargs: Dict[str, Any]) -> Tuple[str, str]:
+    metadata = kwargs.get("metadata") or {}
+    params = kwargs.get("invocation_params") or {}
+    provider = metadata.get("ls_provider") or params.get("_type") or (serialized.get("id") or ["unknown"])[-1]
+    model = (
+        metadata.get("ls_model_name")
+        or params.get("model")
+        or params.get("model_name")
+        or (serialized.get("kwargs") or {}).get("model")
+        or "unknown"
+    )
+    return str(provider), str(model)
+
+
+def _routed_to(response: Any) -> Optional[Tuple[str, str]]:
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "response_metadata", None) or {}
+            routed = metadata.get("routed_to")
+            if routed:
+                return routed["provider"], routed["model"]
+    return None
+
+
+def _extract_token_usage(response: Any) -> Tuple[int, int, int, int]:
+    """``(prompt, completion, cache read, cache write)`` tokens of one LLM response."""
+
+    prompt_tokens = completion_tokens = cached_tokens = cache_write_tokens = 0
+    found = False
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                prompt_tokens += int(usage.get("input_tokens") or 0)
+                completion_tokens += int(usage.get("output_tokens") or 0)
+                details = usage.get("input_token_details") or {}
+                cached_tokens += int(details.get("cache_read") or 0)
+                cache_write_tokens += int(details.get("cache_creation") or 0)
+    if found:
+        return prompt_tokens, completion_tokens, cached_tokens, cache_write_tokens
+
+    llm_output = getattr(response, "llm_output", None) or {}
+    usage = llm_output.get("token_usage") or llm_output.get("usage") or {}
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "__dict__", {})
+    prompt_tokens = int(usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0)
+    completion_tokens = int(usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0)
+    # OpenAI nests cached prompt tokens in prompt_tokens_details; Anthropic reports them flat.
+    details = usage.get("prompt_tokens_details") or {}
+    if not isinstance(details, dict):
+        details = getattr(details, "__dict__", {})
+    cached_tokens = int(details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0)
+    cache_write_tokens = int(usage.get("cache_creation_input_tokens") or 0)
+    if usage.get("cache_read_input_tokens") is not None and "prompt_tokens" not in usage:
+        # Anthropic's raw input_tokens exclude cache reads and writes; count them as prompt tokens.
+        prompt_tokens += cached_tokens + cache_write_tokens
+    return prompt_tokens, completion_tokens, cached_tokens, cache_write_tokens
+
+
+__all__ = ["CACHE_PRICE_MULTIPLIERS", "UsageTracker", "timed_stage", "record_retrieval"]
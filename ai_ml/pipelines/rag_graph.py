@@ -3,28 +3,98 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional, TypedDict
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TypedDict
 
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.vectorstores import VectorStoreRetriever
-from langgraph.graph import END, StateGraph
-
-from ai_ml.agents import build_document_crew
+from ai_ml.core.prompts import RAG_HUMAN_PROMPT, RAG_SYSTEM_PROMPT
 from ai_ml.providers.registry import LLMConfig, LLMProviderRegistry
-from ai_ml.tools import ChunkConfig, DocumentSearchTool, InsightsExtractionTool, build_vector_store, chunk_document
+from ai_ml.tools import ChunkConfig, DocumentSearchTool, InsightsExtractionTool, RetrievalConfig, chunk_document, embed_chunks
+
+logger = logging.getLogger(__name__)
+
+# Roles whose LLMs the crew stage calls (see ai_ml.agents.crew_agents).
+_CREW_ROLES = ("analyst", "researcher", "reviewer")
+
+ANALYSIS_MODES = ("fast", "standard", "deep")
+
+
+@dataclass(frozen=True)
+class AnalysisPolicy:
+    """Thresholds deciding which stages a run takes in each analysis mode.
+
+    ``fast`` never runs the crew and answers documents up to ``fast_direct_max_chars`` with
+    one LLM call over the full text. ``standard`` does the same for documents up to
+    ``short_document_chars`` and otherwise only escalates to the crew when the RAG pass
+    reports a confidence below ``crew_confidence_threshold``. ``deep`` always runs
+    retrieval and the crew, and is the default so that callers who don't choose a mode
+    keep the full pipeline.
+    """
+
+    default_mode: str = "deep"
+    short_document_chars: int = 6_000
+    fast_direct_max_chars: int = 24_000
+    crew_confidence_threshold: float = 0.7
+
+    def resolve_mode(self, mode: Optional[str]) -> str:
+        resolved = (mode or self.default_mode).strip().lower()
+        if resolved not in ANALYSIS_MODES:
+            raise ValueError(f"Unsupported analysis mode '{mode}'; expected one of {ANALYSIS_MODES}.")
+        return resolved
+
+    def entry_stage(self, mode: str, document_chars: int) -> Tuple[str, str]:
+        """Return ``("direct" | "ingest", reason)`` for the first stage after planning."""
+
+        if mode == "deep":
+            return "ingest", "deep mode always runs retrieval"
+        limit = self.fast_direct_max_chars if mode == "fast" else self.short_document_chars
+        if document_chars <= limit:
+            return "direct", f"{document_chars} chars fits a single prompt (limit {limit} in {mode} mode)"
+        return "ingest", f"{document_chars} chars exceeds the single-prompt limit {limit} in {mode} mode"
+
+    def needs_crew(self, mode: str, confidence: Optional[float]) -> Tuple[bool, str]:
+        """Decide whether the crew runs after the RAG pass."""
+
+        if mode == "deep":
+            return True, "deep mode always runs the crew"
+        if mode == "fast":
+            return False, "fast mode skips the crew"
+        if confidence is None:
+            return True, "RAG pass reported no confidence"
+        if confidence < self.crew_confidence_threshold:
+            return True, f"RAG confidence {confidence:.2f} below {self.crew_confidence_threshold:.2f}"
+        return False, f"RAG confidence {confidence:.2f} meets {self.crew_confidence_threshold:.2f}"
+
+
+@dataclass
+class DocumentIndex:
+    """Chunks of one document, their embedding vectors and the retriever built over them."""
+
+    chunks: List[Any]
+    vectors: List[List[float]]
+    retriever: Any
 
 
 class PipelineState(TypedDict, total=False):
     document: str
     question: Optional[str]
     translate_lang: Optional[str]
-    retriever: VectorStoreRetriever
+    mode: str
+    analysis: Dict[str, Any]
+    next_stage: str
+    # LangGraph resolves these hints at compile time, so keep them free of lazily imported types.
+    retriever: Any
     document_chunks: List[Any]
+    document_index: Any
     rag_payload: Dict[str, Any]
     retrieved_docs: List[Any]
     crew_payload: Dict[str, Any]
     final_output: Dict[str, Any]
+    usage_tracker: Any
+    timings: Dict[str, float]
+    retrieval_stats: Dict[str, Any]
 
 
 class AgenticRAGPipeline:
@@ -38,135 +108,335 @@ class AgenticRAGPipeline:
         chunk_config: Optional[ChunkConfig] = None,
         embedding_provider: str = "huggingface",
         embedding_model: Optional[str] = None,
+        model_pricing: Optional[Mapping[str, Tuple[float, float]]] = None,
+        agent_models: Optional[Mapping[str, Any]] = None,
+        crew_process: str = "sequential",
+        crew_max_workers: int = 4,
+        analysis_policy: Optional[AnalysisPolicy] = None,
+        artifact_store: Any = None,
+        retrieval_config: Optional[RetrievalConfig] = None,
+        reranker: Any = None,
     ) -> None:
         self.registry = registry or LLMProviderRegistry()
         self.default_question = default_question
         self.chunk_config = chunk_config
+        self.retrieval_config = retrieval_config or RetrievalConfig()
         self.embedding_provider = embedding_provider
         self.embedding_model = embedding_model
-        self.graph = self._build_graph()
-        self._primary_llm_config = LLMConfig(provider="openai", model="gpt-4o-mini", temperature=0.15, max_tokens=900)
+        self.model_pricing = dict(model_pricing or {})
+        self._graph: Any = None
+        self._graph_lock = threading.Lock()
+        # Role -> LLMConfig for the RAG pass ("analyst") and the crew; settings' ProviderSpecs win.
+        self.llm_configs: Dict[str, LLMConfig] = {
+            "analyst": LLMConfig(provider="openai", model="gpt-4o-mini", temperature=0.15, max_tokens=900),
+            "researcher": LLMConfig(provider="google", model="gemini-1.5-pro", temperature=0.2),
+            "reviewer": LLMConfig(provider="anthropic", model="claude-3-5-sonnet-20241022", temperature=0.15),
+        }
+        self.llm_configs.update({role: LLMConfig.from_spec(spec) for role, spec in (agent_models or {}).items()})
+        self._primary_llm_config = self.llm_configs["analyst"]
+        self.crew_process = crew_process
+        self.analysis_policy = analysis_policy or AnalysisPolicy()
+        self.crew_max_workers = crew_max_workers
+        self._crew_template: Any = None
+        self._crew_lock = threading.Lock()
+        # Optional ai_ml.cache.ArtifactStore; chunks and their vectors are reused across runs.
+        self.artifact_store = artifact_store
+        # Optional ai_ml.retrieval.CrossEncoderReranker scoring the candidate pool before packing.
+        self.reranker = reranker
+
+    @property
+    def graph(self) -> Any:
+        """Compiled LangGraph, built on first access so constructing the pipeline stays cheap."""
+
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    self._graph = self._build_graph()
+        return self._graph
+
+    def _build_graph(self) -> Any:
+        from langgraph.graph import END, StateGraph
+
+        from ai_ml.pipelines.instrumentation import timed_stage
 
-    def _build_graph(self) -> StateGraph:
         graph = StateGraph(PipelineState)
-        graph.add_node("ingest", self._ingest_documents)
-        graph.add_node("rag", self._initial_rag_pass)
-        graph.add_node("crew", self._crew_collaboration)
-        graph.add_node("finalize", self._finalize_report)
+        graph.add_node("plan", self._plan_route)
+        graph.add_node("direct", timed_stage("direct", self._direct_analysis))
+        graph.add_node("ingest", timed_stage("ingest", self._ingest_documents))
+        graph.add_node("rag", timed_stage("rag", self._initial_rag_pass))
+        graph.add_node("crew", timed_stage("crew", self._crew_collaboration))
+        graph.add_node("finalize", timed_stage("finalize", self._finalize_report))
 
-        graph.set_entry_point("ingest")
+        graph.set_entry_point("plan")
+        graph.add_conditional_edges("plan", _next_stage, {"direct": "direct", "ingest": "ingest"})
+        graph.add_edge("direct", "finalize")
         graph.add_edge("ingest", "rag")
-        graph.add_edge("rag", "crew")
+        graph.add_conditional_edges("rag", _next_stage, {"crew": "crew", "finalize": "finalize"})
         graph.add_edge("crew", "finalize")
         graph.add_edge("finalize", END)
         return graph.compile()
 
-    def run(self, document: str, *, question: Optional[str] = None, translate_lang: Optional[str] = None) -> Dict[str, Any]:
+    def run(
+        self,
+        document: str,
+        *,
+        question: Optional[str] = None,
+        translate_lang: Optional[str] = None,
+        mode: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        from ai_ml.pipelines.instrumentation import STAGE_SECONDS, UsageTracker
+
+        tracker = UsageTracker(pricing=self.model_pricing)
         state: PipelineState = {
             "document": document,
             "question": question,
             "translate_lang": translate_lang,
+            "mode": self.analysis_policy.resolve_mode(mode),
+            "usage_tracker": tracker,
+            "timings": {},
         }
+        started = time.perf_counter()
         final_state = self.graph.invoke(state)
-        return final_state.get("final_output", {})
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage="total")
+
+        final_output = dict(final_state.get("final_output", {}))
+        final_output["timings"] = {**final_state.get("timings", {}), "total": round(elapsed, 4)}
+        final_output["usage"] = {**tracker.summary(), "retrieval": final_state.get("retrieval_stats", {})}
+        final_output["analysis"] = final_state.get("analysis", {})
+        return final_output
+
+    def index_document(self, document: str) -> DocumentIndex:
+        """Chunk, embed and index ``document``, reusing cached chunks and vectors when available.
+
+        The retriever is hybrid BM25 + dense by default (see :mod:`ai_ml.retrieval`).
+        """
+
+        from ai_ml.retrieval import build_retriever
+
+        store = self.artifact_store
+        embeddings = self.registry.embeddings(self.embedding_provider, model=self.embedding_model)
+        if store is not None:
+            cached = store.get(document, "retriever")
+            if cached is not None:
+                return cached
+        chunks = store.get(document, "chunks") if store is not None else None
+        if chunks is None:
+            chunks = chunk_document(document, config=self.chunk_config)
+        vectors = store.get(document, "chunk_vectors") if store is not None else None
+        if vectors is None:
+            vectors = embed_chunks(chunks, embeddings=embeddings)
+        retriever = build_retriever(chunks, vectors, embeddings=embeddings, config=self.retrieval_config)
+        if store is not None:
+            store.put(document, "chunks", chunks)
+            store.put(document, "chunk_vectors", vectors)
+            # FAISS indexes are cheap to rebuild from cached vectors, so only keep them in memory.
+            store.put(document, "retriever", DocumentIndex(chunks, vectors, retriever), persist=False)
+        return DocumentIndex(chunks, vectors, retriever)
+
+    def retrieve_context(
+        self,
+        index: DocumentIndex,
+        question: str,
+        *,
+        query_vector: Optional[List[float]] = None,
+        token_budget: Optional[int] = None,
+    ) -> Any:
+        """Retrieve a candidate pool for ``question`` and pack it with :class:`ContextBuilder`.
+
+        Up to ``retrieval_config.top_k`` chunks are kept, chosen by MMR within the
+        ``context_tokens`` budget (or ``token_budget``); overlapping spans between neighbouring
+        chunks are trimmed. With a reranker, cross-encoder scores replace embedding similarity
+        as MMR relevance. ``query_vector`` reuses an embedding of ``question`` the caller
+        already computed.
+        """
+
+        from ai_ml.retrieval import ContextBuilder
+
+        cfg = self.retrieval_config
+        candidates = index.retriever.invoke(question, k=max(cfg.candidates, cfg.top_k))
+        embeddings = self.registry.embeddings(self.embedding_provider, model=self.embedding_model)
+        builder = ContextBuilder(
+            token_budget=token_budget if token_budget is not None else cfg.context_tokens,
+            max_chunks=cfg.top_k,
+            mmr_lambda=cfg.mmr_lambda,
+            similarity_cutoff=cfg.similarity_cutoff,
+        )
+        return builder.build(
+            candidates,
+            query_vector=query_vector if query_vector is not None else embeddings.embed_query(question),
+            document_vectors=[index.vectors[doc.metadata["chunk"]] for doc in candidates],
+            relevance=self._rerank_scores(question, candidates),
+        )
+
+    def search_tool(self, index: DocumentIndex) -> DocumentSearchTool:
+        """Document search over ``index`` for agents and ``semantic_search``, reranked when configured."""
+
+        cfg = self.retrieval_config
+        return DocumentSearchTool(index.retriever, reranker=self.reranker, candidates=cfg.candidates, top_n=cfg.top_k)
+
+    def _rerank_scores(self, question: str, candidates: List[Any]) -> Optional[List[float]]:
+        from ai_ml.pipelines.instrumentation import STAGE_SECONDS
+        from ai_ml.providers.registry import MissingDependencyError
+
+        if self.reranker is None or not candidates:
+            return None
+        started = time.perf_counter()
+        try:
+            scores = self.reranker.score(question, [doc.page_content for doc in candidates])
+        except MissingDependencyError as exc:
+            logger.warning("Reranking disabled: %s", exc)
+            self.reranker = None
+            return None
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="rerank")
+        return scores
 
     # --- Graph Nodes -----------------------------------------------------------------
 
-    def _ingest_documents(self, state: PipelineState) -> PipelineState:
+    def _plan_route(self, state: PipelineState) -> PipelineState:
+        mode = state["mode"]
+        target, reason = self.analysis_policy.entry_stage(mode, len(state["document"]))
+        return {
+            **state,
+            "next_stage": target,
+            "analysis": {"mode": mode, "route": "direct" if target == "direct" else "rag", "reasons": [reason]},
+        }
+
+    def _direct_analysis(self, state: PipelineState) -> PipelineState:
+        """Answer short documents with one LLM call over the full text, skipping retrieval."""
+
+        from langchain_core.documents import Document
+
+        from ai_ml.pipelines.instrumentation import record_retrieval
+
         document = state["document"]
-        chunks = chunk_document(document, config=self.chunk_config)
-        retriever = build_vector_store(
-            document,
-            embedding_provider=self.embedding_provider,
-            embedding_model=self.embedding_model,
-            config=self.chunk_config,
-        )
+        question = state.get("question") or self.default_question
+        payload = self._structured_analysis(state, context=document, question=question, excerpt_label="Document")
+        retrieval = record_retrieval("direct", [Document(page_content=document)])
+        analysis = dict(state.get("analysis") or {})
+        analysis["confidence"] = _confidence(payload)
+        return {
+            **state,
+            "rag_payload": payload,
+            "retrieved_docs": [],
+            "analysis": analysis,
+            "retrieval_stats": {**state.get("retrieval_stats", {}), "direct": retrieval},
+        }
+
+    def _ingest_documents(self, state: PipelineState) -> PipelineState:
+        index = self.index_document(state["document"])
         return {
             **state,
-            "document_chunks": chunks,
-            "retriever": retriever,
+            "document_index": index,
+            "document_chunks": index.chunks,
+            "retriever": index.retriever,
+            "retrieval_stats": {**state.get("retrieval_stats", {}), "chunks": len(index.chunks)},
         }
 
     def _initial_rag_pass(self, state: PipelineState) -> PipelineState:
-        retriever = state["retriever"]
+        from ai_ml.pipelines.instrumentation import record_retrieval
+
         question = state.get("question") or self.default_question
-        context_docs = retriever.get_relevant_documents(question)
-        context = "\n\n".join(doc.page_content for doc in context_docs)
-
-        rag_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    "You are an expert analyst. Always respond with minified JSON using keys: "
-                    "general_overview, main_topics, supporting_context, question_answer."
-                    " main_topics must be an array of short strings. supporting_context is an array of quotes.",
-                ),
-                (
-                    "human",
-                    "Document excerpts:\n{context}\n\nUser question: {question}\n"
-                    "Return strictly valid JSON, without markdown fences.",
-                ),
-            ]
+        packed = self.retrieve_context(state["document_index"], question)
+        context_docs = packed.documents
+        context = packed.join()
+        retrieval = {**record_retrieval("rag", context_docs, context_chars=len(context)), "context": packed.stats()}
+
+        payload = self._structured_analysis(state, context=context, question=question, excerpt_label="Document excerpts")
+        confidence = _confidence(payload)
+        run_crew, reason = self.analysis_policy.needs_crew(state["mode"], confidence)
+        analysis = dict(state.get("analysis") or {})
+        analysis.update(
+            route="rag+crew" if run_crew else "rag",
+            reasons=[*analysis.get("reasons", []), reason],
+            confidence=confidence,
         )
 
+        return {
+            **state,
+            "rag_payload": payload,
+            "retrieved_docs": context_docs,
+            "analysis": analysis,
+            "next_stage": "crew" if run_crew else "finalize",
+            "retrieval_stats": {**state.get("retrieval_stats", {}), "rag": retrieval},
+        }
+
+    def _structured_analysis(self, state: PipelineState, *, context: str, question: str, excerpt_label: str) -> Dict[str, Any]:
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
+        rag_prompt = ChatPromptTemplate.from_messages([("system", RAG_SYSTEM_PROMPT), ("human", RAG_HUMAN_PROMPT)])
+
         llm = self.registry.chat(self._primary_llm_config)
         chain = rag_prompt | llm | StrOutputParser()
 
         try:
-            response = chain.invoke({"context": context, "question": question})
-            payload = _safe_json_loads(response)
+            response = chain.invoke(
+                {"context": context, "question": question, "excerpt_label": excerpt_label},
+                config=_callback_config(state),
+            )
+            return _safe_json_loads(response)
         except Exception as exc:  # pragma: no cover - runtime safety
-            payload = {
+            return {
                 "general_overview": "RAG analysis failed.",
                 "main_topics": [],
                 "supporting_context": [],
                 "question_answer": f"Unable to generate answer: {exc}",
+                "error": str(exc),
             }
 
-        return {
-            **state,
-            "rag_payload": payload,
-            "retrieved_docs": context_docs,
-        }
+    @property
+    def crew_template(self) -> Any:
+        """Reusable crew, created on first use so CrewAI is only imported when the stage runs."""
+
+        if self._crew_template is None:
+            with self._crew_lock:
+                if self._crew_template is None:
+                    from ai_ml.agents import DocumentCrewTemplate
+
+                    self._crew_template = DocumentCrewTemplate(
+                        self.registry,
+                        llm_configs=self.llm_configs,
+                        process=self.crew_process,
+                        max_workers=self.crew_max_workers,
+                    )
+        return self._crew_template
 
     def _crew_collaboration(self, state: PipelineState) -> PipelineState:
-        retriever = state["retriever"]
+        from ai_ml.pipelines.instrumentation import STAGE_SECONDS
+
         chunks = state["document_chunks"]
         rag_payload = state.get("rag_payload", {})
         question = state.get("question") or self.default_question
 
-        document_tool = DocumentSearchTool(retriever)
-        insights_tool = InsightsExtractionTool(chunks)
-        crew = build_document_crew(
-            self.registry,
-            retriever_tool=document_tool,
-            insights_tool=insights_tool,
-            additional_context={
-                "openai_model": "gpt-4o-mini",
-                "gemini_model": "gemini-1.5-pro",
-                "claude_model": "claude-3-5-sonnet-20241022",
-            },
-        )
-
         crew_inputs = {
             "question": question,
             "rag_overview": rag_payload.get("general_overview"),
             "rag_topics": rag_payload.get("main_topics"),
         }
         try:
-            crew_result = crew.kickoff(inputs=crew_inputs)
-            if hasattr(crew_result, "json"):
-                crew_payload = crew_result.json if isinstance(crew_result.json, dict) else {"raw": crew_result.json}
-            elif hasattr(crew_result, "raw"):
-                crew_payload = {"raw": crew_result.raw}
-            else:
-                crew_payload = {"raw": str(crew_result)}
+            # A crew role whose providers are all down would only fail after its own timeouts.
+            for role in _CREW_ROLES:
+                self.registry.ensure_available(self.llm_configs[role])
+            crew_run = self.crew_template.run(
+                crew_inputs,
+                retriever_tool=self.search_tool(state["document_index"]),
+                insights_tool=InsightsExtractionTool(chunks),
+            )
+            _record_crew_usage(state, crew_run)
+            crew_payload = crew_run.to_payload()
         except Exception as exc:  # pragma: no cover - runtime safety
-            crew_payload = {"error": f"Crew collaboration failed: {exc}"}
+            crew_payload = {"error": f"Crew collaboration failed: {exc}", "degraded": _degraded_reason(exc)}
+
+        timings = dict(state.get("timings") or {})
+        for role, seconds in crew_payload.get("timings", {}).items():
+            STAGE_SECONDS.observe(seconds, stage=f"crew:{role}")
+            timings[f"crew:{role}"] = seconds
 
         return {
             **state,
             "crew_payload": crew_payload,
+            "timings": timings,
         }
 
     def _finalize_report(self, state: PipelineState) -> PipelineState:
@@ -191,6 +461,12 @@ class AgenticRAGPipeline:
             "crew_analysis": crew_payload,
             "citations": citations,
         }
+        if rag_payload.get("error"):
+            final_output["error"] = rag_payload["error"]
+        # Stages that fell back; a degraded report is returned but never cached.
+        degraded = [stage for stage, payload in (("rag", rag_payload), ("crew", crew_payload)) if payload.get("error")]
+        if degraded:
+            final_output["degraded"] = degraded
 
         return {
             **state,
@@ -198,6 +474,57 @@ class AgenticRAGPipeline:
         }
 
 
+def _degraded_reason(exc: Exception) -> str:
+    """Why a stage fell back: an open breaker, a provider that cannot run here, or an error."""
+
+    from ai_ml.providers.circuit import CircuitOpenError
+    from ai_ml.providers.registry import MissingAPIKeyError, MissingDependencyError
+
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, (MissingAPIKeyError, MissingDependencyError)):
+        return "unavailable"
+    return "error"
+
+
+def _callback_config(state: PipelineState) -> Optional[Dict[str, Any]]:
+    tracker = state.get("usage_tracker")
+    return {"callbacks": [tracker]} if tracker is not None else None
+
+
+def _next_stage(state: PipelineState) -> str:
+    """Conditional-edge router: nodes record their routing decision in ``next_stage``."""
+
+    return state["next_stage"]
+
+
+def _confidence(payload: Dict[str, Any]) -> Optional[float]:
+    try:
+        value = float(payload.get("confidence"))
+    except (TypeError, ValueError):
+        return None
+    return min(max(value, 0.0), 1.0)
+
+
+def _record_crew_usage(state: PipelineState, crew_result: Any) -> None:
+    """CrewAI drives its own LLM calls, so fold its aggregate token usage into the run tracker."""
+
+    tracker = state.get("usage_tracker")
+    usage = getattr(crew_result, "token_usage", None)
+    if tracker is None or usage is None:
+        return
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "model_dump", lambda: vars(usage))()
+    tracker.record(
+        provider="crewai",
+        model="crew",
+        prompt_tokens=int(usage.get("prompt_tokens") or 0),
+        completion_tokens=int(usage.get("completion_tokens") or 0),
+        cached_tokens=int(usage.get("cached_prompt_tokens") or 0),
+        stage="crew",
+    )
+
+
 def _safe_json_loads(payload: str) -> Dict[str, Any]:
     """Parse JSON output while surfacing useful errors for downstream consumers."""
 
@@ -0,0 +1,116 @@
+"""Retrieval-only question answering over a single document.
+
+The full agentic pipeline plans, drafts, reviews and runs a three-agent crew, which is
+far more than a follow-up question needs. :class:`RetrievalQAPipeline` reuses the
+document index built by :meth:`AgenticRAGPipeline.index_document` (so chunks and vectors
+come from the artifact store when the document has been seen before), packs the top
+excerpts with :meth:`AgenticRAGPipeline.retrieve_context` and makes one call to the ``qa``
+agent model, returning the answer with the excerpts it was grounded in as citations.
+Document-grounded chat uses :meth:`RetrievalQAPipeline.retrieve` for the same excerpts.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ai_ml.core.prompts import QA_HUMAN_PROMPT, QA_SYSTEM_PROMPT
+from ai_ml.providers.registry import LLMConfig
+
+
+class RetrievalQAPipeline:
+    """Answer questions with one retrieval step and one LLM call."""
+
+    def __init__(
+        self,
+        pipeline: Any,
+        *,
+        llm_config: LLMConfig,
+        model_pricing: Optional[Mapping[str, Tuple[float, float]]] = None,
+    ) -> None:
+        # An AgenticRAGPipeline: it owns the registry, the cached index and the retrieval config.
+        self.pipeline = pipeline
+        self.llm_config = llm_config
+        self.model_pricing = dict(model_pricing or {})
+
+    def answer(self, document: str, question: str, *, query_vector: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Return ``{"answer", "citations", "timings", "usage"}`` for ``question``.
+
+        ``query_vector`` is an embedding of ``question`` already computed by the caller
+        (e.g. for a semantic cache lookup), so it is not embedded again.
+        """
+
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
+        from ai_ml.pipelines.instrumentation import STAGE_SECONDS, UsageTracker
+
+        tracker = UsageTracker(pricing=self.model_pricing)
+        timings: Dict[str, float] = {}
+
+        started = time.perf_counter()
+        excerpts = self.retrieve(document, question, query_vector=query_vector)
+        timings["qa:retrieve"] = round(time.perf_counter() - started, 4)
+        context = excerpts["context"]
+
+        prompt = ChatPromptTemplate.from_messages([("system", QA_SYSTEM_PROMPT), ("human", QA_HUMAN_PROMPT)])
+        chain = prompt | self.pipeline.registry.chat(self.llm_config) | StrOutputParser()
+
+        answer_started = time.perf_counter()
+        answer = chain.invoke({"context": context, "question": question}, config={"callbacks": [tracker]})
+        timings["qa:answer"] = round(time.perf_counter() - answer_started, 4)
+        timings["total"] = round(time.perf_counter() - started, 4)
+        for stage, seconds in timings.items():
+            STAGE_SECONDS.observe(seconds, stage=stage if stage != "total" else "qa:total")
+
+        return {
+            "answer": answer.strip(),
+            "citations": excerpts["citations"],
+            "timings": timings,
+            "usage": {**tracker.summary(), "retrieval": {"qa": excerpts["retrieval"]}},
+        }
+
+    def retrieve(
+        self,
+        document: str,
+        question: str,
+        *,
+        query_vector: Optional[List[float]] = None,
+        token_budget: Optional[int] = None,
+        stage: str = "qa",
+    ) -> Dict[str, Any]:
+        """Numbered excerpts for ``question`` from the document's cached index, with citations.
+
+        Returns ``{"context", "citations", "retrieval"}``; ``token_budget`` overrides the
+        configured ``context_tokens`` and ``stage`` labels the retrieval metrics.
+        """
+
+        from ai_ml.pipelines.instrumentation import record_retrieval
+
+        packed = self.pipeline.retrieve_context(
+            self.pipeline.index_document(document),
+            question,
+            query_vector=query_vector,
+            token_budget=token_budget,
+        )
+        context = packed.numbered()
+        return {
+            "context": context,
+            "citations": _citations(packed.documents, packed.texts),
+            "retrieval": {**record_retrieval(stage, packed.documents, context_chars=len(context)), "context": packed.stats()},
+        }
+
+
+def _citations(docs: List[Any], texts: List[str]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "ref": number,
+            "page": doc.metadata.get("page"),
+            "source": doc.metadata.get("source", "document"),
+            "snippet": text,
+        }
+        for number, (doc, text) in enumerate(zip(docs, texts), start=1)
+    ]
+
+
+__all__ = ["RetrievalQAPipeline"]
@@ -1,9 +1,14 @@
 """Factories for multi-provider LLM clients used across the AI/ML subsystem."""
 
-from .registry import LLMProviderRegistry, get_chat_model, get_embedding_model
+from .circuit import CircuitBreaker, CircuitBreakerPolicy, CircuitOpenError
+from .registry import LLMProviderRegistry, RoutingPolicy, get_chat_model, get_embedding_model
 
 __all__ = [
+    "CircuitBreaker",
+    "CircuitBreakerPolicy",
+    "CircuitOpenError",
     "LLMProviderRegistry",
+    "RoutingPolicy",
     "get_chat_model",
     "get_embedding_model",
 ]
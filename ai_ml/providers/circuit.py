@@ -0,0 +1,234 @@
+"""Per-provider circuit breakers that fail fast while a provider is down.
+
+Without a breaker, every call to a provider that is down waits out the full client timeout
+before the service returns its fallback string, and a crew run waits that long on every
+agent turn. The registry gives each provider/model a :class:`CircuitBreaker`, and its chat
+models check it before every call:
+
+* **closed**: calls go through, and the outcomes of the last ``window`` calls are kept.
+  Once at least ``min_calls`` have been seen, a failure rate of ``failure_rate`` or more
+  opens the circuit;
+* **open**: calls raise :class:`CircuitOpenError` at once, without touching the provider,
+  for ``open_seconds``;
+* **half-open**: up to ``probes`` calls go through as probes while the rest are still
+  rejected. If every probe succeeds the circuit closes. If any probe fails it opens again.
+
+Client errors (HTTP 4xx other than 408 and 429) are the caller's fault, so they do not
+count as failures. State, transitions and rejected calls are exported as metrics.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ai_ml.core.metrics import get_metrics_registry
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for docuthinker_circuit_state.
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_STATE = get_metrics_registry().gauge(
+    "docuthinker_circuit_state",
+    "Circuit breaker state per provider and model (0 closed, 1 half-open, 2 open).",
+    ("provider", "model"),
+)
+_TRANSITIONS = get_metrics_registry().counter(
+    "docuthinker_circuit_transitions_total",
+    "Circuit breaker state changes, by the state entered.",
+    ("provider", "model", "state"),
+)
+_REJECTED = get_metrics_registry().counter(
+    "docuthinker_circuit_rejected_total",
+    "Calls failed fast because the provider's circuit was open.",
+    ("provider", "model"),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, model: str, retry_after: float) -> None:
+        super().__init__(f"{provider}/{model} is unavailable (circuit open, retry in {retry_after:.1f}s).")
+        self.provider = provider
+        self.model = model
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    """Thresholds shared by every breaker of a registry."""
+
+    failure_rate: float = 0.5
+    window: int = 20
+    min_calls: int = 5
+    open_seconds: float = 30.0
+    probes: int = 1
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["CircuitBreakerPolicy"]:
+        """The configured policy, or None when circuit breaking is disabled."""
+
+        if not settings.circuit_breaker:
+            return None
+        return cls(
+            failure_rate=settings.circuit_failure_rate,
+            window=settings.circuit_window,
+            min_calls=settings.circuit_min_calls,
+            open_seconds=settings.circuit_open_seconds,
+            probes=settings.circuit_probes,
+        )
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one provider/model."""
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        policy: Optional[CircuitBreakerPolicy] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.policy = policy or CircuitBreakerPolicy()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, self.policy.window))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        _STATE.set(_STATE_VALUES[CLOSED], provider=provider, model=model)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 when not open)."""
+
+        with self._lock:
+            self._maybe_half_open()
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.policy.open_seconds - self._clock())
+
+    def acquire(self) -> bool:
+        """Admit one call or raise :class:`CircuitOpenError`; returns whether the call is a probe.
+
+        Every admitted call must be followed by :meth:`record_success`, :meth:`record_failure`
+        or, when it was abandoned without an outcome, :meth:`release`.
+        """
+
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return False
+            if self._state == HALF_OPEN and self._probes_in_flight < self.policy.probes:
+                self._probes_in_flight += 1
+                return True
+            retry_after = max(0.0, self._opened_at + self.policy.open_seconds - self._clock())
+        _REJECTED.inc(provider=self.provider, model=self.model)
+        raise CircuitOpenError(self.provider, self.model, retry_after)
+
+    def record_success(self, probe: bool = False) -> None:
+        with self._lock:
+            if probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if self._state == HALF_OPEN:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.policy.probes:
+                        self._outcomes.clear()
+                        self._transition(CLOSED)
+                return
+            self._outcomes.append(True)
+
+    def release(self, probe: bool = False) -> None:
+        """Settle an admitted call that was cancelled: frees its probe slot, records no outcome."""
+
+        if not probe:
+            return
+        with self._lock:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record_failure(self, error: Optional[BaseException] = None, probe: bool = False) -> None:
+        if error is not None and not counts_as_failure(error):
+            self.record_success(probe)
+            return
+        with self._lock:
+            if probe:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if self._state == HALF_OPEN:
+                    self._open()
+                return
+            if self._state != CLOSED:
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.policy.min_calls and failures / len(self._outcomes) >= self.policy.failure_rate:
+                self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._outcomes)
+            return {
+                "state": self._state,
+                "calls": calls,
+                "failure_rate": round(self._outcomes.count(False) / calls, 4) if calls else 0.0,
+                "retry_after": round(max(0.0, self._opened_at + self.policy.open_seconds - self._clock()), 3)
+                if self._state == OPEN
+                else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (callers hold self._lock)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.policy.open_seconds:
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            self._transition(HALF_OPEN)
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        _STATE.set(_STATE_VALUES[state], provider=self.provider, model=self.model)
+        _TRANSITIONS.inc(provider=self.provider, model=self.model, state=state)
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Whether ``error`` says the provider is unhealthy, rather than the request being bad."""
+
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+__all__ = [
+    "CLOSED",
+    "CircuitBreaker",
+    "CircuitBreakerPolicy",
+    "CircuitOpenError",
+    "HALF_OPEN",
+    "OPEN",
+    "counts_as_failure",
+]
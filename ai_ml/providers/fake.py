@@ -0,0 +1,385 @@
+"""Deterministic, network-free chat and embedding providers.
+
+``FakeChatModel`` answers every prompt with a *script* (or from a fixed list of
+responses) while simulating a provider's timing: a sampled time-to-first-token, a
+tokens-per-second generation rate and an injectable error rate. ``FakeEmbeddings`` returns
+feature-hashed bag-of-words vectors. Both are registered under the ``fake`` provider so
+the whole service can be load tested without API keys or network access.
+
+A script maps the prompt text to a response. This module knows nothing about the prompts
+of the product it stands in for: the built-in ``echo`` script only digests the prompt, and
+product-shaped scripts (see :mod:`ai_ml.benchmarks.stubs`) are registered with
+:func:`register_script` or named as ``"module:function"``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-_.]*")
+_PIECE_RE = re.compile(r"\S+\s*")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "into", "its",
+    "of", "to", "in", "on", "a", "an", "is", "be", "by", "as", "or", "at", "it", "document",
+}
+_CHARS_PER_TOKEN = 4
+
+
+class FakeProviderError(RuntimeError):
+    """Raised by :class:`FakeChatModel` when a call is selected for error injection."""
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Sampled delay in milliseconds.
+
+    ``kind`` is ``fixed`` (``a``), ``uniform`` (``a``..``b``), ``normal`` (mean ``a``,
+    stddev ``b``) or ``lognormal`` (median ``a``, shape ``b``). Lognormal gives the long
+    right tail real providers show, which is what p95/p99 measurements need.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Return one delay in seconds."""
+
+        if self.kind == "fixed":
+            millis = self.a
+        elif self.kind == "uniform":
+            millis = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            millis = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            millis = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        else:
+            raise ValueError(f"Unsupported latency distribution '{self.kind}'.")
+        return max(millis, 0.0) / 1000.0
+
+
+def parse_latency(spec: Union[str, float, int, None]) -> LatencyDistribution:
+    """Parse ``"800"``, ``"fixed:800"``, ``"uniform:200:900"``, ``"normal:500:100"`` or ``"lognormal:800:0.5"``."""
+
+    if spec is None or spec == "":
+        return LatencyDistribution()
+    if isinstance(spec, (int, float)):
+        return LatencyDistribution("fixed", float(spec))
+    kind, *values = spec.split(":")
+    if not values:
+        return LatencyDistribution("fixed", float(kind))
+    numbers = [float(value) for value in values] + [0.0]
+    distribution = LatencyDistribution(kind.strip().lower(), numbers[0], numbers[1])
+    distribution.sample(random.Random(0))  # validate the kind eagerly
+    return distribution
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for fake usage metadata and generation timing."""
+
+    return max(1, math.ceil(len(text) / _CHARS_PER_TOKEN)) if text else 0
+
+
+@dataclass(frozen=True)
+class PromptDigest:
+    """What a script can build a response from: the prompt's top terms and opening sentences."""
+
+    topics: List[str]
+    sentences: List[str]
+    overview: str
+
+
+def digest_prompt(prompt: str) -> PromptDigest:
+    words = [word for word in _TOKEN_RE.findall(prompt.lower()) if word not in _STOPWORDS and len(word) > 3]
+    sentences = [part.strip() for part in re.split(r"(?<=[.!?])\s+", prompt) if len(part.strip()) > 20]
+    return PromptDigest(
+        topics=[word for word, _ in Counter(words).most_common(5)],
+        sentences=sentences,
+        overview=" ".join(sentences[:2])[:400] or "No content.",
+    )
+
+
+def echo_response(prompt: str) -> str:
+    """Default script: the prompt's top terms as bullets, then its opening sentences."""
+
+    digest = digest_prompt(prompt)
+    return "\n".join(f"- {topic}" for topic in digest.topics) + f"\n\n{digest.overview}"
+
+
+Script = Callable[[str], str]
+_SCRIPTS: Dict[str, Script] = {"echo": echo_response}
+
+
+def register_script(name: str, script: Script) -> None:
+    """Make ``script`` available to :class:`FakeChatModel` as ``script=name``."""
+
+    _SCRIPTS[name] = script
+
+
+def resolve_script(name: str) -> Script:
+    """Return the script registered as ``name``, or import it from a ``"module:function"`` path."""
+
+    script = _SCRIPTS.get(name)
+    if script is not None:
+        return script
+    module, sep, attribute = name.partition(":")
+    if sep:
+        script = getattr(importlib.import_module(module), attribute, None)
+        if callable(script):
+            return script
+    raise ValueError(f"Unknown fake chat script '{name}'; expected one of {sorted(_SCRIPTS)} or 'module:function'.")
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with provider-like timing and no network access.
+
+    Each call sleeps for a sampled time-to-first-token (``latency``), then generates the
+    response of ``script`` (see :func:`resolve_script`), or the next of ``responses``, at
+    ``tokens_per_second`` (instantly when unset). A fraction ``error_rate`` of
+    calls raise :class:`FakeProviderError` after the first-token delay. ``seed`` makes the
+    latency and error sequence reproducible.
+
+    Content blocks marked with ``cache_control`` behave like a provider prompt cache: the
+    first call writes the marked prefix, and later calls with the same prefix report it as
+    ``cache_read`` input tokens.
+    """
+
+    model: str = "fake-chat"
+    temperature: float = 0.0
+    max_tokens: Optional[int] = None
+    responses: Optional[List[str]] = None
+    script: str = "echo"
+    latency: Union[str, float, None] = None
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+    _rng_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _distribution: LatencyDistribution = PrivateAttr(default_factory=LatencyDistribution)
+    _script: Optional[Script] = PrivateAttr(default=None)
+    _cursor: int = PrivateAttr(default=0)
+    _cached_prefixes: set = PrivateAttr(default_factory=set)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._distribution = parse_latency(self.latency)
+        self._script = resolve_script(self.script)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "script": self.script, "latency": self.latency, "tokens_per_second": self.tokens_per_second}
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_provider"] = "fake"
+        return params
+
+    # -- Generation ---------------------------------------------------------------
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, first_token_s, fail = self._plan(messages)
+        time.sleep(first_token_s)
+        if fail:
+            raise FakeProviderError(f"Injected failure from fake model '{self.model}'.")
+        time.sleep(self._generation_seconds(text))
+        return self._result(messages, text)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, first_token_s, fail = self._plan(messages)
+        await asyncio.sleep(first_token_s)
+        if fail:
+            raise FakeProviderError(f"Injected failure from fake model '{self.model}'.")
+        await asyncio.sleep(self._generation_seconds(text))
+        return self._result(messages, text)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        text, first_token_s, fail = self._plan(messages)
+        time.sleep(first_token_s)
+        if fail:
+            raise FakeProviderError(f"Injected failure from fake model '{self.model}'.")
+        pieces = _PIECE_RE.findall(text) or [text]
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(self._generation_seconds(piece))
+            chunk = self._chunk(messages, text, piece, last=index == len(pieces) - 1)
+            if run_manager is not None:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        text, first_token_s, fail = self._plan(messages)
+        await asyncio.sleep(first_token_s)
+        if fail:
+            raise FakeProviderError(f"Injected failure from fake model '{self.model}'.")
+        pieces = _PIECE_RE.findall(text) or [text]
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(self._generation_seconds(piece))
+            chunk = self._chunk(messages, text, piece, last=index == len(pieces) - 1)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    # -- Helpers ------------------------------------------------------------------
+
+    def _plan(self, messages: List[BaseMessage]) -> Tuple[str, float, bool]:
+        with self._rng_lock:
+            first_token_s = self._distribution.sample(self._rng)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            cursor = self._cursor
+            self._cursor += 1
+        if self.responses:
+            text = self.responses[cursor % len(self.responses)]
+        else:
+            text = self._script(_prompt_text(messages))
+        if self.max_tokens:
+            text = text[: self.max_tokens * _CHARS_PER_TOKEN]
+        return text, first_token_s, fail
+
+    def _generation_seconds(self, text: str) -> float:
+        if not self.tokens_per_second:
+            return 0.0
+        return estimate_tokens(text) / self.tokens_per_second
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> Dict[str, Any]:
+        prompt_tokens = estimate_tokens(_prompt_text(messages))
+        completion_tokens = estimate_tokens(text)
+        usage: Dict[str, Any] = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        prefix = _cached_prefix(messages)
+        if prefix:
+            digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+            with self._rng_lock:
+                hit = digest in self._cached_prefixes
+                self._cached_prefixes.add(digest)
+            usage["input_token_details"] = {"cache_read" if hit else "cache_creation": estimate_tokens(prefix)}
+        return usage
+
+    def _result(self, messages: List[BaseMessage], text: str) -> ChatResult:
+        message = AIMessage(
+            content=text,
+            usage_metadata=self._usage(messages, text),
+            response_metadata={"model_name": self.model},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunk(self, messages: List[BaseMessage], text: str, piece: str, *, last: bool) -> ChatGenerationChunk:
+        # Usage is attached once, on the final chunk, the way provider streams report it.
+        usage = self._usage(messages, text) if last else None
+        return ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage))
+
+
+class FakeEmbeddings(Embeddings):
+    """Feature-hashed bag-of-words vectors: deterministic, fast and similarity-preserving."""
+
+    def __init__(self, dimensions: int = 384, latency_ms: float = 0.0) -> None:
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(_content_text(getattr(message, "content", message)) for message in messages)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+
+def _cached_prefix(messages: List[BaseMessage]) -> str:
+    """Prompt text up to and including the last block marked with ``cache_control``."""
+
+    seen: List[str] = []
+    prefix = ""
+    for message in messages:
+        content = getattr(message, "content", None)
+        blocks = content if isinstance(content, list) else [content]
+        for block in blocks:
+            seen.append(_content_text([block]) if isinstance(block, dict) else str(block or ""))
+            if isinstance(block, dict) and block.get("cache_control"):
+                prefix = "".join(seen)
+    return prefix
+
+
+__all__ = [
+    "FakeChatModel",
+    "FakeEmbeddings",
+    "FakeProviderError",
+    "LatencyDistribution",
+    "PromptDigest",
+    "Script",
+    "digest_prompt",
+    "echo_response",
+    "estimate_tokens",
+    "parse_latency",
+    "register_script",
+    "resolve_script",
+]
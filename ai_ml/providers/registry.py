@@ -3,39 +3,62 @@
 This module provides lightweight factories that lazily instantiate LangChain-compatible
 LLMs and embedding models based on a provider string. We support OpenAI, Anthropic, and
 Google Gemini out of the box, with graceful fallbacks when optional dependencies are
-missing or API keys are not configured.
+missing or API keys are not configured. Provider SDKs are only imported when a client
+for that provider is first requested, so importing the registry stays cheap.
+
+The ``fake`` provider (see :mod:`ai_ml.providers.fake`) needs neither keys nor network,
+and a registry created with ``replay_mode`` records real responses to disk or serves
+them back (see :mod:`ai_ml.providers.replay`).
+
+An ``LLMConfig`` with ``fallbacks`` is built into a routed model that fails over to the
+next provider on errors and hedges slow requests (see :mod:`ai_ml.providers.routing`).
+A registry created with a ``circuit`` policy gives every provider/model a circuit breaker,
+so calls to a failing provider fail fast instead of waiting out client timeouts (see
+:mod:`ai_ml.providers.circuit`).
+
+``LLMConfig.extra["prompt_cache"]`` turns on provider-side prompt caching. It is never
+passed to the client constructor. Instead, :meth:`LLMProviderRegistry.prompt_cache_control`
+returns the ``cache_control`` block that callers attach to the stable leading part of a
+prompt. Anthropic only caches blocks marked this way. OpenAI and Gemini cache long
+repeated prefixes automatically, so for them the flag needs no marker.
 """
 
 from __future__ import annotations
 
+import importlib
+import logging
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
-from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.embeddings import Embeddings
+from ai_ml.providers.circuit import OPEN, CircuitBreaker, CircuitBreakerPolicy, CircuitOpenError
 
-try:
-    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-except ImportError:  # pragma: no cover - optional dependency
-    ChatOpenAI = None  # type: ignore
-    OpenAIEmbeddings = None  # type: ignore
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models.chat_models import BaseChatModel
 
-try:
-    from langchain_anthropic import ChatAnthropic
-except ImportError:  # pragma: no cover - optional dependency
-    ChatAnthropic = None  # type: ignore
+logger = logging.getLogger(__name__)
 
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-except ImportError:  # pragma: no cover - optional dependency
-    ChatGoogleGenerativeAI = None  # type: ignore
-    GoogleGenerativeAIEmbeddings = None  # type: ignore
 
-try:
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-except ImportError:  # pragma: no cover - optional dependency
-    HuggingFaceEmbeddings = None  # type: ignore
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """Hedging knobs shared by every routed model of a registry (see :mod:`ai_ml.providers.routing`)."""
+
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    min_samples: int = 20
+    # Never hedge sooner than this, however fast the provider usually is.
+    min_hedge_delay: float = 0.05
+    window: int = 256
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "RoutingPolicy":
+        return cls(
+            hedge=settings.hedge_requests,
+            hedge_quantile=settings.hedge_quantile,
+            min_samples=settings.hedge_min_samples,
+        )
 
 
 @dataclass(frozen=True)
@@ -47,6 +70,21 @@ class LLMConfig:
     temperature: float = 0.2
     max_tokens: Optional[int] = None
     extra: Optional[Dict[str, Any]] = None
+    # Tried in order when this provider fails or is slow; see ai_ml.providers.routing.
+    fallbacks: Tuple["LLMConfig", ...] = ()
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "LLMConfig":
+        """Build a config from a settings ``ProviderSpec`` (or any object with the same fields)."""
+
+        return cls(
+            provider=spec.provider,
+            model=spec.model,
+            temperature=spec.temperature,
+            max_tokens=spec.max_tokens,
+            extra=dict(spec.extra) if spec.extra else None,
+            fallbacks=tuple(cls.from_spec(fallback) for fallback in getattr(spec, "fallbacks", ())),
+        )
 
 
 class MissingDependencyError(RuntimeError):
@@ -60,9 +98,30 @@ class MissingAPIKeyError(RuntimeError):
 class LLMProviderRegistry:
     """Lazy registry for LLM and embedding clients keyed by provider/model."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        replay_mode: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+        routing: Optional[RoutingPolicy] = None,
+        circuit: Optional[CircuitBreakerPolicy] = None,
+    ) -> None:
         self._chat_cache: Dict[str, BaseChatModel] = {}
         self._embedding_cache: Dict[str, Embeddings] = {}
+        mode = (replay_mode or "off").lower()
+        if mode not in {"off", "record", "replay"}:
+            raise ValueError(f"Unsupported replay mode '{replay_mode}'; expected 'off', 'record' or 'replay'.")
+        self.replay_mode: Optional[str] = None if mode == "off" else mode
+        if self.replay_mode and not replay_dir:
+            raise ValueError("replay_dir is required when replay_mode is set.")
+        self.replay_dir = replay_dir
+        # Hedging policy and per-provider latency windows shared by every routed model.
+        self.routing = routing
+        self._latency: Any = None
+        # One breaker per provider/model, shared by every client built for it; None disables them.
+        self.circuit = circuit
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breaker_lock = threading.Lock()
 
     def chat(self, config: LLMConfig) -> BaseChatModel:
         key = self._make_key(
@@ -70,23 +129,133 @@ class LLMProviderRegistry:
             config.model,
             config.temperature,
             config.max_tokens,
-            tuple(sorted((config.extra or {}).items())),
+            (tuple(sorted((config.extra or {}).items())), config.fallbacks),
         )
         if key not in self._chat_cache:
-            self._chat_cache[key] = _instantiate_chat_model(config)
+            self._chat_cache[key] = self._build_routed(config) if config.fallbacks else self._build_chat(config)
         return self._chat_cache[key]
 
+    @property
+    def latency(self) -> Any:
+        """The :class:`~ai_ml.providers.routing.ProviderLatencyTracker` behind hedging decisions."""
+
+        if self._latency is None:
+            from ai_ml.providers.routing import ProviderLatencyTracker
+
+            self._latency = ProviderLatencyTracker(window=(self.routing or RoutingPolicy()).window)
+        return self._latency
+
+    def breaker(self, provider: str, model: str) -> CircuitBreaker:
+        key = f"{provider.lower()}|{model}"
+        with self._breaker_lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(provider.lower(), model, self.circuit)
+            return self._breakers[key]
+
+    def ensure_available(self, config: LLMConfig) -> None:
+        """Raise :class:`CircuitOpenError` when ``config`` and all its fallbacks have open circuits."""
+
+        if self.circuit is None:
+            return
+        waits = []
+        for candidate in (config, *config.fallbacks):
+            breaker = self.breaker(candidate.provider, candidate.model)
+            if breaker.state != OPEN:
+                return
+            waits.append(breaker.retry_after())
+        raise CircuitOpenError(config.provider.lower(), config.model, min(waits))
+
+    def circuit_states(self) -> Dict[str, Dict[str, Any]]:
+        with self._breaker_lock:
+            breakers = list(self._breakers.values())
+        return {f"{breaker.provider}/{breaker.model}": breaker.snapshot() for breaker in breakers}
+
+    def prompt_cache_control(self, config: LLMConfig) -> Optional[Dict[str, Any]]:
+        """The ``cache_control`` block to mark a cacheable prompt prefix with, or None.
+
+        ``extra["prompt_cache"]`` may be ``True`` (the provider's default lifetime) or a TTL
+        string such as ``"1h"``.
+        """
+
+        setting = (config.extra or {}).get("prompt_cache")
+        providers = {candidate.provider.lower() for candidate in (config, *config.fallbacks)}
+        # Routed models strip the marker for candidates that do not take it.
+        if not setting or not providers & _CACHE_CONTROL_PROVIDERS:
+            return None
+        control: Dict[str, Any] = {"type": "ephemeral"}
+        if isinstance(setting, str):
+            control["ttl"] = setting
+        return control
+
     def embeddings(self, provider: str, model: Optional[str] = None, **kwargs: Any) -> Embeddings:
         embed_key = self._make_key(provider, model or "default", kwargs.get("temperature"), kwargs.get("max_tokens"), tuple(sorted(kwargs.items())))
         if embed_key not in self._embedding_cache:
             self._embedding_cache[embed_key] = _instantiate_embedding_model(provider, model=model, **kwargs)
         return self._embedding_cache[embed_key]
 
+    def _build_routed(self, config: LLMConfig) -> BaseChatModel:
+        """Route over ``config`` and its fallbacks, skipping providers that cannot be built here."""
+
+        from ai_ml.providers.routing import Candidate, RoutedChatModel
+
+        candidates = []
+        errors = []
+        for candidate in (replace(config, fallbacks=()), *config.fallbacks):
+            try:
+                chat_model = self.chat(replace(candidate, fallbacks=()))
+            except (MissingDependencyError, MissingAPIKeyError) as exc:
+                logger.warning("Skipping %s/%s in its fallback chain: %s", candidate.provider, candidate.model, exc)
+                errors.append(exc)
+                continue
+            candidates.append(
+                Candidate(
+                    provider=candidate.provider.lower(),
+                    model=candidate.model,
+                    chat_model=chat_model,
+                    cache_control=candidate.provider.lower() in _CACHE_CONTROL_PROVIDERS,
+                )
+            )
+        if not candidates:
+            raise errors[0]
+        if len(candidates) == 1:
+            return candidates[0].chat_model
+        return RoutedChatModel(candidates=candidates, policy=self.routing or RoutingPolicy(), latency=self.latency)
+
+    def _build_chat(self, config: LLMConfig) -> BaseChatModel:
+        if self.replay_mode is None:
+            return self._guarded(config, _instantiate_chat_model(config))
+
+        from ai_ml.providers.replay import CassetteStore, RecordingChatModel, ReplayChatModel
+
+        cassette = {
+            "store": CassetteStore(self.replay_dir),
+            "provider": config.provider.lower(),
+            "model": config.model,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+        }
+        if self.replay_mode == "replay":
+            # Replay never touches the provider SDK, so it works without keys or packages.
+            return ReplayChatModel(**cassette)
+        return self._guarded(config, RecordingChatModel(inner=_instantiate_chat_model(config), **cassette))
+
+    def _guarded(self, config: LLMConfig, chat_model: BaseChatModel) -> BaseChatModel:
+        if self.circuit is None:
+            return chat_model
+
+        from ai_ml.providers.routing import CircuitBreakerChatModel
+
+        return CircuitBreakerChatModel(inner=chat_model, breaker=self.breaker(config.provider, config.model))
+
     @staticmethod
     def _make_key(provider: str, model: str, temperature: Optional[float], max_tokens: Optional[int], extra: Any) -> str:
         return f"{provider}|{model}|{temperature}|{max_tokens}|{extra}"
 
 
+# Providers that only cache prompt blocks explicitly marked with cache_control. The fake
+# provider honours the markers too, so cached-token reporting can be exercised offline.
+_CACHE_CONTROL_PROVIDERS = {"anthropic", "claude", "fake"}
+
 _GLOBAL_REGISTRY = LLMProviderRegistry()
 
 
@@ -102,12 +271,24 @@ def get_embedding_model(provider: str, model: Optional[str] = None, **kwargs: An
     return _GLOBAL_REGISTRY.embeddings(provider, model=model, **kwargs)
 
 
+def _optional_import(module: str, attr: str) -> Any:
+    """Import ``attr`` from ``module`` on first use, returning ``None`` when it is not installed."""
+
+    try:
+        return getattr(importlib.import_module(module), attr)
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+
+
 def _instantiate_chat_model(config: LLMConfig) -> BaseChatModel:
     provider = config.provider.lower()
     params = config.extra.copy() if config.extra else {}
+    # Consumed by LLMProviderRegistry.prompt_cache_control, not a client option.
+    params.pop("prompt_cache", None)
     params.setdefault("temperature", config.temperature)
 
     if provider in {"openai", "gpt"}:
+        ChatOpenAI = _optional_import("langchain_openai", "ChatOpenAI")
         if ChatOpenAI is None:
             raise MissingDependencyError("Install langchain-openai to use the OpenAI provider.")
         if not os.environ.get("OPENAI_API_KEY"):
@@ -117,6 +298,7 @@ def _instantiate_chat_model(config: LLMConfig) -> BaseChatModel:
         return ChatOpenAI(model=config.model, **params)
 
     if provider in {"anthropic", "claude"}:
+        ChatAnthropic = _optional_import("langchain_anthropic", "ChatAnthropic")
         if ChatAnthropic is None:
             raise MissingDependencyError("Install langchain-anthropic to use the Anthropic provider.")
         if not os.environ.get("ANTHROPIC_API_KEY"):
@@ -126,6 +308,7 @@ def _instantiate_chat_model(config: LLMConfig) -> BaseChatModel:
         return ChatAnthropic(model=config.model, **params)
 
     if provider in {"google", "gemini", "vertex", "palm"}:
+        ChatGoogleGenerativeAI = _optional_import("langchain_google_genai", "ChatGoogleGenerativeAI")
         if ChatGoogleGenerativeAI is None:
             raise MissingDependencyError("Install langchain-google-genai to use the Google provider.")
         if not os.environ.get("GOOGLE_API_KEY"):
@@ -134,12 +317,20 @@ def _instantiate_chat_model(config: LLMConfig) -> BaseChatModel:
             params.setdefault("max_output_tokens", config.max_tokens)
         return ChatGoogleGenerativeAI(model=config.model, **params)
 
+    if provider == "fake":
+        from ai_ml.providers.fake import FakeChatModel
+
+        if config.max_tokens is not None:
+            params.setdefault("max_tokens", config.max_tokens)
+        return FakeChatModel(model=config.model, **params)
+
     raise ValueError(f"Unsupported LLM provider '{config.provider}'.")
 
 
 def _instantiate_embedding_model(provider: str, model: Optional[str] = None, **kwargs: Any) -> Embeddings:
     provider = provider.lower()
     if provider in {"openai", "gpt"}:
+        OpenAIEmbeddings = _optional_import("langchain_openai", "OpenAIEmbeddings")
         if OpenAIEmbeddings is None:
             raise MissingDependencyError("Install langchain-openai to use OpenAI embeddings.")
         if not os.environ.get("OPENAI_API_KEY"):
@@ -147,6 +338,7 @@ def _instantiate_embedding_model(provider: str, model: Optional[str] = None, **k
         return OpenAIEmbeddings(model=model or "text-embedding-3-large", **kwargs)
 
     if provider in {"google", "gemini"}:
+        GoogleGenerativeAIEmbeddings = _optional_import("langchain_google_genai", "GoogleGenerativeAIEmbeddings")
         if GoogleGenerativeAIEmbeddings is None:
             raise MissingDependencyError("Install langchain-google-genai to use Google embeddings.")
         if not os.environ.get("GOOGLE_API_KEY"):
@@ -154,9 +346,15 @@ def _instantiate_embedding_model(provider: str, model: Optional[str] = None, **k
         return GoogleGenerativeAIEmbeddings(model=model or "models/text-embedding-004", **kwargs)
 
     if provider in {"huggingface", "sentence-transformers", "local"}:
+        HuggingFaceEmbeddings = _optional_import("langchain_community.embeddings", "HuggingFaceEmbeddings")
         if HuggingFaceEmbeddings is None:
             raise MissingDependencyError("Install sentence-transformers to use HuggingFace embeddings.")
         embed_model = model or "sentence-transformers/all-MiniLM-L6-v2"
         return HuggingFaceEmbeddings(model_name=embed_model, **kwargs)
 
+    if provider == "fake":
+        from ai_ml.providers.fake import FakeEmbeddings
+
+        return FakeEmbeddings(**kwargs)
+
     raise ValueError(f"Unsupported embedding provider '{provider}'.")
@@ -0,0 +1,153 @@
+"""Record real provider responses to disk and serve them back without network access.
+
+In ``record`` mode the registry wraps every chat model in :class:`RecordingChatModel`,
+which forwards the call and writes the response, its token usage and its observed
+latency to a JSON cassette keyed by a hash of the provider, model settings and messages.
+In ``replay`` mode :class:`ReplayChatModel` answers from those cassettes (optionally
+sleeping for the recorded latency), so load tests see real payloads and real timing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+REPLAY_MODES = ("record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when no cassette matches the request."""
+
+
+class CassetteStore:
+    """Directory of JSON cassettes, one file per distinct request."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = Path(directory).expanduser()
+
+    def key(self, *, provider: str, model: str, temperature: Any, max_tokens: Any, messages: List[BaseMessage], stop: Any) -> str:
+        payload = {
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stop": stop,
+            "messages": [[message.type, message.content] for message in messages],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.directory / f"{key}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def save(self, key: str, cassette: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent recorders never leave a truncated cassette behind.
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(cassette, stream, indent=2, default=str)
+        os.replace(tmp_path, self.directory / f"{key}.json")
+
+
+class _CassetteChatModel(BaseChatModel):
+    store: Any
+    provider: str
+    model: str
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_provider"] = self.provider
+        return params
+
+    def _cassette_key(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> str:
+        return self.store.key(
+            provider=self.provider,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            messages=messages,
+            stop=stop,
+        )
+
+
+class RecordingChatModel(_CassetteChatModel):
+    """Forward calls to ``inner`` and persist each response as a cassette."""
+
+    inner: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        started = time.perf_counter()
+        # Empty callbacks keep the inner call from being traced (and counted) a second time.
+        response = self.inner.invoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+        latency_s = time.perf_counter() - started
+        self.store.save(
+            self._cassette_key(messages, stop),
+            {
+                "provider": self.provider,
+                "model": self.model,
+                "latency_s": round(latency_s, 4),
+                "content": response.content,
+                "usage_metadata": response.usage_metadata,
+                "response_metadata": response.response_metadata,
+                "recorded_at": time.time(),
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+
+class ReplayChatModel(_CassetteChatModel):
+    """Serve recorded responses, sleeping for the recorded latency when ``simulate_latency``."""
+
+    simulate_latency: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._cassette_key(messages, stop)
+        cassette = self.store.load(key)
+        if cassette is None:
+            raise ReplayMissError(
+                f"No recorded response for {self.provider}/{self.model} (cassette {key[:12]}) in {self.store.directory}."
+            )
+        if self.simulate_latency:
+            time.sleep(float(cassette.get("latency_s") or 0.0))
+        message = AIMessage(
+            content=cassette["content"],
+            usage_metadata=cassette.get("usage_metadata"),
+            response_metadata=cassette.get("response_metadata") or {},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+__all__ = ["CassetteStore", "RecordingChatModel", "ReplayChatModel", "ReplayMissError", "REPLAY_MODES"]
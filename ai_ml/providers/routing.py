@@ -0,0 +1,571 @@
+"""Latency-aware failover and request hedging across chat providers.
+
+Each agent role is normally pinned to one provider, so that provider's tail latency and
+outages become ours. An ``LLMConfig`` with ``fallbacks`` is built by the registry into a
+:class:`RoutedChatModel` over the primary and its fallbacks, in order:
+
+* **failover**: when a provider raises, the next candidate is tried. Candidates whose
+  SDK or API key is missing are skipped when the route is built;
+* **hedging**: when the in-flight request has not answered within the provider's tracked
+  ``hedge_quantile`` latency (p95 by default), a duplicate goes to the next candidate.
+  The first success wins and the other request is cancelled. Async calls cancel the
+  losing task outright; a sync call cannot be interrupted, so its result is discarded.
+  A sync call only leaves the caller's thread when it may be hedged, and then goes to a
+  bounded pool that never queues: when no pool worker is free, the call runs inline and
+  is not hedged, so a slow provider does not pile up more requests on it;
+* **latency tracking**: every completed call feeds a rolling window per provider/model,
+  which sets the hedge delay, and the ``docuthinker_provider_request_seconds`` histogram.
+
+Hedging starts once a provider has ``min_samples`` observations; until then requests only
+fail over. Streaming fails over before the first chunk and is never hedged.
+
+:class:`CircuitBreakerChatModel` puts a provider behind its
+:class:`~ai_ml.providers.circuit.CircuitBreaker`. While the circuit is open it raises
+:class:`~ai_ml.providers.circuit.CircuitOpenError` at once, so a route moves straight
+to its next candidate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from ai_ml.core.metrics import get_metrics_registry
+from ai_ml.providers.circuit import CircuitOpenError
+from ai_ml.providers.registry import RoutingPolicy
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_provider_request_seconds",
+    "Latency of routed chat requests per provider and model, by outcome (ok, error).",
+    ("provider", "model", "outcome"),
+)
+_HEDGES = get_metrics_registry().counter(
+    "docuthinker_provider_hedges_total",
+    "Hedged duplicate requests by the provider they were meant for and result (won, lost, skipped).",
+    ("provider", "model", "result"),
+)
+_FAILOVERS = get_metrics_registry().counter(
+    "docuthinker_provider_failovers_total",
+    "Requests moved to the next candidate after the named provider failed.",
+    ("provider", "model"),
+)
+
+# Worker threads shared by every hedgeable sync call in the process.
+_POOL_WORKERS = 32
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """One provider/model a route can send a request to."""
+
+    provider: str
+    model: str
+    chat_model: Any
+    # Providers that reject unknown content-block keys get prompt-cache markers stripped.
+    cache_control: bool = False
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+
+class ProviderLatencyTracker:
+    """Rolling window of successful call latencies per provider/model."""
+
+    def __init__(self, window: int = 256) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(label)
+            if samples is None:
+                samples = self._samples[label] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, label: str, q: float, *, min_samples: int = 1) -> Optional[float]:
+        """Latency at quantile ``q``, or None with fewer than ``min_samples`` observations."""
+
+        with self._lock:
+            samples = sorted(self._samples.get(label, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+    def snapshot(self, q: float = 0.95) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            labels = list(self._samples)
+        return {
+            label: {"samples": len(self._samples[label]), f"p{round(q * 100)}": self.quantile(label, q)}
+            for label in labels
+        }
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that fails over and hedges across ``candidates`` in order."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    candidates: List[Candidate]
+    policy: RoutingPolicy = RoutingPolicy()
+    latency: ProviderLatencyTracker
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"candidates": [candidate.label for candidate in self.candidates], "hedge": self.policy.hedge}
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        # Usage is attributed to the primary at call start; UsageTracker re-attributes via routed_to.
+        params["ls_provider"] = self.candidates[0].provider
+        params["ls_model_name"] = self.candidates[0].model
+        return params
+
+    # -- Generation ---------------------------------------------------------------
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if not self._may_hedge():
+            return self._generate_inline(messages, stop, kwargs)
+        # Start times are set by the worker, so they never include time spent waiting for one.
+        pending: Dict[Future, Tuple[Candidate, List[float], bool]] = {}
+        errors: List[BaseException] = []
+        cursor = 0
+        hedging = True
+
+        def launch(hedged: bool) -> bool:
+            nonlocal cursor
+            candidate = self.candidates[cursor]
+            started = [time.perf_counter()]
+            future = _pool().try_submit(self._invoke_timed, candidate, started, messages, stop, kwargs)
+            if future is None:
+                return False
+            cursor += 1
+            # Abandoned losers still report their real latency when they eventually finish.
+            future.add_done_callback(
+                lambda done: None if done.cancelled() else self._observe(candidate, started[0], done.exception())
+            )
+            pending[future] = (candidate, started, hedged)
+            return True
+
+        if not launch(hedged=False):
+            return self._generate_inline(messages, stop, kwargs)
+        while pending:
+            timeout = None
+            if hedging and len(pending) == 1:
+                candidate, started, _ = next(iter(pending.values()))
+                timeout = self._hedge_timeout(candidate, started[0], cursor)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if not launch(hedged=True):
+                    # Every worker is busy: another duplicate would only add load to slow providers.
+                    hedging = False
+                    skipped = self.candidates[cursor]
+                    _HEDGES.inc(provider=skipped.provider, model=skipped.model, result="skipped")
+                continue
+            # Settle a success before any failure that finished alongside it, so no extra failover launches.
+            for future in sorted(done, key=lambda item: item.exception() is not None):
+                candidate, _, hedged = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                    self._failed(candidate, error)
+                    if not pending and cursor < len(self.candidates) and not launch(hedged=False):
+                        return self._generate_inline(messages, stop, kwargs, start=cursor, errors=errors)
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                self._settle_hedges(candidate, hedged, pending.values())
+                return _result(future.result(), candidate)
+        raise errors[-1]
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        pending: Dict[asyncio.Task, Tuple[Candidate, float, bool]] = {}
+        errors: List[BaseException] = []
+        cursor = 0
+
+        def launch(hedged: bool) -> None:
+            nonlocal cursor
+            candidate = self.candidates[cursor]
+            cursor += 1
+            task = asyncio.ensure_future(
+                candidate.chat_model.ainvoke(
+                    _for_candidate(messages, candidate), stop=stop, config={"callbacks": []}, **kwargs
+                )
+            )
+            pending[task] = (candidate, time.perf_counter(), hedged)
+
+        launch(hedged=False)
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1:
+                    candidate, started, _ = next(iter(pending.values()))
+                    timeout = self._hedge_timeout(candidate, started, cursor)
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(hedged=True)
+                    continue
+                for task in sorted(done, key=lambda item: item.exception() is not None):
+                    candidate, started, hedged = pending.pop(task)
+                    error = task.exception()
+                    self._observe(candidate, started, error)
+                    if error is not None:
+                        errors.append(error)
+                        self._failed(candidate, error)
+                        if not pending and cursor < len(self.candidates):
+                            launch(hedged=False)
+                        continue
+                    self._settle_hedges(candidate, hedged, pending.values())
+                    return _result(task.result(), candidate)
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors[-1]
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for position, candidate in enumerate(self.candidates):
+            started = time.perf_counter()
+            streamed = False
+            try:
+                for chunk in candidate.chat_model.stream(
+                    _for_candidate(messages, candidate), stop=stop, config={"callbacks": []}, **kwargs
+                ):
+                    streamed = True
+                    if run_manager is not None:
+                        run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as exc:
+                self._observe(candidate, started, exc)
+                # Once tokens have reached the caller, switching providers would splice two answers.
+                if streamed or position == len(self.candidates) - 1:
+                    raise
+                self._failed(candidate, exc)
+                continue
+            self._observe(candidate, started, None)
+            return
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for position, candidate in enumerate(self.candidates):
+            started = time.perf_counter()
+            streamed = False
+            try:
+                async for chunk in candidate.chat_model.astream(
+                    _for_candidate(messages, candidate), stop=stop, config={"callbacks": []}, **kwargs
+                ):
+                    streamed = True
+                    if run_manager is not None:
+                        await run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                    yield ChatGenerationChunk(message=chunk)
+            except Exception as exc:
+                self._observe(candidate, started, exc)
+                if streamed or position == len(self.candidates) - 1:
+                    raise
+                self._failed(candidate, exc)
+                continue
+            self._observe(candidate, started, None)
+            return
+
+    # -- Helpers ------------------------------------------------------------------
+
+    def _may_hedge(self) -> bool:
+        """Whether a call starting now could be hedged: otherwise it runs on the caller's thread."""
+
+        if not self.policy.hedge or len(self.candidates) < 2:
+            return False
+        primary = self.candidates[0]
+        return self.latency.quantile(primary.label, self.policy.hedge_quantile, min_samples=self.policy.min_samples) is not None
+
+    def _hedge_timeout(self, candidate: Candidate, started: float, cursor: int) -> Optional[float]:
+        """Seconds until a hedge for the one in-flight request should be sent, or None to keep waiting."""
+
+        if not self.policy.hedge or cursor >= len(self.candidates):
+            return None
+        delay = self.latency.quantile(candidate.label, self.policy.hedge_quantile, min_samples=self.policy.min_samples)
+        if delay is None:
+            return None
+        return max(0.0, started + max(delay, self.policy.min_hedge_delay) - time.perf_counter())
+
+    def _generate_inline(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        kwargs: Dict[str, Any],
+        *,
+        start: int = 0,
+        errors: Optional[List[BaseException]] = None,
+    ) -> ChatResult:
+        """Try ``candidates[start:]`` in order on the caller's thread, without hedging."""
+
+        errors = errors if errors is not None else []
+        for candidate in self.candidates[start:]:
+            started = time.perf_counter()
+            try:
+                message = candidate.chat_model.invoke(
+                    _for_candidate(messages, candidate), stop=stop, config={"callbacks": []}, **kwargs
+                )
+            except Exception as exc:
+                self._observe(candidate, started, exc)
+                errors.append(exc)
+                self._failed(candidate, exc)
+                continue
+            self._observe(candidate, started, None)
+            return _result(message, candidate)
+        raise errors[-1]
+
+    @staticmethod
+    def _invoke_timed(
+        candidate: Candidate,
+        started: List[float],
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        kwargs: Dict[str, Any],
+    ) -> AIMessage:
+        started[0] = time.perf_counter()
+        return candidate.chat_model.invoke(_for_candidate(messages, candidate), stop=stop, config={"callbacks": []}, **kwargs)
+
+    def _observe(self, candidate: Candidate, started: float, error: Optional[BaseException]) -> None:
+        seconds = time.perf_counter() - started
+        outcome = "ok" if error is None else "error"
+        _REQUEST_SECONDS.observe(seconds, provider=candidate.provider, model=candidate.model, outcome=outcome)
+        if error is None:
+            self.latency.observe(candidate.label, seconds)
+
+    def _failed(self, candidate: Candidate, error: BaseException) -> None:
+        _FAILOVERS.inc(provider=candidate.provider, model=candidate.model)
+        if isinstance(error, CircuitOpenError):
+            logger.debug("Chat provider %s skipped: %s", candidate.label, error)
+            return
+        logger.warning("Chat provider %s failed, trying the next candidate: %s", candidate.label, error)
+
+    def _settle_hedges(self, winner: Candidate, hedged: bool, losers: Iterable[Tuple[Candidate, float, bool]]) -> None:
+        if hedged:
+            _HEDGES.inc(provider=winner.provider, model=winner.model, result="won")
+        for candidate, _, loser_hedged in losers:
+            if loser_hedged:
+                _HEDGES.inc(provider=candidate.provider, model=candidate.model, result="lost")
+
+
+class CircuitBreakerChatModel(BaseChatModel):
+    """Forward calls to ``inner`` unless its provider's circuit is open."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: Any
+    breaker: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "circuit-breaker-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"provider": self.breaker.provider, "model": self.breaker.model}
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any) -> Dict[str, Any]:
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_provider"] = self.breaker.provider
+        params["ls_model_name"] = self.breaker.model
+        return params
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        # Keeps with_structured_output available when the wrapped client supports tools.
+        return self.model_copy(update={"inner": self.inner.bind_tools(tools, **kwargs)})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        probe = self.breaker.acquire()
+        try:
+            # Empty callbacks keep the inner call from being traced (and counted) a second time.
+            message = self.inner.invoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+        except Exception as exc:
+            self.breaker.record_failure(exc, probe)
+            raise
+        self.breaker.record_success(probe)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        probe = self.breaker.acquire()
+        try:
+            message = await self.inner.ainvoke(messages, stop=stop, config={"callbacks": []}, **kwargs)
+        except asyncio.CancelledError:
+            # A cancelled hedge says nothing about the provider's health.
+            self.breaker.release(probe)
+            raise
+        except Exception as exc:
+            self.breaker.record_failure(exc, probe)
+            raise
+        self.breaker.record_success(probe)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        probe = self.breaker.acquire()
+        failed = False
+        try:
+            for chunk in self.inner.stream(messages, stop=stop, config={"callbacks": []}, **kwargs):
+                if run_manager is not None:
+                    run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                yield ChatGenerationChunk(message=chunk)
+        except Exception as exc:
+            failed = True
+            self.breaker.record_failure(exc, probe)
+            raise
+        finally:
+            # Also settles streams the caller stopped reading early.
+            if not failed:
+                self.breaker.record_success(probe)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        probe = self.breaker.acquire()
+        failed = False
+        try:
+            async for chunk in self.inner.astream(messages, stop=stop, config={"callbacks": []}, **kwargs):
+                if run_manager is not None:
+                    await run_manager.on_llm_new_token(chunk.content, chunk=chunk)
+                yield ChatGenerationChunk(message=chunk)
+        except asyncio.CancelledError:
+            failed = True
+            self.breaker.release(probe)
+            raise
+        except Exception as exc:
+            failed = True
+            self.breaker.record_failure(exc, probe)
+            raise
+        finally:
+            if not failed:
+                self.breaker.record_success(probe)
+
+
+class _RoutePool:
+    """Thread pool that never queues: :meth:`try_submit` returns None when every worker is busy."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._busy = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docuthinker-route")
+
+    def try_submit(self, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+        with self._lock:
+            if self._busy >= self.max_workers:
+                return None
+            self._busy += 1
+        try:
+            return self._executor.submit(self._run, fn, args)
+        except BaseException:
+            self._release()
+            raise
+
+    def _run(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        try:
+            return fn(*args)
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._busy -= 1
+
+
+_POOL: Optional[_RoutePool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> _RoutePool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = _RoutePool(_POOL_WORKERS)
+    return _POOL
+
+
+def _for_candidate(messages: List[BaseMessage], candidate: Candidate) -> List[BaseMessage]:
+    """Drop prompt-cache markers for providers that do not accept them."""
+
+    if candidate.cache_control:
+        return messages
+    stripped: List[BaseMessage] = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, list) and any(isinstance(block, dict) and "cache_control" in block for block in content):
+            content = [
+                {key: value for key, value in block.items() if key != "cache_control"} if isinstance(block, dict) else block
+                for block in content
+            ]
+            message = message.model_copy(update={"content": content})
+        stripped.append(message)
+    return stripped
+
+
+def _result(message: AIMessage, candidate: Candidate) -> ChatResult:
+    metadata = {**(message.response_metadata or {}), "routed_to": {"provider": candidate.provider, "model": candidate.model}}
+    return ChatResult(generations=[ChatGeneration(message=message.model_copy(update={"response_metadata": metadata}))])
+
+
+__all__ = ["Candidate", "CircuitBreakerChatModel", "ProviderLatencyTracker", "RoutedChatModel", "RoutingPolicy"]
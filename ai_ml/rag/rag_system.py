@@ -9,7 +9,7 @@ from ai_ml.services import get_document_service
 
 def retrieval_augmented_generation(text: str, question: Optional[str] = None) -> Dict[str, Any]:
     service = get_document_service()
-    return service.pipeline.run(text, question=question)
+    return service.run_pipeline(text, question=question)
 
 
 __all__ = ["retrieval_augmented_generation"]
@@ -0,0 +1,22 @@
+"""Retrieval primitives: BM25 keyword index, hybrid rank-fused retriever, reranking and context packing."""
+
+from .bm25 import BM25Index, tokenize
+from .context import ContextBuilder, PackedContext, approx_tokens
+from .hybrid import RETRIEVAL_MODES, HybridRetriever, RetrievalConfig, build_retriever, reciprocal_rank_fusion
+from .reranker import DEFAULT_RERANKER_MODEL, RERANKER_BACKENDS, CrossEncoderReranker
+
+__all__ = [
+    "BM25Index",
+    "tokenize",
+    "HybridRetriever",
+    "RetrievalConfig",
+    "RETRIEVAL_MODES",
+    "build_retriever",
+    "reciprocal_rank_fusion",
+    "ContextBuilder",
+    "PackedContext",
+    "approx_tokens",
+    "CrossEncoderReranker",
+    "DEFAULT_RERANKER_MODEL",
+    "RERANKER_BACKENDS",
+]
@@ -0,0 +1,92 @@
+"""Array-backed Okapi BM25 index over a document's chunks.
+
+Dense embeddings blur exact tokens, so identifiers (``PRJ-4821``), figures (``$420k``,
+``12.5%``) and rare names are often missed by the vector retriever. This index keeps the
+postings for each term as contiguous NumPy arrays, so scoring a query is a handful of
+vectorised scatter-adds rather than a Python loop over chunks.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Keep tokens such as "prj-4821", "v1.2", "12.5" and "$420k" whole: they are what BM25 is here for.
+_TOKEN_RE = re.compile(r"[$€£]?\w+(?:[.\-_/]\w+)*%?")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case ``text`` and split it into BM25 terms."""
+
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 scores over a fixed list of texts."""
+
+    def __init__(self, texts: Sequence[str], *, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            terms = tokenize(text)
+            lengths[doc_id] = len(terms)
+            for term in terms:
+                counts = postings.setdefault(term, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        # CSR layout: term t's postings live at [offsets[t], offsets[t + 1]) of doc_ids/freqs.
+        self.vocabulary: Dict[str, int] = {}
+        offsets = [0]
+        doc_ids: List[int] = []
+        freqs: List[int] = []
+        for term_id, (term, counts) in enumerate(postings.items()):
+            self.vocabulary[term] = term_id
+            doc_ids.extend(counts.keys())
+            freqs.extend(counts.values())
+            offsets.append(len(doc_ids))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self.freqs = np.asarray(freqs, dtype=np.float32)
+
+        document_frequency = np.diff(self.offsets).astype(np.float32)
+        # Lucene's log(1 + ...) form keeps terms present in most chunks from scoring negative.
+        self.idf = np.log1p((self.size - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+        average = float(lengths.mean()) if self.size else 0.0
+        self._length_norm = k1 * (1.0 - b + b * lengths / (average or 1.0))
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every text for ``query`` (zeros when no term matches)."""
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            ids = self.doc_ids[start:end]
+            tf = self.freqs[start:end]
+            scores[ids] += self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + self._length_norm[ids])
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top ``k`` ``(index, score)`` pairs with a positive score, best first."""
+
+        if not self.size or k <= 0:
+            return []
+        scores = self.scores(query)
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(index), float(scores[index])) for index in top if scores[index] > 0.0]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+__all__ = ["BM25Index", "tokenize"]
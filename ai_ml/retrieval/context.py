@@ -0,0 +1,209 @@
+"""Pack retrieved chunks into a compact, token-budgeted prompt context.
+
+Retrievers return chunks that overlap (the splitter repeats ``chunk_overlap`` characters
+between neighbours), near-duplicates of each other, or simply more text than the prompt
+needs. :class:`ContextBuilder` turns a candidate pool into the context actually sent:
+
+1. drops exact duplicates and candidates whose similarity to the query is below
+   ``similarity_cutoff`` (so ``k`` adapts to how many chunks are actually relevant);
+2. orders the rest by maximal marginal relevance, trading query relevance against
+   redundancy with what is already selected;
+3. adds chunks until ``max_chunks`` or the token budget is reached, trimming any span a
+   selected chunk shares with a neighbouring selected chunk.
+
+Selected chunks are emitted in document order so adjacent excerpts read naturally.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Shorter shared spans are coincidence (a repeated phrase), not splitter overlap.
+_MIN_OVERLAP_CHARS = 24
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used when no tokenizer is supplied."""
+
+    return math.ceil(len(text) / 4) if text else 0
+
+
+@dataclass
+class PackedContext:
+    """The excerpts chosen for a prompt; ``texts[i]`` is ``documents[i]`` with shared spans trimmed."""
+
+    documents: List[Any]
+    texts: List[str]
+    tokens: int
+    candidates: int
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    def join(self, separator: str = "\n\n") -> str:
+        return separator.join(self.texts)
+
+    def numbered(self) -> str:
+        """Excerpts prefixed ``[1]``, ``[2]``... for prompts that ask the model to cite them."""
+
+        return "\n\n".join(f"[{number}] {text}" for number, text in enumerate(self.texts, start=1))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"candidates": self.candidates, "selected": len(self.documents), "tokens": self.tokens, "dropped": dict(self.dropped)}
+
+
+class ContextBuilder:
+    """Deduplicate, MMR-select and budget-pack retrieved chunks."""
+
+    def __init__(
+        self,
+        *,
+        token_budget: int = 1500,
+        max_chunks: Optional[int] = None,
+        mmr_lambda: float = 0.7,
+        similarity_cutoff: Optional[float] = None,
+        token_counter: Callable[[str], int] = approx_tokens,
+    ) -> None:
+        self.token_budget = token_budget
+        self.max_chunks = max_chunks
+        self.mmr_lambda = mmr_lambda
+        self.similarity_cutoff = similarity_cutoff
+        self.token_counter = token_counter
+
+    def build(
+        self,
+        documents: Sequence[Any],
+        *,
+        query_vector: Optional[Sequence[float]] = None,
+        document_vectors: Optional[Sequence[Sequence[float]]] = None,
+        relevance: Optional[Sequence[float]] = None,
+    ) -> PackedContext:
+        """Select from ``documents`` (best first, as retrieved).
+
+        With vectors, relevance is cosine similarity to the query and redundancy is cosine
+        similarity between chunks; without them, retrieval rank stands in for relevance and
+        only exact duplicates and overlapping spans are removed. ``relevance`` (e.g.
+        cross-encoder scores in ``[0, 1]``) replaces the query similarity for MMR ordering;
+        ``similarity_cutoff`` still applies to the embedding similarity.
+        """
+
+        dropped = {"duplicate": 0, "cutoff": 0, "budget": 0}
+        seen: set = set()
+        keep: List[int] = []
+        for index, doc in enumerate(documents):
+            text = doc.page_content.strip()
+            if not text or text in seen:
+                dropped["duplicate"] += 1
+                continue
+            seen.add(text)
+            keep.append(index)
+
+        query_similarity, similarity = self._similarities(len(documents), keep, query_vector, document_vectors)
+        scores = list(relevance) if relevance is not None else query_similarity
+        if self.similarity_cutoff is not None and similarity is not None:
+            # Always keep the best candidate so a strict cutoff never yields an empty context.
+            best = max(keep, key=scores.__getitem__, default=None)
+            passing = [index for index in keep if query_similarity[index] >= self.similarity_cutoff or index == best]
+            dropped["cutoff"] = len(keep) - len(passing)
+            keep = passing
+
+        limit = self.max_chunks or len(keep)
+        selected: List[int] = []
+        texts: Dict[int, str] = {}
+        tokens = 0
+        remaining = list(keep)
+        while remaining and len(selected) < limit:
+            choice = self._next_mmr(remaining, selected, scores, similarity)
+            remaining.remove(choice)
+            text = self._trim(documents, choice, selected, texts)
+            if not text:
+                dropped["duplicate"] += 1
+                continue
+            cost = self.token_counter(text)
+            if tokens + cost > self.token_budget:
+                if selected:
+                    dropped["budget"] += 1
+                    continue
+                # A single oversized chunk is cut to (roughly) the budget rather than dropped.
+                text = text[: max(1, self.token_budget) * 4]
+                cost = self.token_counter(text)
+            selected.append(choice)
+            texts[choice] = text
+            tokens += cost
+
+        ordered = sorted(selected, key=lambda index: _position(documents[index], index))
+        return PackedContext(
+            documents=[documents[index] for index in ordered],
+            texts=[texts[index] for index in ordered],
+            tokens=tokens,
+            candidates=len(documents),
+            dropped=dropped,
+        )
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    def _similarities(
+        self,
+        count: int,
+        keep: List[int],
+        query_vector: Optional[Sequence[float]],
+        document_vectors: Optional[Sequence[Sequence[float]]],
+    ) -> Tuple[List[float], Optional[np.ndarray]]:
+        if query_vector is None or document_vectors is None or not keep:
+            # Rank-order relevance; no inter-chunk similarity, so MMR reduces to retrieval order.
+            return [1.0 - index / max(count, 1) for index in range(count)], None
+        matrix = _normalise(np.asarray(document_vectors, dtype=np.float32))
+        query = _normalise(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+        return (matrix @ query).tolist(), matrix @ matrix.T
+
+    def _next_mmr(self, remaining: List[int], selected: List[int], relevance: List[float], similarity: Any) -> int:
+        if similarity is None or not selected:
+            return max(remaining, key=relevance.__getitem__)
+        redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+        scores = self.mmr_lambda * np.asarray([relevance[index] for index in remaining]) - (1.0 - self.mmr_lambda) * redundancy
+        return remaining[int(np.argmax(scores))]
+
+    def _trim(self, documents: Sequence[Any], choice: int, selected: List[int], texts: Dict[int, str]) -> str:
+        """Drop the span ``choice`` shares with an already selected neighbour's text."""
+
+        text = documents[choice].page_content.strip()
+        for other in selected:
+            other_text = texts[other]
+            if text in other_text:
+                return ""
+            if _position(documents[other], other) < _position(documents[choice], choice):
+                text = text[_overlap(other_text, text) :].lstrip()
+            else:
+                cut = _overlap(text, other_text)
+                text = text[: len(text) - cut].rstrip() if cut else text
+        return text
+
+
+def _position(doc: Any, fallback: int) -> int:
+    metadata = getattr(doc, "metadata", None) or {}
+    return metadata.get("chunk", fallback)
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of ``left`` that is a prefix of ``right`` (0 if short)."""
+
+    probe = right[:_MIN_OVERLAP_CHARS]
+    if len(probe) < _MIN_OVERLAP_CHARS:
+        return 0
+    start = left.find(probe)
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+__all__ = ["ContextBuilder", "PackedContext", "approx_tokens"]
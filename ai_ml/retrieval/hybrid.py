@@ -0,0 +1,103 @@
+"""Hybrid dense + BM25 retrieval fused with reciprocal rank fusion (RRF).
+
+Each query pulls ``candidates`` chunks from the FAISS index and from a
+:class:`~ai_ml.retrieval.bm25.BM25Index` over the same chunks, then ranks the union by
+``sum(1 / (rrf_k + rank))``. RRF only looks at ranks, so cosine distances and BM25 scores
+never need to be calibrated against each other, and a chunk that either retriever ranks
+highly (an exact identifier match, or a paraphrase) makes the final top-k.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from ai_ml.retrieval.bm25 import BM25Index
+from ai_ml.tools.document_tools import RetrievalConfig, _load_faiss
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from langchain_core.embeddings import Embeddings
+
+RETRIEVAL_MODES = ("hybrid", "dense", "bm25")
+
+# Metadata key recording a chunk's position, used to line up dense hits with BM25 hits.
+CHUNK_KEY = "chunk"
+
+
+class HybridRetriever(BaseRetriever):
+    """LangChain retriever fusing a FAISS store and a BM25 index over the same chunks."""
+
+    vectorstore: Any
+    documents: List[Document]
+    bm25: Any
+    mode: str = "hybrid"
+    k: int = 6
+    candidates: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        k: Optional[int] = None,
+    ) -> List[Document]:
+        top_k = k or self.k
+        pool = max(self.candidates, top_k)
+        rankings: List[List[int]] = []
+        if self.mode in {"hybrid", "dense"}:
+            hits = self.vectorstore.similarity_search(query, k=min(pool, len(self.documents)))
+            rankings.append([doc.metadata[CHUNK_KEY] for doc in hits])
+        if self.mode in {"hybrid", "bm25"}:
+            rankings.append([index for index, _ in self.bm25.search(query, pool)])
+        return [self.documents[index] for index in reciprocal_rank_fusion(rankings, rrf_k=self.rrf_k)[:top_k]]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], *, rrf_k: int = 60) -> List[int]:
+    """Merge ranked id lists, best first; ties keep first-seen order."""
+
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def build_retriever(
+    documents: Iterable[Document],
+    vectors: Iterable[List[float]],
+    *,
+    embeddings: Embeddings,
+    config: Optional[RetrievalConfig] = None,
+) -> BaseRetriever:
+    """Index pre-embedded chunks for ``config.mode`` retrieval (plain FAISS for ``dense``)."""
+
+    cfg = config or RetrievalConfig()
+    if cfg.mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unsupported retrieval mode '{cfg.mode}'; expected one of {RETRIEVAL_MODES}.")
+    docs = [
+        Document(page_content=doc.page_content, metadata={**doc.metadata, CHUNK_KEY: index})
+        for index, doc in enumerate(documents)
+    ]
+    store = _load_faiss().from_embeddings(
+        [(doc.page_content, list(vector)) for doc, vector in zip(docs, vectors)],
+        embeddings,
+        metadatas=[doc.metadata for doc in docs],
+    )
+    if cfg.mode == "dense":
+        return store.as_retriever(search_kwargs={"k": cfg.top_k})
+    return HybridRetriever(
+        vectorstore=store,
+        documents=docs,
+        bm25=BM25Index([doc.page_content for doc in docs]),
+        mode=cfg.mode,
+        k=cfg.top_k,
+        candidates=cfg.candidates,
+        rrf_k=cfg.rrf_k,
+    )
+
+
+__all__ = ["CHUNK_KEY", "HybridRetriever", "RETRIEVAL_MODES", "RetrievalConfig", "build_retriever", "reciprocal_rank_fusion"]
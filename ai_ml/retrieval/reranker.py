@@ -0,0 +1,193 @@
+"""Local cross-encoder reranking of retrieved chunks.
+
+Bi-encoder retrieval embeds the query and each chunk separately, so it has to
+over-retrieve to find the relevant chunks. A cross-encoder reads the query and a chunk
+together and scores their relevance much more accurately. It is too slow to run over a
+whole corpus, but cheap enough to rerank a candidate pool of a few dozen chunks.
+:class:`CrossEncoderReranker` does this on CPU:
+
+* pairs are scored in length-sorted batches, which keeps padding per batch small;
+* the model runs through PyTorch (``transformers``), or through ONNX Runtime via
+  ``optimum`` when ``backend="onnx"``;
+* scores are cached in an LRU keyed by ``(query, chunk hash)``, so a repeated question or
+  a crew agent searching the same chunks again costs no model calls.
+
+Scores are sigmoid-squashed logits in ``[0, 1]``, which keeps them on the same scale as
+the cosine similarities :class:`~ai_ml.retrieval.context.ContextBuilder` uses for MMR.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+from ai_ml.core.metrics import get_metrics_registry
+from ai_ml.providers.registry import MissingDependencyError
+
+logger = logging.getLogger(__name__)
+
+RERANKER_BACKENDS = ("torch", "onnx")
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+_CACHE_REQUESTS = get_metrics_registry().counter(
+    "docuthinker_rerank_cache_requests_total",
+    "Cross-encoder score lookups, by cache result.",
+    ("result",),
+)
+_BATCH_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_rerank_batch_seconds",
+    "Wall-clock seconds per cross-encoder batch.",
+    ("backend",),
+)
+
+
+class CrossEncoderReranker:
+    """Score ``(query, chunk)`` pairs with a small local cross-encoder."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANKER_MODEL,
+        *,
+        backend: str = "torch",
+        batch_size: int = 32,
+        max_length: int = 512,
+        cache_size: int = 4096,
+    ) -> None:
+        if backend not in RERANKER_BACKENDS:
+            raise ValueError(f"Unsupported reranker backend '{backend}'; expected one of {RERANKER_BACKENDS}.")
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._model: Any = None
+        self._tokenizer: Any = None
+        self._model_lock = threading.Lock()
+
+    def score(self, query: str, texts: Sequence[str]) -> List[float]:
+        """Relevance of each text to ``query`` in ``[0, 1]``, in input order."""
+
+        keys = [(query, _text_hash(text)) for text in texts]
+        scores: List[Optional[float]] = [None] * len(texts)
+        with self._cache_lock:
+            for position, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    scores[position] = cached
+        misses = [position for position, value in enumerate(scores) if value is None]
+        _CACHE_REQUESTS.inc(len(texts) - len(misses), result="hit")
+        _CACHE_REQUESTS.inc(len(misses), result="miss")
+
+        if misses:
+            # Texts of similar length share a batch, so little compute goes to padding tokens.
+            misses.sort(key=lambda position: len(texts[position]))
+            for start in range(0, len(misses), self.batch_size):
+                batch = misses[start : start + self.batch_size]
+                started = time.perf_counter()
+                logits = self._predict(query, [texts[position] for position in batch])
+                _BATCH_SECONDS.observe(time.perf_counter() - started, backend=self.backend)
+                for position, logit in zip(batch, logits):
+                    scores[position] = _sigmoid(logit)
+            with self._cache_lock:
+                for position in misses:
+                    self._cache[keys[position]] = scores[position]
+                    self._cache.move_to_end(keys[position])
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [float(value) for value in scores]
+
+    def rerank(self, query: str, documents: Sequence[Any], *, top_n: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """Return ``(document, score)`` pairs best first, keeping at most ``top_n``."""
+
+        scores = self.score(query, [doc.page_content for doc in documents])
+        ranked = sorted(zip(documents, scores), key=lambda pair: pair[1], reverse=True)
+        return ranked[:top_n] if top_n else ranked
+
+    def load(self) -> None:
+        """Load the tokenizer and model now instead of on the first query (used by warmup)."""
+
+        self._ensure_model()
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Model execution
+
+    def _predict(self, query: str, texts: List[str]) -> List[float]:
+        tokenizer, model = self._ensure_model()
+        encoded = tokenizer(
+            [query] * len(texts),
+            texts,
+            padding=True,
+            truncation="only_second",
+            max_length=self.max_length,
+            return_tensors="pt",
+        )
+        if self.backend == "onnx":
+            logits = model(**encoded).logits
+        else:
+            import torch
+
+            with torch.inference_mode():
+                logits = model(**encoded).logits
+        # Single-logit relevance heads (ms-marco style); two-class heads score the positive class.
+        column = logits[:, -1] if logits.shape[-1] > 1 else logits[:, 0]
+        return [float(value) for value in column.tolist()]
+
+    def _ensure_model(self) -> Tuple[Any, Any]:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._tokenizer, self._model = self._load_model()
+        return self._tokenizer, self._model
+
+    def _load_model(self) -> Tuple[Any, Any]:
+        try:
+            from transformers import AutoTokenizer
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise MissingDependencyError("Install transformers to use the cross-encoder reranker.") from exc
+
+        started = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        if self.backend == "onnx":
+            try:
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise MissingDependencyError("Install optimum[onnxruntime] to use the ONNX reranker backend.") from exc
+            # A directory already holding model.onnx (see convert_to_onnx.py) loads as-is; a hub id is exported once.
+            exported = os.path.exists(os.path.join(self.model_name, "model.onnx"))
+            model = ORTModelForSequenceClassification.from_pretrained(self.model_name, export=not exported)
+        else:
+            try:
+                from transformers import AutoModelForSequenceClassification
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise MissingDependencyError("Install torch and transformers to use the cross-encoder reranker.") from exc
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.eval()
+        logger.info("Loaded %s reranker %s in %.2fs", self.backend, self.model_name, time.perf_counter() - started)
+        return tokenizer, model
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _sigmoid(value: float) -> float:
+    if value >= 0:
+        return 1.0 / (1.0 + math.exp(-value))
+    exp = math.exp(value)
+    return exp / (1.0 + exp)
+
+
+__all__ = ["CrossEncoderReranker", "DEFAULT_RERANKER_MODEL", "RERANKER_BACKENDS"]
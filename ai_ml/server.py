@@ -1,35 +1,212 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
-import uvicorn
+from typing import Any, Dict, List, Literal, Optional
 
-# Import the core analysis function
-from ai_ml.backend import analyze_document
+from ai_ml.admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected
+
+# Import the core analysis function (the service itself is built on the first request)
+from ai_ml.backend import (
+    analyze_document,
+    ask,
+    cancel_job,
+    chat,
+    combined_analysis,
+    get_job,
+    reset_chat,
+    submit_job,
+)
+from ai_ml.core import get_metrics_registry, load_settings
+from ai_ml.services.jobs import FINISHED, SUCCEEDED, NoJobWorkersError, get_job_queue
+from ai_ml.warmup import get_warmup_state, start_background_warmup
 
 app = FastAPI(title="Document Analysis Mockup API")
 
+# Per-process lanes: interactive (QA, chat) and batch (full analyses).
+admission = AdmissionController.from_settings(load_settings())
+
 
 class AnalysisRequest(BaseModel):
     document: str
     question: str = None
     translate_lang: str = "fr"
     metadata: Optional[Dict[str, Any]] = None
+    # fast | standard | deep; None uses DOCUTHINKER_ANALYSIS_MODE.
+    mode: Optional[Literal["fast", "standard", "deep"]] = None
+
+
+class CombinedAnalysisRequest(BaseModel):
+    document: str
+    # Subset of summary, bullet_summary, topics, sentiment, recommendations; None requests all.
+    fields: Optional[List[Literal["summary", "bullet_summary", "topics", "sentiment", "recommendations"]]] = None
+
+
+class QuestionRequest(BaseModel):
+    document: str
+    question: str
+
+
+class ChatRequest(BaseModel):
+    message: str
+    # Omit to start a new session; the response carries the id to continue it.
+    session_id: Optional[str] = None
+    # Binds the session to this document; later turns need not resend it.
+    document: Optional[str] = None
+
+
+@app.on_event("startup")
+async def warm_models():
+    # Warm in the background so the port binds immediately; /ready flips once models are loaded.
+    if load_settings().warmup_on_startup:
+        start_background_warmup()
+    else:
+        get_warmup_state().mark_ready({})
+    # Job workers belong in `python -m ai_ml.services.jobs`: here they would run in every
+    # uvicorn worker and outside the admission lanes. Opt in for single-process setups.
+    if load_settings().job_run_in_server:
+        get_job_queue().start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    if load_settings().job_run_in_server:
+        get_job_queue().stop(timeout=5.0)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    content = {"detail": str(exc), "lane": exc.lane, "reason": exc.reason, "retry_after": exc.retry_after}
+    if exc.lane == BATCH:
+        content["hint"] = "Submit long analyses through /jobs to queue them instead."
+    return JSONResponse(status_code=429, content=content, headers={"Retry-After": str(int(exc.retry_after))})
+
+
+@app.exception_handler(NoJobWorkersError)
+async def no_job_workers(request: Request, exc: NoJobWorkersError):
+    # Queueing anyway would leave the job waiting forever; fail loudly instead.
+    retry_after = int(load_settings().job_lease_seconds)
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(retry_after)})
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    state = get_warmup_state()
+    return JSONResponse(status_code=200 if state.ready else 503, content={**state.snapshot(), "admission": admission.snapshot()})
+
 
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(get_metrics_registry().render(), media_type="text/plain; version=0.0.4")
 
+
+# Analyses block for seconds, so they run on the threadpool: the event loop stays free and
+# identical concurrent requests can be coalesced by the service. Each holds a slot of its
+# admission lane while it runs; a saturated lane answers 429 (see admission_rejected).
 @app.post("/analyze")
 async def analyze(req: AnalysisRequest):
-    try:
-        results = analyze_document(
-            document=req.document,
-            question=req.question,
-            translate_lang=req.translate_lang,
-            metadata=req.metadata,
-        )
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with admission.slot(BATCH):
+        try:
+            results = await run_in_threadpool(
+                analyze_document,
+                document=req.document,
+                question=req.question,
+                translate_lang=req.translate_lang,
+                metadata=req.metadata,
+                mode=req.mode,
+            )
+            return results
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/analyze/combined")
+async def analyze_combined(req: CombinedAnalysisRequest):
+    async with admission.slot(BATCH):
+        try:
+            return await run_in_threadpool(combined_analysis, document=req.document, fields=req.fields)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/qa")
+async def question_answer(req: QuestionRequest):
+    async with admission.slot(INTERACTIVE):
+        try:
+            return await run_in_threadpool(ask, document=req.document, question=req.question)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/chat")
+async def chat_turn(req: ChatRequest):
+    async with admission.slot(INTERACTIVE):
+        try:
+            return await run_in_threadpool(chat, message=req.message, session_id=req.session_id, document=req.document)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.delete("/chat/{session_id}")
+async def end_chat(session_id: str):
+    if not reset_chat(session_id):
+        raise HTTPException(status_code=404, detail="Unknown chat session")
+    return {"session_id": session_id, "deleted": True}
+
+
+@app.post("/jobs/analyze", status_code=202)
+async def submit_analysis(req: AnalysisRequest):
+    return submit_job("analyze", jsonable_encoder(req))
+
+
+@app.post("/jobs/combined", status_code=202)
+async def submit_combined_analysis(req: CombinedAnalysisRequest):
+    return submit_job("combined", jsonable_encoder(req))
+
+
+@app.post("/jobs/qa", status_code=202)
+async def submit_question(req: QuestionRequest):
+    return submit_job("qa", jsonable_encoder(req))
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = get_job(job_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if job["status"] not in FINISHED:
+        return JSONResponse(status_code=202, content=job)
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=job)
+    return job
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job_request(job_id: str):
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if not job["cancel_requested"]:
+        raise HTTPException(status_code=409, detail=job)
+    return job
 
 
 # Mockup server to test the AI/ML backend before integrating it with the main Express BE
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,5 @@
 """Service layer helpers for DocuThinker."""
 
-from .orchestrator import DocumentIntelligenceService, get_document_service
+from .orchestrator import COMBINED_FIELDS, DocumentIntelligenceService, get_document_service
 
-__all__ = ["DocumentIntelligenceService", "get_document_service"]
+__all__ = ["DocumentIntelligenceService", "get_document_service", "COMBINED_FIELDS"]
@@ -0,0 +1,361 @@
+"""Chat sessions with bounded, token-budgeted memory.
+
+``ConversationBufferMemory`` re-sends the whole conversation on every turn, so prompt
+size, latency and cost grow with each message and a long session keeps its full history
+in RAM. :class:`ChatSessionManager` keeps sessions keyed by id and bounds all three:
+
+* each turn sends the system prompt, the running summary (if any) and the most recent
+  turns that fit ``history_tokens``;
+* with ``memory="window"``, older turns are dropped. With ``memory="summary"``, once the
+  stored turns exceed the budget the oldest are folded into the summary by one extra LLM
+  call. Turns are folded down to half the budget, so that call runs every few turns
+  rather than on every turn;
+* sessions idle for longer than ``ttl_seconds`` expire. Once ``max_sessions`` are held,
+  the least recently used session is evicted from memory;
+* with ``persist_dir``, every session is written to a JSON file after each turn. An
+  evicted session (or one from a previous process) is loaded back on its next message.
+  Expired sessions are deleted from disk as well.
+
+One prompt template is shared by every session, and chains are pooled per chat model, so
+a turn only pays for its own LLM call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ai_ml.core.metrics import get_metrics_registry
+from ai_ml.core.prompts import CHAT_SUMMARY_PROMPT, CHAT_SYSTEM_PROMPT
+
+MEMORY_MODES = ("window", "summary")
+
+_SESSIONS = get_metrics_registry().gauge(
+    "docuthinker_chat_sessions",
+    "Chat sessions currently held in memory.",
+)
+_EVICTIONS = get_metrics_registry().counter(
+    "docuthinker_chat_session_evictions_total",
+    "Chat sessions dropped from memory, by reason (lru, ttl).",
+    ("reason",),
+)
+_HISTORY_TOKENS = get_metrics_registry().histogram(
+    "docuthinker_chat_history_tokens",
+    "Approximate tokens of conversation history sent with each chat turn.",
+    buckets=(0, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+_SUMMARIZATIONS = get_metrics_registry().counter(
+    "docuthinker_chat_summarizations_total",
+    "LLM calls that folded old chat turns into a session summary.",
+)
+
+
+def _approx_tokens(text: str) -> int:
+    # Same ~4 characters per token estimate as ai_ml.retrieval.context.approx_tokens.
+    return -(-len(text) // 4) if text else 0
+
+
+@dataclass
+class ChatSession:
+    """Conversation state of one session: recent turns plus a summary of older ones."""
+
+    session_id: str
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    summary: str = ""
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # Session-level state owned by other features (e.g. a bound document).
+    extra: Dict[str, Any] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    last_used: float = field(default=0.0, repr=False, compare=False)
+
+    def history_tokens(self) -> int:
+        return sum(_approx_tokens(turn["content"]) for turn in self.turns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "turns": self.turns,
+            "summary": self.summary,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "extra": self.extra,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ChatSession":
+        return cls(
+            session_id=payload["session_id"],
+            turns=list(payload.get("turns") or []),
+            summary=payload.get("summary") or "",
+            created_at=float(payload.get("created_at") or time.time()),
+            updated_at=float(payload.get("updated_at") or time.time()),
+            extra=dict(payload.get("extra") or {}),
+        )
+
+
+class ChatSessionManager:
+    """Pool of chat sessions with token-budgeted memory, LRU/TTL eviction and optional persistence.
+
+    ``llm_factory`` returns the chat model for a turn; it is called on every turn so
+    registry-level behaviour (routing, circuit breakers) applies.
+    """
+
+    def __init__(
+        self,
+        llm_factory: Callable[[], Any],
+        *,
+        memory: str = "summary",
+        history_tokens: int = 1500,
+        max_sessions: int = 256,
+        ttl_seconds: Optional[float] = 1800.0,
+        persist_dir: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if memory not in MEMORY_MODES:
+            raise ValueError(f"Unsupported chat memory '{memory}'; expected one of {MEMORY_MODES}.")
+        self.llm_factory = llm_factory
+        self.memory = memory
+        self.history_tokens = max(0, history_tokens)
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.persist_dir = Path(persist_dir).expanduser() if persist_dir else None
+        self._clock = clock
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._chains: Dict[int, Any] = {}
+        self._prompt: Any = None
+
+    # ------------------------------------------------------------------
+    # Public API
+
+    def reply(
+        self,
+        session_id: str,
+        message: str,
+        *,
+        system: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Answer ``message`` in ``session_id``, creating the session on first use.
+
+        ``system`` replaces the default system prompt for this turn (e.g. to add document
+        excerpts); it is not stored in the history.
+        """
+
+        session = self.session(session_id)
+        llm = self.llm_factory()
+        with session.lock:
+            response = self._chain(llm).invoke(self._inputs(session, message, system), config=config)
+            response = str(response).strip()
+            self._record(session, message, response, llm)
+        return response
+
+    def stream_reply(
+        self,
+        session_id: str,
+        message: str,
+        *,
+        system: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Like :meth:`reply`, yielding the response text as the model generates it.
+
+        The turn is added to the history once the stream is exhausted.
+        """
+
+        session = self.session(session_id)
+        llm = self.llm_factory()
+        with session.lock:
+            parts: List[str] = []
+            for piece in self._chain(llm).stream(self._inputs(session, message, system), config=config):
+                parts.append(piece)
+                yield piece
+            self._record(session, message, "".join(parts).strip(), llm)
+
+    def session(self, session_id: str) -> ChatSession:
+        """The live session for ``session_id``: cached, loaded from disk, or new."""
+
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._load(session_id) or ChatSession(session_id=session_id)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    # Persisted sessions stay on disk and are reloaded on their next message.
+                    self._sessions.popitem(last=False)
+                    _EVICTIONS.inc(reason="lru")
+                _SESSIONS.set(len(self._sessions))
+            self._sessions.move_to_end(session_id)
+            session.last_used = now
+            return session
+
+    def history(self, session_id: str) -> Dict[str, Any]:
+        session = self.session(session_id)
+        with session.lock:
+            return {"summary": session.summary, "turns": list(session.turns)}
+
+    def save(self, session: ChatSession) -> None:
+        """Persist ``session`` after callers change state outside :meth:`reply` (e.g. ``extra``)."""
+
+        self._save(session)
+
+    def reset(self, session_id: str) -> bool:
+        """Forget ``session_id`` in memory and on disk; returns whether it existed."""
+
+        with self._lock:
+            existed = self._sessions.pop(session_id, None) is not None
+            _SESSIONS.set(len(self._sessions))
+        path = self._path(session_id)
+        if path is not None and path.exists():
+            path.unlink()
+            existed = True
+        return existed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            _SESSIONS.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "memory": self.memory,
+            "history_tokens": self.history_tokens,
+            "largest_history_tokens": max((session.history_tokens() for session in sessions), default=0),
+        }
+
+    # ------------------------------------------------------------------
+    # Memory (callers hold session.lock)
+
+    def _inputs(self, session: ChatSession, message: str, system: Optional[str]) -> Dict[str, Any]:
+        history = self._history_messages(session)
+        _HISTORY_TOKENS.observe(sum(_approx_tokens(str(item.content)) for item in history))
+        return {"system": system or CHAT_SYSTEM_PROMPT, "history": history, "input": message}
+
+    def _record(self, session: ChatSession, message: str, response: str, llm: Any) -> None:
+        session.turns.append({"role": "human", "content": message})
+        session.turns.append({"role": "ai", "content": response})
+        self._compact(session, llm)
+        session.updated_at = time.time()
+        self._save(session)
+
+    def _history_messages(self, session: ChatSession) -> List[Any]:
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+        kept: List[Dict[str, str]] = []
+        budget = self.history_tokens
+        for turn in reversed(session.turns):
+            cost = _approx_tokens(turn["content"])
+            if cost > budget:
+                break
+            kept.append(turn)
+            budget -= cost
+        messages: List[Any] = []
+        if session.summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{session.summary}"))
+        for turn in reversed(kept):
+            messages.append(HumanMessage(content=turn["content"]) if turn["role"] == "human" else AIMessage(content=turn["content"]))
+        return messages
+
+    def _compact(self, session: ChatSession, llm: Any) -> None:
+        """Bound the stored turns: drop (window) or summarize (summary) the oldest beyond the budget."""
+
+        if session.history_tokens() <= self.history_tokens:
+            return
+        # Fold down to half the budget so the next few turns need no compaction.
+        target = self.history_tokens // 2 if self.memory == "summary" else self.history_tokens
+        overflow: List[Dict[str, str]] = []
+        while session.turns and (session.history_tokens() > target or session.turns[0]["role"] != "human"):
+            overflow.append(session.turns.pop(0))
+        if self.memory == "summary" and overflow:
+            session.summary = self._summarize(session.summary, overflow, llm)
+
+    def _summarize(self, summary: str, turns: List[Dict[str, str]], llm: Any) -> str:
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        lines = "\n".join(f"{'User' if turn['role'] == 'human' else 'Assistant'}: {turn['content']}" for turn in turns)
+        words = max(50, self.history_tokens // 4)
+        chain = PromptTemplate.from_template(CHAT_SUMMARY_PROMPT) | llm | StrOutputParser()
+        try:
+            updated = chain.invoke({"summary": summary or "(none)", "lines": lines, "words": words})
+        except Exception:  # pragma: no cover - runtime safety
+            # Keep the old summary rather than fail the turn that was already answered.
+            return summary
+        _SUMMARIZATIONS.inc()
+        # The summary shares the history budget; never let it outgrow half of it.
+        return updated.strip()[: max(1, self.history_tokens // 2) * 4]
+
+    def _chain(self, llm: Any) -> Any:
+        key = id(llm)
+        chain = self._chains.get(key)
+        if chain is None:
+            from langchain_core.output_parsers import StrOutputParser
+            from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+            if self._prompt is None:
+                self._prompt = ChatPromptTemplate.from_messages(
+                    [("system", "{system}"), MessagesPlaceholder("history"), ("human", "{input}")]
+                )
+            chain = self._chains[key] = self._prompt | llm | StrOutputParser()
+        return chain
+
+    # ------------------------------------------------------------------
+    # Eviction and persistence (callers of _expire hold self._lock)
+
+    def _expire(self, now: float) -> None:
+        if self.ttl_seconds is None:
+            return
+        # The OrderedDict is in last-use order, so expired sessions are at the front.
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_used <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            path = self._path(session_id)
+            if path is not None and path.exists():
+                path.unlink()
+            _EVICTIONS.inc(reason="ttl")
+        _SESSIONS.set(len(self._sessions))
+
+    def _path(self, session_id: str) -> Optional[Path]:
+        if self.persist_dir is None:
+            return None
+        return self.persist_dir / f"{hashlib.sha256(session_id.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _load(self, session_id: str) -> Optional[ChatSession]:
+        path = self._path(session_id)
+        if path is None or not path.exists():
+            return None
+        session = ChatSession.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        if self.ttl_seconds is not None and time.time() - session.updated_at > self.ttl_seconds:
+            path.unlink()
+            return None
+        return session
+
+    def _save(self, session: ChatSession) -> None:
+        path = self._path(session.session_id)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a crash never leaves a truncated session file behind.
+        handle, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(session.to_dict(), stream)
+        os.replace(tmp_path, path)
+
+
+__all__ = ["ChatSession", "ChatSessionManager", "MEMORY_MODES"]
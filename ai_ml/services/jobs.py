@@ -0,0 +1,653 @@
+"""Background jobs for long-running analyses.
+
+``POST /analyze`` holds its HTTP connection for the whole agentic run, which often
+outlives proxy timeouts. Jobs decouple the two: a submission is written to a SQLite
+:class:`JobStore` and answered at once with a job id, and a :class:`JobQueue` worker runs it
+and stores the result for retrieval by id.
+
+* each job type has its own worker threads (``concurrency``), so a burst of deep analyses
+  cannot starve quick QA jobs;
+* workers claim jobs from the store with an atomic update, so several processes can share
+  one store. The API server only enqueues (unless ``DOCUTHINKER_JOB_RUN_IN_SERVER`` is
+  set), and ``python -m ai_ml.services.jobs`` runs the workers, sized separately;
+* jobs survive restarts. A running job holds a lease that its worker renews every few
+  seconds. Any worker, on any host, queues a job again once its lease has expired, so the
+  jobs of a crashed or partitioned worker are picked up elsewhere. A job whose lease has
+  expired ``max_attempts`` times fails instead, so a job that kills its worker cannot
+  loop forever;
+* every worker process records a heartbeat in the store. A submission is refused with
+  :class:`NoJobWorkersError` when no worker has sent one within a lease, rather than
+  queued for a worker that does not exist;
+* cancelling a queued job removes it from the queue. A running job cannot be interrupted
+  mid-call, so it is marked and its result is discarded when it finishes;
+* finished jobs are deleted after ``retention_seconds``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from ai_ml.core.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_SUBMITTED = get_metrics_registry().counter(
+    "docuthinker_jobs_submitted_total",
+    "Background jobs submitted, by type.",
+    ("type",),
+)
+_FINISHED = get_metrics_registry().counter(
+    "docuthinker_jobs_finished_total",
+    "Background jobs finished, by type and final status.",
+    ("type", "status"),
+)
+_RUNNING = get_metrics_registry().gauge(
+    "docuthinker_jobs_running",
+    "Background jobs currently running in this process, by type.",
+    ("type",),
+)
+_WAIT_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_job_wait_seconds",
+    "Time background jobs spent queued before a worker picked them up.",
+    ("type",),
+)
+_RUN_SECONDS = get_metrics_registry().histogram(
+    "docuthinker_job_run_seconds",
+    "Time background jobs spent running.",
+    ("type",),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, type, created_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, created on stores that predate them.
+_MIGRATIONS = {"lease_expires_at": "ALTER TABLE jobs ADD COLUMN lease_expires_at REAL"}
+
+
+class NoJobWorkersError(RuntimeError):
+    """Raised instead of queueing a job that no running worker would pick up."""
+
+
+@dataclass
+class Job:
+    """One submitted job as stored in the :class:`JobStore`."""
+
+    id: str
+    type: str
+    status: str
+    params: Dict[str, Any]
+    created_at: float
+    result: Any = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+    worker: Optional[str] = None
+    attempts: int = 0
+    lease_expires_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self, *, include_result: bool = False) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "job_id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "cancel_requested": self.cancel_requested,
+            "attempts": self.attempts,
+        }
+        if self.error:
+            payload["error"] = self.error
+        if include_result:
+            payload["result"] = self.result
+        return payload
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            type=row["type"],
+            status=row["status"],
+            params=json.loads(row["params"]),
+            created_at=row["created_at"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            cancel_requested=bool(row["cancel_requested"]),
+            worker=row["worker"],
+            attempts=row["attempts"],
+            lease_expires_at=row["lease_expires_at"],
+        )
+
+
+class JobStore:
+    """Jobs persisted in a SQLite database; safe to share between threads and processes.
+
+    A claimed job is leased to its worker for ``lease_seconds``; see :meth:`heartbeat`.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path if path == ":memory:" else str(Path(path).expanduser())
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._clock = clock
+        self._local = threading.local()
+        # An in-memory database exists per connection, so it gets a single shared one.
+        self._shared: Optional[sqlite3.Connection] = None
+        self._shared_lock = threading.RLock()
+        with self._connection() as conn:
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, statement in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    def create(self, job_type: str, params: Dict[str, Any]) -> Job:
+        job = Job(id=uuid4().hex, type=job_type, status=QUEUED, params=params, created_at=self._clock())
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, type, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.type, job.status, _dumps(params), job.created_at),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def claim(self, job_type: str, worker: str) -> Optional[Job]:
+        """Mark the oldest queued job of ``job_type`` as running for ``worker`` and return it."""
+
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? AND type = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED, job_type),
+                ).fetchone()
+                if row is not None:
+                    now = self._clock()
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, worker = ?, attempts = attempts + 1, "
+                        "lease_expires_at = ? WHERE id = ?",
+                        (RUNNING, now, worker, now + self.lease_seconds, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        *,
+        worker: Optional[str] = None,
+        result: Any = None,
+        error: Optional[str] = None,
+    ) -> Optional[Job]:
+        """Record the outcome of a running job; a job cancelled meanwhile ends ``cancelled``, without error.
+
+        With ``worker``, the outcome is only recorded if that worker still holds the job, so a
+        worker whose lease expired cannot overwrite the run that replaced it. Returns ``None``
+        when nothing was recorded.
+        """
+
+        query = (
+            "UPDATE jobs SET "
+            "status = CASE WHEN cancel_requested THEN ? ELSE ? END, "
+            "result = CASE WHEN cancel_requested THEN NULL ELSE ? END, "
+            "error = CASE WHEN cancel_requested THEN NULL ELSE ? END, "
+            "finished_at = ?, lease_expires_at = NULL "
+            "WHERE id = ? AND status = ?"
+        )
+        params: List[Any] = [CANCELLED, status, _dumps(result) if result is not None else None, error, self._clock(), job_id, RUNNING]
+        if worker is not None:
+            query += " AND worker = ?"
+            params.append(worker)
+        with self._connection() as conn:
+            updated = conn.execute(query, params).rowcount
+        return self.get(job_id) if updated else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or flag a running one; finished jobs are left as they are."""
+
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, cancel_requested = 1 WHERE id = ? AND status = ?",
+                (CANCELLED, self._clock(), job_id, QUEUED),
+            )
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        return self.get(job_id)
+
+    def heartbeat(self, worker: str) -> int:
+        """Record that ``worker`` is alive and extend the lease of every job it is running.
+
+        Returns how many leases were extended.
+        """
+
+        now = self._clock()
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO workers (id, last_seen) VALUES (?, ?)", (worker, now))
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND worker = ?",
+                (now + self.lease_seconds, RUNNING, worker),
+            )
+        return cursor.rowcount
+
+    def live_workers(self) -> int:
+        """Number of workers that have sent a heartbeat within the last lease."""
+
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS n FROM workers WHERE last_seen >= ?",
+                (self._clock() - self.lease_seconds,),
+            ).fetchone()
+        return row["n"]
+
+    def retire(self, worker: str) -> None:
+        """Forget ``worker``'s heartbeat, e.g. when it shuts down cleanly."""
+
+        with self._connection() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker,))
+
+    def requeue_expired(self) -> Tuple[int, List[Job]]:
+        """Settle running jobs whose lease has expired, whichever worker held them.
+
+        A job with attempts left is queued again; one that has used ``max_attempts`` fails.
+        Returns how many were requeued and the jobs that failed.
+        """
+
+        now = self._clock()
+        # Jobs claimed before leases existed have none; their start time stands in for it.
+        expired = "status = ? AND COALESCE(lease_expires_at, started_at + ?) < ?"
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                exhausted = [
+                    row["id"]
+                    for row in conn.execute(
+                        f"SELECT id FROM jobs WHERE {expired} AND attempts >= ?",
+                        (RUNNING, self.lease_seconds, now, self.max_attempts),
+                    )
+                ]
+                conn.executemany(
+                    "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, "
+                    "error = CASE WHEN cancel_requested THEN NULL ELSE ? END, "
+                    "finished_at = ?, lease_expires_at = NULL WHERE id = ?",
+                    [
+                        (CANCELLED, FAILED, f"Gave up after {self.max_attempts} attempt(s): the worker stopped renewing its lease.", now, job_id)
+                        for job_id in exhausted
+                    ],
+                )
+                requeued = conn.execute(
+                    f"UPDATE jobs SET status = ?, started_at = NULL, worker = NULL, lease_expires_at = NULL WHERE {expired}",
+                    (QUEUED, RUNNING, self.lease_seconds, now),
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        failed = [job for job in (self.get(job_id) for job_id in exhausted) if job is not None]
+        return requeued, failed
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs that finished before ``older_than``; returns how many.
+
+        Workers last seen before ``older_than`` are forgotten as well.
+        """
+
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+                (*FINISHED, older_than),
+            )
+            conn.execute("DELETE FROM workers WHERE last_seen < ?", (older_than,))
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of stored jobs per type and status."""
+
+        with self._connection() as conn:
+            rows = conn.execute("SELECT type, status, COUNT(*) AS n FROM jobs GROUP BY type, status").fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["type"], {})[row["status"]] = row["n"]
+        return counts
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    def _connection(self) -> "_Connection":
+        if self.path == ":memory:":
+            with self._shared_lock:
+                if self._shared is None:
+                    self._shared = self._connect()
+            return _Connection(self._shared, self._shared_lock)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return _Connection(conn, None)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+class _Connection:
+    """Context manager handing out a connection, holding ``lock`` while it is used."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: Optional[threading.RLock]) -> None:
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        if self.lock is not None:
+            self.lock.acquire()
+        return self.conn
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.lock is not None:
+            self.lock.release()
+
+
+class JobQueue:
+    """Runs jobs from a :class:`JobStore` on per-type worker threads.
+
+    ``concurrency`` maps a job type to its number of workers; other registered types get
+    ``default_concurrency``. A type with no workers is only enqueued here and must be run
+    by another process sharing the store.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        *,
+        concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 2,
+        poll_seconds: float = 1.0,
+        retention_seconds: Optional[float] = 7 * 24 * 3600.0,
+    ) -> None:
+        self.store = store
+        self.concurrency = dict(concurrency or {})
+        self.default_concurrency = max(0, default_concurrency)
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._threads: List[threading.Thread] = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._last_purge = 0.0
+
+    @property
+    def job_types(self) -> List[str]:
+        return list(self._handlers)
+
+    def register(self, job_type: str, handler: Callable[..., Any]) -> None:
+        """Run jobs of ``job_type`` as ``handler(**params)``; the result must be JSON-serialisable."""
+
+        self._handlers[job_type] = handler
+
+    def submit(self, job_type: str, params: Dict[str, Any]) -> Job:
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type '{job_type}'; expected one of {self.job_types}.")
+        if not self._threads and not self.store.live_workers():
+            raise NoJobWorkersError(
+                "No job worker has checked in recently; start one with `python -m ai_ml.services.jobs` "
+                "or set DOCUTHINKER_JOB_RUN_IN_SERVER."
+            )
+        self._purge()
+        job = self.store.create(job_type, params)
+        _SUBMITTED.inc(type=job_type)
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.store.cancel(job_id)
+        if job is not None and job.status == CANCELLED and job.started_at is None:
+            _FINISHED.inc(type=job.type, status=CANCELLED)
+        return job
+
+    def start(self) -> int:
+        """Start the worker threads (once); returns how many are running."""
+
+        if self._threads:
+            return len(self._threads)
+        self._requeue_expired()
+        self._stopping.clear()
+        for job_type in self._handlers:
+            for index in range(self.concurrency.get(job_type, self.default_concurrency)):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(job_type,),
+                    name=f"docuthinker-job-{job_type}-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        if self._threads:
+            self.store.heartbeat(self.worker_id)
+            self._heartbeat = threading.Thread(target=self._renew_leases, name="docuthinker-job-heartbeat", daemon=True)
+            self._heartbeat.start()
+        return len(self._threads)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current job; queued jobs stay in the store."""
+
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout)
+            self._heartbeat = None
+            self.store.retire(self.worker_id)
+
+    def stats(self) -> Dict[str, Any]:
+        workers = {job_type: self.concurrency.get(job_type, self.default_concurrency) for job_type in self._handlers}
+        return {
+            "worker_id": self.worker_id,
+            "workers": workers if self._threads else {},
+            "jobs": self.store.counts(),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+
+    def _work(self, job_type: str) -> None:
+        handler = self._handlers[job_type]
+        while not self._stopping.is_set():
+            job = self.store.claim(job_type, self.worker_id)
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_seconds)
+                continue
+            _WAIT_SECONDS.observe(max(0.0, (job.started_at or job.created_at) - job.created_at), type=job_type)
+            _RUNNING.inc(type=job_type)
+            started = time.perf_counter()
+            try:
+                result = handler(**job.params)
+            except Exception as exc:  # recorded on the job; the worker keeps going
+                logger.exception("Job %s (%s) failed", job.id, job_type)
+                finished = self.store.finish(job.id, FAILED, worker=self.worker_id, error=f"{type(exc).__name__}: {exc}")
+            else:
+                finished = self.store.finish(job.id, SUCCEEDED, worker=self.worker_id, result=result)
+            finally:
+                _RUNNING.dec(type=job_type)
+                _RUN_SECONDS.observe(time.perf_counter() - started, type=job_type)
+            if finished is not None:
+                _FINISHED.inc(type=job_type, status=finished.status)
+            else:
+                logger.warning("Job %s (%s) lost its lease before finishing; its outcome was discarded.", job.id, job_type)
+
+    def _renew_leases(self) -> None:
+        # Renew well before expiry, so a slow store write does not cost a lease.
+        interval = max(0.1, self.store.lease_seconds / 3)
+        while not self._stopping.wait(interval):
+            try:
+                self.store.heartbeat(self.worker_id)
+                self._requeue_expired()
+            except sqlite3.Error as exc:  # pragma: no cover - retried on the next beat
+                logger.warning("Job lease heartbeat failed: %s", exc)
+
+    def _requeue_expired(self) -> None:
+        requeued, failed = self.store.requeue_expired()
+        for job in failed:
+            logger.error("Job %s (%s) %s", job.id, job.type, job.error or "was cancelled after losing its lease.")
+            _FINISHED.inc(type=job.type, status=job.status)
+        if requeued:
+            logger.info("Requeued %s job(s) whose worker stopped renewing its lease.", requeued)
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def _purge(self) -> None:
+        if self.retention_seconds is None:
+            return
+        now = time.time()
+        if now - self._last_purge < 600:
+            return
+        self._last_purge = now
+        purged = self.store.purge(now - self.retention_seconds)
+        if purged:
+            logger.debug("Purged %s finished job(s).", purged)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+# ----------------------------------------------------------------------
+# Process-wide queue
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """The process-wide queue, configured from settings with the service's job types.
+
+    Handlers resolve the document service on first use, so building the queue is cheap.
+    """
+
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from ai_ml.core import load_settings
+                from ai_ml.services.orchestrator import get_document_service
+
+                settings = load_settings()
+                queue = JobQueue(
+                    JobStore(settings.job_db, lease_seconds=settings.job_lease_seconds, max_attempts=settings.job_max_attempts),
+                    concurrency=settings.job_concurrency,
+                    default_concurrency=settings.job_workers,
+                    poll_seconds=settings.job_poll_seconds,
+                    retention_seconds=settings.job_retention,
+                )
+                queue.register("analyze", lambda **params: get_document_service().analyze_document(**params))
+                queue.register("combined", lambda **params: get_document_service().combined_analysis(**params))
+                queue.register("qa", lambda **params: get_document_service().ask(**params))
+                _queue = queue
+    return _queue
+
+
+def main() -> int:
+    """Run job workers in the foreground, e.g. on hosts separate from the web tier."""
+
+    logging.basicConfig(level=logging.INFO)
+    queue = get_job_queue()
+    workers = queue.start()
+    if not workers:
+        logger.error("No job workers configured; set DOCUTHINKER_JOB_WORKERS or DOCUTHINKER_JOB_CONCURRENCY.")
+        return 1
+    logger.info("Started %s job worker(s) on %s", workers, queue.store.path)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        queue.stop()
+    return 0
+
+
+__all__ = [
+    "CANCELLED",
+    "FAILED",
+    "FINISHED",
+    "Job",
+    "JobQueue",
+    "JobStore",
+    "NoJobWorkersError",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "get_job_queue",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    raise SystemExit(main())
@@ -2,27 +2,77 @@
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
-from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-
+from ai_ml.cache import ArtifactStore, CacheLookup, SemanticQACache, document_hash
 from ai_ml.core import Settings, load_settings
+from ai_ml.core.singleflight import SingleFlight
+from ai_ml.core.prompts import (
+    BULLET_SUMMARY_PROMPT,
+    CHAT_DOCUMENT_SYSTEM_PROMPT,
+    COMBINED_FIELD_INSTRUCTIONS,
+    COMBINED_PROMPT_FOOTER,
+    COMBINED_PROMPT_HEADER,
+    DISCUSSION_PROMPT,
+    RECOMMENDATIONS_PROMPT,
+    REFINE_SUMMARY_PROMPT,
+    REWRITE_PROMPT,
+    SENTIMENT_PROMPT,
+    SUMMARY_PROMPT,
+    TOPICS_PROMPT,
+    split_document_prefix,
+)
 from ai_ml.core.settings import ProviderSpec
 from ai_ml.graph import Neo4jConfig, Neo4jGraphClient, Neo4jNotConfigured
-from ai_ml.pipelines import AgenticRAGPipeline
-from ai_ml.providers.registry import LLMConfig, LLMProviderRegistry, MissingAPIKeyError, MissingDependencyError
-from ai_ml.tools import ChunkConfig, DocumentSearchTool, InsightsExtractionTool, build_vector_store, chunk_document
+from ai_ml.pipelines import AgenticRAGPipeline, AnalysisPolicy, RetrievalQAPipeline
+from ai_ml.providers.circuit import CircuitBreakerPolicy, CircuitOpenError
+from ai_ml.providers.registry import (
+    LLMConfig,
+    LLMProviderRegistry,
+    MissingAPIKeyError,
+    MissingDependencyError,
+    RoutingPolicy,
+)
+from ai_ml.tools import ChunkConfig, RetrievalConfig, build_vector_store
 from ai_ml.vectorstores import ChromaConfig, ChromaNotConfigured, ChromaVectorClient
-from models.hf_model import load_translation_model
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from langchain.chains import ConversationChain
+
+    from ai_ml.services.chat_sessions import ChatSessionManager
 
 logger = logging.getLogger(__name__)
 
+_WARMUP_TEXT = "DocuThinker warmup. This short passage exercises tokenizers, embeddings and translators."
+
+COMBINED_FIELDS = ("summary", "bullet_summary", "topics", "sentiment", "recommendations")
+
+_DEFAULT_SUMMARY_STYLE = "Provide a balanced overview."
+
+# Per-field JSON schema for :meth:`DocumentIntelligenceService.combined_analysis`.
+_COMBINED_SCHEMA: Dict[str, Dict[str, Any]] = {
+    "summary": {"type": "string"},
+    "bullet_summary": {"type": "array", "items": {"type": "string"}},
+    "topics": {"type": "array", "items": {"type": "string"}},
+    "sentiment": {
+        "type": "object",
+        "properties": {
+            "label": {"type": "string"},
+            "confidence": {"type": "number"},
+            "rationale": {"type": "string"},
+        },
+        "required": ["label", "confidence", "rationale"],
+    },
+    "recommendations": {"type": "array", "items": {"type": "string"}},
+}
+
 
 class DocumentIntelligenceService:
     """Primary façade encapsulating DocuThinker's agentic and utility workflows."""
@@ -33,9 +83,17 @@ class DocumentIntelligenceService:
         settings: Optional[Settings] = None,
         registry: Optional[LLMProviderRegistry] = None,
         pipeline: Optional[AgenticRAGPipeline] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        qa_cache: Optional[SemanticQACache] = None,
     ) -> None:
         self.settings = settings or load_settings()
-        self.registry = registry or LLMProviderRegistry()
+        self.registry = registry or LLMProviderRegistry(
+            replay_mode=self.settings.replay_mode,
+            replay_dir=self.settings.replay_dir,
+            routing=RoutingPolicy.from_settings(self.settings),
+            circuit=CircuitBreakerPolicy.from_settings(self.settings),
+        )
+        self.artifacts = artifacts or ArtifactStore.from_settings(self.settings)
         chunk_cfg = ChunkConfig(chunk_size=self.settings.chunk_size, chunk_overlap=self.settings.chunk_overlap)
         self.pipeline = pipeline or AgenticRAGPipeline(
             registry=self.registry,
@@ -43,11 +101,49 @@ class DocumentIntelligenceService:
             chunk_config=chunk_cfg,
             embedding_provider=self.settings.embedding_provider,
             embedding_model=self.settings.embedding_model,
+            model_pricing=self.settings.model_pricing,
+            agent_models=self.settings.agent_models,
+            crew_process=self.settings.crew_process,
+            crew_max_workers=self.settings.crew_max_workers,
+            analysis_policy=AnalysisPolicy(
+                default_mode=self.settings.analysis_mode,
+                short_document_chars=self.settings.short_document_chars,
+                fast_direct_max_chars=self.settings.fast_direct_max_chars,
+                crew_confidence_threshold=self.settings.crew_confidence_threshold,
+            ),
+            artifact_store=self.artifacts,
+            retrieval_config=RetrievalConfig(
+                mode=self.settings.retrieval_mode,
+                top_k=self.settings.vector_top_k,
+                candidates=self.settings.retrieval_candidates,
+                rrf_k=self.settings.rrf_k,
+                context_tokens=self.settings.context_tokens,
+                mmr_lambda=self.settings.mmr_lambda,
+                similarity_cutoff=self.settings.similarity_cutoff,
+            ),
+            reranker=self._build_reranker(),
         )
+        if self.pipeline.artifact_store is None:
+            self.pipeline.artifact_store = self.artifacts
+        self.qa = RetrievalQAPipeline(
+            self.pipeline,
+            llm_config=LLMConfig.from_spec(self.settings.agent_models["qa"]),
+            model_pricing=self.settings.model_pricing,
+        )
+        self.qa_cache = qa_cache
+        if self.qa_cache is None and self.settings.qa_cache_size > 0:
+            self.qa_cache = SemanticQACache(
+                threshold=self.settings.qa_cache_threshold,
+                ttl_seconds=self.settings.qa_cache_ttl,
+                max_entries=self.settings.qa_cache_size,
+            )
         self._translator_cache: Dict[str, Any] = {}
         self._graph_client: Optional[Neo4jGraphClient] = None
         self._vector_client: Optional[ChromaVectorClient] = None
         self._embedding_model: Any = None
+        self._chat_sessions: Optional[ChatSessionManager] = None
+        self._chat_lock = threading.Lock()
+        self._inflight = SingleFlight() if self.settings.coalesce_requests else None
 
     # ------------------------------------------------------------------
     # Public orchestration APIs
@@ -59,14 +155,39 @@ class DocumentIntelligenceService:
         question: Optional[str] = None,
         translate_lang: Optional[str] = "fr",
         metadata: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Run the full agentic pipeline and enrich with auxiliary signals."""
+        """Run the agentic pipeline and enrich with auxiliary signals.
 
-        logger.info("Running agentic analysis (question=%s, translate_lang=%s)", question, translate_lang)
+        ``mode`` is ``fast``, ``standard`` or ``deep`` (default from settings) and decides
+        whether retrieval and the crew run; the chosen route is reported under ``analysis``.
+        Concurrent calls with the same arguments share one run, including its ``document_id``.
+        """
+
+        mode = self.pipeline.analysis_policy.resolve_mode(mode)
+        return self._coalesce(
+            "analyze",
+            document,
+            {"question": question, "translate_lang": translate_lang, "metadata": metadata, "mode": mode},
+            lambda: self._analyze_document(
+                document, question=question, translate_lang=translate_lang, metadata=metadata, mode=mode
+            ),
+        )
+
+    def _analyze_document(
+        self,
+        document: str,
+        *,
+        question: Optional[str],
+        translate_lang: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        mode: str,
+    ) -> Dict[str, Any]:
+        logger.info("Running agentic analysis (question=%s, translate_lang=%s, mode=%s)", question, translate_lang, mode)
         meta = dict(metadata or {})
         try:
-            agentic_payload = self.pipeline.run(document, question=question, translate_lang=translate_lang)
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+            agentic_payload = self.run_pipeline(document, question=question, translate_lang=translate_lang, mode=mode)
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.error("Pipeline configuration error: %s", exc)
             agentic_payload = {"error": str(exc)}
         except Exception as exc:  # pragma: no cover - runtime safety
@@ -85,6 +206,7 @@ class DocumentIntelligenceService:
             "insights": self._topics_as_bullets(agentic_payload),
             "document_id": document_id,
             "metadata": meta,
+            "analysis": agentic_payload.get("analysis"),
         }
 
         results["sentiment"] = self.sentiment(document)
@@ -112,129 +234,239 @@ class DocumentIntelligenceService:
 
         return results
 
+    def run_pipeline(
+        self,
+        document: str,
+        *,
+        question: Optional[str] = None,
+        translate_lang: Optional[str] = None,
+        mode: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run the agentic pipeline once per (document, question, mode); runs where any stage failed are not cached."""
+
+        mode = self.pipeline.analysis_policy.resolve_mode(mode)
+        cached = self.artifacts.get(document, "analysis", question=question, mode=mode)
+        if cached is not None:
+            return cached
+        payload = self.pipeline.run(document, question=question, translate_lang=translate_lang, mode=mode)
+        failed = _failed_stages(payload)
+        if failed:
+            logger.info("Not caching analysis with failed stages %s", failed)
+            return payload
+        return self.artifacts.put(document, "analysis", payload, question=question, mode=mode)
+
     def summarize(self, document: str, *, style: Optional[str] = None) -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Summarize the document below. {style}\n\n" "Document:\n{document}\n\nSummary:"
-        )
+        style = style or _DEFAULT_SUMMARY_STYLE
+        cached = self.artifacts.get(document, "summary", style=style)
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["analyst"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Summarization fallback triggered: %s", exc)
             return f"Summarization unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"document": document, "style": style or "Provide a balanced overview."}).strip()
+        inputs = {"document": document, "style": style}
+        summary = self._invoke_prompt(SUMMARY_PROMPT, llm, inputs, role="analyst").strip()
+        return self.artifacts.put(document, "summary", summary, style=style)
 
     def bullet_summary(self, document: str) -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Summarize the document into crisp bullet points. {style}\n\n" "Document:\n{document}\n\nBullet Summary:"
-        )
+        cached = self.artifacts.get(document, "bullet_summary")
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["analyst"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Bullet summary fallback triggered: %s", exc)
             return f"Bullet summary unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        output = chain.invoke({"document": document, "style": self.settings.bullet_summary_style}).strip()
-        return output
+        inputs = {"document": document, "style": self.settings.bullet_summary_style}
+        bullets = self._invoke_prompt(BULLET_SUMMARY_PROMPT, llm, inputs, role="analyst").strip()
+        return self.artifacts.put(document, "bullet_summary", bullets)
 
     def extract_topics(self, document: str) -> List[str]:
-        prompt = ChatPromptTemplate.from_template(
-            "List the top research-backed themes covered in the text as short phrases.\n\n"
-            "Document:\n{document}\n\nThemes:"
-        )
+        cached = self.artifacts.get(document, "topics")
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["researcher"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Topic extraction fallback triggered: %s", exc)
             return [f"Topic extraction unavailable: {exc}"]
-        chain = prompt | llm | StrOutputParser()
-        response = chain.invoke({"document": document})
-        return _split_lines(response)
+        response = self._invoke_prompt(TOPICS_PROMPT, llm, {"document": document}, role="researcher")
+        return self.artifacts.put(document, "topics", _split_lines(response))
+
+    def combined_analysis(self, document: str, *, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Produce several document artifacts from one structured LLM call.
+
+        ``fields`` is any subset of :data:`COMBINED_FIELDS` (all by default). Each value is
+        validated and normalised to the type the matching single-purpose method returns;
+        fields that are missing or malformed fall back to that method, and are listed
+        under ``combined.fallbacks``.
+        """
+
+        requested = list(dict.fromkeys(fields or COMBINED_FIELDS))
+        unknown = [name for name in requested if name not in COMBINED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unsupported combined analysis fields {unknown}; expected a subset of {COMBINED_FIELDS}.")
+        return self._coalesce(
+            "combined", document, {"fields": requested}, lambda: self._combined_analysis(document, requested)
+        )
 
-    def discussion_points(self, document: str) -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Draft discussion prompts stimulating debate about the document. \n"
-            "Return numbered items.\n\nDocument:\n{document}\n\nDiscussion Prompts:"
+    def _combined_analysis(self, document: str, requested: List[str]) -> Dict[str, Any]:
+        cached = self.artifacts.get(document, "combined", fields=requested)
+        if cached is not None:
+            return cached
+
+        template = (
+            COMBINED_PROMPT_HEADER
+            + "\n".join(COMBINED_FIELD_INSTRUCTIONS[name] for name in requested)
+            + COMBINED_PROMPT_FOOTER
         )
+        schema = {
+            "title": "combined_analysis",
+            "description": "Document analysis artifacts.",
+            "type": "object",
+            "properties": {name: _COMBINED_SCHEMA[name] for name in requested},
+            "required": requested,
+        }
+        payload: Dict[str, Any] = {}
+        try:
+            llm = self._resolve_llm(self.settings.agent_models["analyst"])
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
+            logger.warning("Combined analysis fallback triggered: %s", exc)
+        else:
+            inputs = {"document": document, "style": self.settings.bullet_summary_style}
+            payload = self._invoke_structured(template, llm, inputs, schema, role="analyst")
+
+        fallbacks = {
+            "summary": self.summarize,
+            "bullet_summary": self.bullet_summary,
+            "topics": self.extract_topics,
+            "sentiment": self.sentiment,
+            "recommendations": self.recommendations,
+        }
+        results: Dict[str, Any] = {}
+        failed: List[str] = []
+        for name in requested:
+            value = _COMBINED_VALIDATORS[name](payload.get(name))
+            if value is None:
+                failed.append(name)
+                value = fallbacks[name](document)
+            results[name] = value
+        results["combined"] = {"fields": requested, "fallbacks": failed}
+        if failed:
+            # Fallback values are cached by their own methods; only cache clean one-call results here.
+            logger.info("Combined analysis fell back to individual calls for %s", failed)
+            return results
+        return self.artifacts.put(document, "combined", results, fields=requested)
+
+    def discussion_points(self, document: str) -> str:
+        cached = self.artifacts.get(document, "discussion")
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["reviewer"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Discussion fallback triggered: %s", exc)
             return f"Discussion unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"document": document}).strip()
+        discussion = self._invoke_prompt(DISCUSSION_PROMPT, llm, {"document": document}, role="reviewer").strip()
+        return self.artifacts.put(document, "discussion", discussion)
 
     def recommendations(self, document: str) -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Provide actionable recommendations or next steps based on the document."
-            "\n\nDocument:\n{document}\n\nRecommendations:"
-        )
+        cached = self.artifacts.get(document, "recommendations")
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["reviewer"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Recommendations fallback triggered: %s", exc)
             return f"Recommendations unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"document": document}).strip()
+        recommendations = self._invoke_prompt(RECOMMENDATIONS_PROMPT, llm, {"document": document}, role="reviewer").strip()
+        return self.artifacts.put(document, "recommendations", recommendations)
 
     def refine_summary(self, draft_summary: str, document: str) -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Refine the draft summary to ensure fidelity with the source material,"
-            " keeping the tone professional.\n\n"
-            "Document:\n{document}\n\nDraft Summary:\n{summary}\n\nRefined Summary:"
-        )
+        cached = self.artifacts.get(document, "refined_summary", summary=draft_summary)
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["reviewer"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Summary refinement fallback triggered: %s", exc)
             return f"Summary refinement unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"document": document, "summary": draft_summary}).strip()
+        inputs = {"document": document, "summary": draft_summary}
+        refined = self._invoke_prompt(REFINE_SUMMARY_PROMPT, llm, inputs, role="reviewer").strip()
+        return self.artifacts.put(document, "refined_summary", refined, summary=draft_summary)
 
     def rewrite(self, document: str, *, tone: str = "professional") -> str:
-        prompt = ChatPromptTemplate.from_template(
-            "Rewrite the document in the requested tone without losing critical details."
-            "\n\nTone: {tone}\nDocument:\n{document}\n\nRewritten Text:"
-        )
+        cached = self.artifacts.get(document, "rewrite", tone=tone)
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["analyst"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Rewrite fallback triggered: %s", exc)
             return f"Rewrite unavailable: {exc}"
-        chain = prompt | llm | StrOutputParser()
-        return chain.invoke({"document": document, "tone": tone}).strip()
+        rewritten = self._invoke_prompt(REWRITE_PROMPT, llm, {"document": document, "tone": tone}, role="analyst").strip()
+        return self.artifacts.put(document, "rewrite", rewritten, tone=tone)
 
     def answer_question(self, document: str, question: str) -> str:
-        payload = self.pipeline.run(document, question=question)
-        return payload.get("qa_answer", "") or ""
+        return self.ask(document, question)["answer"]
+
+    def ask(self, document: str, question: str) -> Dict[str, Any]:
+        """Answer ``question`` from the top-k excerpts with one ``qa`` model call, with citations.
+
+        Skips planning and the crew entirely; use :meth:`analyze_document` for a full brief.
+        A rephrasing of a question already answered for the same document is served from
+        the semantic QA cache, with a ``cache`` entry naming the matched question.
+        """
+
+        return self._coalesce("qa", document, {"question": question}, lambda: self._ask(document, question))
+
+    def _ask(self, document: str, question: str) -> Dict[str, Any]:
+        cached = self.artifacts.get(document, "qa", question=question)
+        if cached is not None:
+            return cached
+        lookup = self._qa_cache_lookup(document, question)
+        if lookup is not None and lookup.hit:
+            return {
+                **copy.deepcopy(lookup.value),
+                "cache": {"question": lookup.question, "similarity": lookup.similarity},
+            }
+        query_vector = lookup.vector if lookup is not None else None
+        try:
+            result = self.qa.answer(document, question, query_vector=query_vector)
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
+            logger.warning("Question answering fallback triggered: %s", exc)
+            return {"answer": f"Question answering unavailable: {exc}", "citations": []}
+        if self.qa_cache is not None and query_vector is not None:
+            self.qa_cache.store(document, question, copy.deepcopy(result), vector=query_vector)
+        return self.artifacts.put(document, "qa", result, question=question)
 
     def sentiment(self, document: str) -> Dict[str, Any]:
-        prompt = ChatPromptTemplate.from_template(
-            "You are a sentiment analyst. Respond with compact JSON keys label, confidence, rationale.\n\n"
-            "Document:\n{document}\n"
-        )
+        cached = self.artifacts.get(document, "sentiment")
+        if cached is not None:
+            return cached
         try:
             llm = self._resolve_llm(self.settings.agent_models["sentiment"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             logger.warning("Sentiment fallback triggered: %s", exc)
             return {"label": "Unknown", "confidence": 0.0, "rationale": str(exc)}
-        chain = prompt | llm | StrOutputParser()
-        response = chain.invoke({"document": document})
+        response = self._invoke_prompt(SENTIMENT_PROMPT, llm, {"document": document}, role="sentiment")
         try:
-            return json.loads(response)
+            result = json.loads(response)
         except json.JSONDecodeError:
             return {"label": "Unknown", "confidence": 0.0, "rationale": response}
+        return self.artifacts.put(document, "sentiment", result)
 
     def translate(self, document: str, target_lang: str) -> Optional[str]:
+        cached = self.artifacts.get(document, "translation", lang=target_lang)
+        if cached is not None:
+            return cached
         try:
-            translator = self._translator_cache.get(target_lang)
-            if translator is None:
-                translator = load_translation_model(target_lang)
-                self._translator_cache[target_lang] = translator
+            translator = self._get_translator(target_lang)
             output = translator(document)
             if isinstance(output, list):
-                return " ".join(item.get("translation_text", "") for item in output)
-            return output
+                output = " ".join(item.get("translation_text", "") for item in output)
+            return self.artifacts.put(document, "translation", output, lang=target_lang)
         except Exception as exc:  # pragma: no cover - runtime safety
             logger.exception("Translation failed: %s", exc)
             return None
@@ -258,22 +490,183 @@ class DocumentIntelligenceService:
             except Exception as exc:  # pragma: no cover - runtime safety
                 logger.exception("Vector store semantic search failed: %s", exc)
 
-        retriever = build_vector_store(
+        tool = self.pipeline.search_tool(self.pipeline.index_document(document))
+        return json.loads(tool(query))
+
+    @property
+    def chat_sessions(self) -> ChatSessionManager:
+        """Chat sessions with token-budgeted memory, created on first use."""
+
+        if self._chat_sessions is None:
+            with self._chat_lock:
+                if self._chat_sessions is None:
+                    from ai_ml.services.chat_sessions import ChatSessionManager
+
+                    self._chat_sessions = ChatSessionManager(
+                        partial(self._resolve_llm, self.settings.agent_models["analyst"]),
+                        memory=self.settings.chat_memory,
+                        history_tokens=self.settings.chat_history_tokens,
+                        max_sessions=self.settings.chat_max_sessions,
+                        ttl_seconds=self.settings.chat_session_ttl,
+                        persist_dir=self.settings.chat_session_dir,
+                    )
+        return self._chat_sessions
+
+    def chat(self, message: str, *, session_id: Optional[str] = None, document: Optional[str] = None) -> Dict[str, Any]:
+        """Answer ``message`` in a chat session; omit ``session_id`` to start a new one.
+
+        Each turn sends only the session summary and the recent turns that fit
+        ``chat_history_tokens``, so prompt size stays flat as the conversation grows.
+        Passing ``document`` binds the session to it (once is enough). Every later turn then
+        carries only the excerpts most relevant to the message, packed into
+        ``chat_context_tokens`` from the document's cached retriever, and the response
+        lists them as ``citations``.
+        """
+
+        session_id = session_id or str(uuid4())
+        bound = self._bind_chat_document(session_id, document)
+        citations: List[Dict[str, Any]] = []
+        try:
+            system, citations = self._chat_grounding(session_id, message, bound)
+            response = self.chat_sessions.reply(session_id, message, system=system, config=self._usage_config())
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
+            logger.warning("Chat fallback triggered: %s", exc)
+            response = f"Chat unavailable: {exc}"
+            citations = []
+        result: Dict[str, Any] = {"session_id": session_id, "response": response}
+        if bound:
+            result["citations"] = citations
+        return result
+
+    def stream_chat(
+        self,
+        message: str,
+        *,
+        session_id: str,
+        document: Optional[str] = None,
+    ) -> Iterator[str]:
+        """:meth:`chat` for one turn of ``session_id``, yielding the response as it is generated."""
+
+        bound = self._bind_chat_document(session_id, document)
+        try:
+            system, _ = self._chat_grounding(session_id, message, bound)
+            yield from self.chat_sessions.stream_reply(session_id, message, system=system, config=self._usage_config())
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
+            logger.warning("Chat fallback triggered: %s", exc)
+            yield f"Chat unavailable: {exc}"
+
+    def _bind_chat_document(self, session_id: str, document: Optional[str]) -> Optional[str]:
+        """Bind ``document`` to the session when given; returns the session's bound document."""
+
+        sessions = self.chat_sessions
+        session = sessions.session(session_id)
+        if document is not None and session.extra.get("document") != document:
+            session.extra["document"] = document
+            sessions.save(session)
+        return session.extra.get("document")
+
+    def _chat_grounding(self, session_id: str, message: str, document: Optional[str]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """System prompt carrying the excerpts relevant to ``message``, and their citations."""
+
+        if not document:
+            return None, []
+        excerpts = self.qa.retrieve(
             document,
-            embedding_provider=self.settings.embedding_provider,
-            embedding_model=self.settings.embedding_model,
+            self._chat_query(self.chat_sessions.session(session_id), message),
+            token_budget=self.settings.chat_context_tokens,
+            stage="chat",
         )
-        tool = DocumentSearchTool(retriever)
-        return json.loads(tool(query))
+        return CHAT_DOCUMENT_SYSTEM_PROMPT.format(context=excerpts["context"]), excerpts["citations"]
+
+    @staticmethod
+    def _chat_query(session: Any, message: str) -> str:
+        # Follow-ups ("and the second one?") retrieve poorly alone; lead with the previous question.
+        previous = next((turn["content"] for turn in reversed(session.turns) if turn["role"] == "human"), "")
+        return f"{previous}\n{message}" if previous else message
 
     def create_conversation_chain(self) -> ConversationChain:
+        """A standalone LangChain conversation; prefer :meth:`chat`, which pools sessions."""
+
+        from langchain.chains import ConversationChain
+        from langchain.memory import ConversationBufferWindowMemory
+
         try:
             llm = self._resolve_llm(self.settings.agent_models["analyst"])
-        except (MissingDependencyError, MissingAPIKeyError) as exc:
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
             raise RuntimeError("Conversation chain requires an analyst provider") from exc
-        memory = ConversationBufferMemory(memory_key="history", return_messages=True)
+        # Keep only the recent exchanges that fit the chat history budget (~250 tokens each).
+        memory = ConversationBufferWindowMemory(
+            memory_key="history", return_messages=True, k=max(1, self.settings.chat_history_tokens // 250)
+        )
         return ConversationChain(llm=llm, memory=memory, verbose=False)
 
+    # ------------------------------------------------------------------
+    # Lifecycle helpers
+
+    def warmup(self, *, languages: Optional[Iterable[str]] = None, ping_llms: Optional[bool] = None) -> Dict[str, Any]:
+        """Load every model and client listed in settings and run one dummy input through each.
+
+        Returns a per-step report of ``{"status", "seconds"[, "error"]}`` so callers can decide
+        whether a partially warmed worker is acceptable.
+        """
+
+        langs = list(languages if languages is not None else (self.settings.warmup_languages or self.settings.translation_models))
+        ping = self.settings.warmup_ping_llms if ping_llms is None else ping_llms
+        report: Dict[str, Any] = {}
+
+        def _step(name: str, func: Callable[[], Any]) -> None:
+            started = time.perf_counter()
+            try:
+                func()
+                report[name] = {"status": "ok", "seconds": round(time.perf_counter() - started, 3)}
+            except Exception as exc:  # pragma: no cover - runtime safety
+                logger.warning("Warmup step %s failed: %s", name, exc)
+                report[name] = {"status": "error", "seconds": round(time.perf_counter() - started, 3), "error": str(exc)}
+
+        _step("pipeline_graph", lambda: self.pipeline.graph)
+        _step("embeddings", lambda: self._resolve_embedding_model().embed_query(_WARMUP_TEXT))
+        _step(
+            "vector_store",
+            lambda: build_vector_store(_WARMUP_TEXT, embeddings=self._resolve_embedding_model()),
+        )
+        if self.pipeline.reranker is not None:
+            _step("reranker", lambda: self.pipeline.reranker.score(_WARMUP_TEXT, [_WARMUP_TEXT]))
+        for role, spec in self.settings.agent_models.items():
+            _step(f"llm:{role}", partial(self._warm_llm, spec, ping))
+        for lang in langs:
+            _step(f"translator:{lang}", partial(self._warm_translator, lang))
+        return report
+
+    def _build_reranker(self) -> Any:
+        if not self.settings.reranker_model:
+            return None
+        from ai_ml.retrieval.reranker import CrossEncoderReranker
+
+        return CrossEncoderReranker(
+            self.settings.reranker_model,
+            backend=self.settings.reranker_backend,
+            batch_size=self.settings.reranker_batch_size,
+            cache_size=self.settings.reranker_cache_size,
+        )
+
+    def _qa_cache_lookup(self, document: str, question: str) -> Optional[CacheLookup]:
+        if self.qa_cache is None:
+            return None
+        try:
+            embeddings = self._resolve_embedding_model()
+        except (MissingDependencyError, MissingAPIKeyError, CircuitOpenError) as exc:
+            logger.debug("Semantic QA cache skipped: %s", exc)
+            return None
+        return self.qa_cache.lookup(document, question, embed_query=embeddings.embed_query)
+
+    def _warm_llm(self, spec: ProviderSpec, ping: bool) -> None:
+        llm = self._resolve_llm(spec)
+        if ping:
+            llm.invoke("Reply with OK.")
+
+    def _warm_translator(self, target_lang: str) -> None:
+        self._get_translator(target_lang)(_WARMUP_TEXT)
+
     # ------------------------------------------------------------------
     # Knowledge graph helpers
 
@@ -368,15 +761,85 @@ class DocumentIntelligenceService:
     # ------------------------------------------------------------------
     # Internal helpers
 
+    def _invoke_prompt(self, template: str, llm: Any, inputs: Dict[str, Any], *, role: str) -> str:
+        from langchain_core.output_parsers import StrOutputParser
+
+        chain = self._chat_prompt(template, role) | llm | StrOutputParser()
+        return chain.invoke(inputs, config=self._usage_config())
+
+    def _invoke_structured(
+        self,
+        template: str,
+        llm: Any,
+        inputs: Dict[str, Any],
+        schema: Dict[str, Any],
+        *,
+        role: str,
+    ) -> Dict[str, Any]:
+        """Invoke ``template`` expecting a JSON object; use the provider's structured output when it has one."""
+
+        try:
+            structured = llm.with_structured_output(schema)
+        except (NotImplementedError, ValueError):
+            structured = None
+        try:
+            if structured is not None:
+                result = (self._chat_prompt(template, role) | structured).invoke(inputs, config=self._usage_config())
+            else:
+                result = _parse_json_object(self._invoke_prompt(template, llm, inputs, role=role))
+        except Exception as exc:  # pragma: no cover - runtime safety
+            logger.warning("Structured call failed, falling back per field: %s", exc)
+            return {}
+        return result if isinstance(result, dict) else {}
+
+    def _coalesce(self, operation: str, document: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Share one in-flight ``compute`` among concurrent calls with the same document and params."""
+
+        if self._inflight is None:
+            return compute()
+        key = (document_hash(document), json.dumps(params, sort_keys=True, default=str))
+        return self._inflight.do(operation, key, compute)
+
+    def _usage_config(self) -> Dict[str, Any]:
+        """Callbacks feeding token, prompt-cache and cost metrics for a one-off service call."""
+
+        from ai_ml.pipelines.instrumentation import UsageTracker
+
+        return {"callbacks": [UsageTracker(pricing=self.settings.model_pricing)]}
+
+    def _chat_prompt(self, template: str, role: str) -> Any:
+        """A one-message prompt whose document prefix and task instructions are separate content blocks.
+
+        The document block comes first and is identical across every task on the same
+        document, so provider prompt caches can reuse it. When the role's config enables
+        ``prompt_cache``, it also carries the provider's ``cache_control`` marker.
+        """
+
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prefix, instructions = split_document_prefix(template)
+        if not prefix:
+            return ChatPromptTemplate.from_template(template)
+        document_block: Dict[str, Any] = {"type": "text", "text": prefix}
+        cache_control = self.registry.prompt_cache_control(LLMConfig.from_spec(self.settings.agent_models[role]))
+        if cache_control:
+            document_block["cache_control"] = cache_control
+        return ChatPromptTemplate.from_messages([("human", [document_block, {"type": "text", "text": instructions}])])
+
     def _resolve_llm(self, spec: ProviderSpec):
-        cfg = LLMConfig(
-            provider=spec.provider,
-            model=spec.model,
-            temperature=spec.temperature,
-            max_tokens=spec.max_tokens,
-            extra=spec.extra,
-        )
-        return self.registry.chat(cfg)
+        config = LLMConfig.from_spec(spec)
+        # Fail fast into the caller's fallback while every candidate's circuit is open.
+        self.registry.ensure_available(config)
+        return self.registry.chat(config)
+
+    def _get_translator(self, target_lang: str) -> Any:
+        translator = self._translator_cache.get(target_lang)
+        if translator is None:
+            from ai_ml.models.hf_model import load_translation_model
+
+            translator = load_translation_model(target_lang)
+            self._translator_cache[target_lang] = translator
+        return translator
 
     def _resolve_embedding_model(self):
         if self._embedding_model is None:
@@ -426,8 +889,16 @@ class DocumentIntelligenceService:
                 return json.dumps(crew_payload, ensure_ascii=True, indent=2)
             except TypeError:
                 return str(crew_payload)
+        route = (payload.get("analysis") or {}).get("route")
+        if route is not None and "crew" not in route:
+            # The mode skipped the crew to save calls; spending one on discussion would undo that.
+            return self._supporting_context_as_bullets(payload)
         return self.discussion_points(document)
 
+    def _supporting_context_as_bullets(self, payload: Dict[str, Any]) -> str:
+        quotes = payload.get("supporting_context") or []
+        return "\n".join(f"• {quote}" for quote in quotes)
+
     def _topics_as_bullets(self, payload: Dict[str, Any]) -> str:
         topics = payload.get("key_topics") or []
         if not topics:
@@ -436,17 +907,88 @@ class DocumentIntelligenceService:
 
 
 _service_instance: DocumentIntelligenceService | None = None
+_service_lock = threading.Lock()
 
 
 def get_document_service() -> DocumentIntelligenceService:
-    """Return a singleton service instance."""
+    """Return a singleton service instance, constructing it on first use."""
 
     global _service_instance
     if _service_instance is None:
-        _service_instance = DocumentIntelligenceService()
+        with _service_lock:
+            if _service_instance is None:
+                _service_instance = DocumentIntelligenceService()
     return _service_instance
 
 
+def _parse_json_object(payload: str) -> Dict[str, Any]:
+    text = payload.strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        parsed = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _clean_strings(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        value = _split_lines(value)
+    if not isinstance(value, list):
+        return None
+    items = [item.strip().lstrip("-•*").strip() for item in value if isinstance(item, str) and item.strip()]
+    return items or None
+
+
+def _valid_summary(value: Any) -> Optional[str]:
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _valid_bullets(value: Any) -> Optional[str]:
+    items = _clean_strings(value)
+    return "\n".join(f"- {item}" for item in items) if items else None
+
+
+def _valid_recommendations(value: Any) -> Optional[str]:
+    items = _clean_strings(value)
+    return "\n".join(f"{index}. {item}" for index, item in enumerate(items, start=1)) if items else None
+
+
+def _valid_sentiment(value: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(value, dict) or not isinstance(value.get("label"), str) or not value["label"].strip():
+        return None
+    try:
+        confidence = float(value.get("confidence"))
+    except (TypeError, ValueError):
+        return None
+    if not 0.0 <= confidence <= 1.0:
+        return None
+    return {"label": value["label"].strip(), "confidence": confidence, "rationale": str(value.get("rationale") or "")}
+
+
+_COMBINED_VALIDATORS: Dict[str, Callable[[Any], Any]] = {
+    "summary": _valid_summary,
+    "bullet_summary": _valid_bullets,
+    "topics": _clean_strings,
+    "sentiment": _valid_sentiment,
+    "recommendations": _valid_recommendations,
+}
+
+
 def _split_lines(payload: str) -> List[str]:
     lines = [line.strip("- •\t") for line in payload.splitlines() if line.strip()]
     return [line for line in lines if line]
+
+
+def _failed_stages(payload: Dict[str, Any]) -> List[str]:
+    """Pipeline stages that reported an error or fell back in ``payload`` (an analysis report)."""
+
+    failed = list(payload.get("degraded") or [])
+    if payload.get("error") and "rag" not in failed:
+        failed.append("rag")
+    crew = payload.get("crew_analysis")
+    if isinstance(crew, dict) and (crew.get("error") or crew.get("degraded")) and "crew" not in failed:
+        failed.append("crew")
+    return failed
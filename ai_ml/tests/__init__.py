@@ -0,0 +1 @@
+"""Unit tests for the ai_ml package; run with ``pytest`` from ``ai_ml/``."""
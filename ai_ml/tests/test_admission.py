@@ -0,0 +1,133 @@
+"""Admission lanes: bounded slots and queues, and the 429 + Retry-After they produce."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ai_ml.admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected, Lane, LanePolicy
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario() -> None:
+        lane = Lane(INTERACTIVE, LanePolicy(max_concurrency=1, max_queue=1, queue_timeout=5.0))
+        await lane.acquire()
+        queued = asyncio.ensure_future(lane.acquire())
+        await asyncio.sleep(0)
+        assert (lane.active, lane.queued) == (1, 1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await lane.acquire()
+        assert rejected.value.lane == INTERACTIVE
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after >= 1.0
+
+        lane.release()  # hands the slot straight to the queued request
+        await queued
+        assert (lane.active, lane.queued) == (1, 0)
+
+    run(scenario())
+
+
+def test_queued_request_times_out():
+    async def scenario() -> None:
+        lane = Lane(BATCH, LanePolicy(max_concurrency=1, max_queue=4, queue_timeout=0.01))
+        await lane.acquire()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await lane.acquire()
+        assert rejected.value.reason == "timeout"
+        assert lane.queued == 0 and lane.active == 1
+
+    run(scenario())
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    async def scenario() -> list:
+        lane = Lane(INTERACTIVE, LanePolicy(max_concurrency=1, max_queue=4, queue_timeout=5.0))
+        order = []
+
+        async def request(name: str) -> None:
+            async with lane.slot():
+                order.append(name)
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(request(name) for name in "abc"))
+        assert lane.active == 0
+        return order
+
+    assert run(scenario()) == ["a", "b", "c"]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario() -> None:
+        lane = Lane(INTERACTIVE, LanePolicy(max_concurrency=1, max_queue=1, queue_timeout=5.0))
+        await lane.acquire()
+        waiter = asyncio.ensure_future(lane.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        lane.release()
+        assert (lane.active, lane.queued) == (0, 0)
+
+    run(scenario())
+
+
+def test_lanes_are_independent_and_disabled_controller_admits_all():
+    async def scenario() -> None:
+        controller = AdmissionController(
+            {
+                INTERACTIVE: LanePolicy(max_concurrency=1, max_queue=0, queue_timeout=1.0),
+                BATCH: LanePolicy(max_concurrency=1, max_queue=0, queue_timeout=1.0),
+            }
+        )
+        async with controller.slot(BATCH):
+            with pytest.raises(AdmissionRejected):
+                async with controller.slot(BATCH):
+                    pass
+            async with controller.slot(INTERACTIVE):
+                pass
+
+        async with AdmissionController().slot(BATCH):
+            pass
+
+    run(scenario())
+
+
+@pytest.fixture
+def saturated_server(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import ai_ml.server as server
+
+    # No slots and no queue: every request is turned away before reaching the service.
+    closed = LanePolicy(max_concurrency=0, max_queue=0, queue_timeout=1.0)
+    monkeypatch.setattr(server, "admission", AdmissionController({INTERACTIVE: closed, BATCH: closed}))
+    return TestClient(server.app)
+
+
+def test_server_answers_429_with_retry_after(saturated_server):
+    response = saturated_server.post("/qa", json={"document": "d", "question": "q?"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    body = response.json()
+    assert (body["lane"], body["reason"]) == (INTERACTIVE, "queue_full")
+    assert "hint" not in body
+
+
+def test_batch_rejection_points_at_jobs(saturated_server):
+    response = saturated_server.post("/analyze", json={"document": "d"})
+
+    assert response.status_code == 429
+    assert response.json()["lane"] == BATCH
+    assert "/jobs" in response.json()["hint"]
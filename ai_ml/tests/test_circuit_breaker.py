@@ -0,0 +1,142 @@
+"""Circuit breaker transitions, probe accounting and cancellation."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from ai_ml.providers.circuit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerPolicy,
+    CircuitOpenError,
+)
+
+POLICY = CircuitBreakerPolicy(failure_rate=0.5, window=4, min_calls=4, open_seconds=30.0, probes=1)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ClientError(Exception):
+    status_code = 400
+
+
+def make_breaker(policy: CircuitBreakerPolicy = POLICY):
+    clock = Clock()
+    return CircuitBreaker("fake", "model", policy, clock=clock), clock
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.policy.min_calls):
+        breaker.record_failure(RuntimeError("boom"), breaker.acquire())
+
+
+def test_opens_once_failure_rate_is_reached_over_min_calls():
+    breaker, _ = make_breaker()
+    for _ in range(2):
+        breaker.record_success(breaker.acquire())
+    breaker.record_failure(RuntimeError("boom"), breaker.acquire())
+    assert breaker.state == CLOSED  # 1 failure in 3 calls, below min_calls
+
+    breaker.record_failure(RuntimeError("boom"), breaker.acquire())
+    assert breaker.state == OPEN  # 2 failures in 4 calls
+
+
+def test_client_errors_do_not_count_as_failures():
+    breaker, _ = make_breaker()
+    for _ in range(8):
+        breaker.record_failure(ClientError("bad request"), breaker.acquire())
+
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_rejects_until_open_seconds_elapse():
+    breaker, clock = make_breaker()
+    trip(breaker)
+
+    clock.now = 10.0
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.acquire()
+    assert rejected.value.retry_after == pytest.approx(20.0)
+    assert breaker.retry_after() == pytest.approx(20.0)
+
+    clock.now = 30.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_admits_one_probe_and_closes_on_success():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now = 30.0
+
+    probe = breaker.acquire()
+    assert probe is True
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()  # the only probe slot is taken
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.acquire() is False
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now = 30.0
+
+    breaker.record_failure(RuntimeError("still down"), breaker.acquire())
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == pytest.approx(30.0)
+
+
+def test_release_frees_the_probe_slot_without_closing():
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now = 30.0
+
+    breaker.release(breaker.acquire())
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.acquire() is True  # the slot is free for the next probe
+
+
+def test_release_of_a_closed_call_records_nothing():
+    breaker, _ = make_breaker()
+    breaker.release(breaker.acquire())
+
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_cancelled_call_through_the_chat_model_releases_its_probe():
+    pytest.importorskip("langchain_core")
+    from ai_ml.providers.fake import FakeChatModel
+    from ai_ml.providers.routing import CircuitBreakerChatModel
+
+    breaker, clock = make_breaker()
+    trip(breaker)
+    clock.now = 30.0
+    model = CircuitBreakerChatModel(inner=FakeChatModel(model="slow", latency=5000.0), breaker=breaker)
+
+    async def cancel_midway() -> None:
+        task = asyncio.ensure_future(model.ainvoke("hello"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+
+    # Neither closed by a phantom success nor stuck with the probe slot held.
+    assert breaker.state == HALF_OPEN
+    assert breaker.acquire() is True
@@ -0,0 +1,104 @@
+"""ContextBuilder token budget, MMR selection and overlap trimming."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from ai_ml.retrieval import ContextBuilder, approx_tokens  # noqa: E402
+
+
+@dataclass
+class Chunk:
+    page_content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def chunks(*texts: str):
+    return [Chunk(text, {"chunk": index}) for index, text in enumerate(texts)]
+
+
+def test_budget_stops_adding_chunks():
+    docs = chunks("a" * 40, "b" * 40, "c" * 40)  # 10 tokens each
+
+    packed = ContextBuilder(token_budget=25).build(docs)
+
+    assert packed.texts == ["a" * 40, "b" * 40]
+    assert packed.tokens == 20
+    assert packed.dropped == {"duplicate": 0, "cutoff": 0, "budget": 1}
+    assert packed.stats()["selected"] == 2
+
+
+def test_oversized_first_chunk_is_cut_to_the_budget():
+    packed = ContextBuilder(token_budget=5).build(chunks("x" * 100))
+
+    assert packed.texts == ["x" * 20]
+    assert packed.tokens == approx_tokens("x" * 20) == 5
+
+
+def test_max_chunks_and_duplicates():
+    docs = chunks("first chunk", "first chunk", "second chunk", "third chunk")
+
+    packed = ContextBuilder(max_chunks=2).build(docs)
+
+    assert packed.texts == ["first chunk", "second chunk"]
+    assert packed.dropped["duplicate"] == 1
+    assert packed.candidates == 4
+
+
+def _mmr_docs():
+    docs = chunks("Revenue grew in the north.", "Revenue rose in the north region.", "Costs fell in the south.")
+    query = [1.0, 0.0]
+    # The second chunk nearly duplicates the first; the third is less relevant but new.
+    vectors = [[1.0, 0.0], [0.99, 0.1], [0.7, 0.7]]
+    return docs, query, vectors
+
+
+def test_mmr_trades_relevance_for_diversity():
+    docs, query, vectors = _mmr_docs()
+
+    packed = ContextBuilder(max_chunks=2, mmr_lambda=0.3).build(docs, query_vector=query, document_vectors=vectors)
+
+    assert packed.texts == ["Revenue grew in the north.", "Costs fell in the south."]
+
+
+def test_mmr_lambda_one_is_pure_relevance():
+    docs, query, vectors = _mmr_docs()
+
+    packed = ContextBuilder(max_chunks=2, mmr_lambda=1.0).build(docs, query_vector=query, document_vectors=vectors)
+
+    assert packed.texts == ["Revenue grew in the north.", "Revenue rose in the north region."]
+
+
+def test_selection_is_emitted_in_document_order():
+    docs = [Chunk("later passage", {"chunk": 5}), Chunk("earlier passage", {"chunk": 1})]
+
+    packed = ContextBuilder().build(docs)
+
+    assert packed.texts == ["earlier passage", "later passage"]
+
+
+def test_similarity_cutoff_drops_unrelated_chunks_but_keeps_the_best():
+    docs = chunks("on topic", "off topic")
+    vectors = [[0.6, 0.8], [0.0, 1.0]]
+
+    packed = ContextBuilder(similarity_cutoff=0.5).build(docs, query_vector=[1.0, 0.0], document_vectors=vectors)
+    assert packed.texts == ["on topic"]
+    assert packed.dropped["cutoff"] == 1
+
+    strict = ContextBuilder(similarity_cutoff=0.99).build(docs, query_vector=[1.0, 0.0], document_vectors=vectors)
+    assert strict.texts == ["on topic"]
+
+
+def test_splitter_overlap_is_trimmed_from_the_later_chunk():
+    shared = "the overlapping sentence repeated by the splitter."
+    docs = chunks(f"Opening words. {shared}", f"{shared} Closing words.")
+
+    packed = ContextBuilder().build(docs)
+
+    assert packed.texts == [f"Opening words. {shared}", "Closing words."]
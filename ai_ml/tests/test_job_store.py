@@ -0,0 +1,143 @@
+"""JobStore claims, leases, requeueing, attempt limits and cancellation."""
+
+from __future__ import annotations
+
+import pytest
+
+from ai_ml.services.jobs import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    JobStore,
+    NoJobWorkersError,
+)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def store(clock: Clock) -> JobStore:
+    return JobStore(lease_seconds=10.0, max_attempts=2, clock=clock)
+
+
+def test_claim_takes_the_oldest_queued_job_of_its_type(store: JobStore, clock: Clock):
+    first = store.create("qa", {"question": "one"})
+    clock.now += 1
+    store.create("qa", {"question": "two"})
+    store.create("analyze", {"document": "d"})
+
+    job = store.claim("qa", "worker-a")
+
+    assert job.id == first.id and job.status == RUNNING
+    assert job.worker == "worker-a" and job.attempts == 1 and job.params == {"question": "one"}
+    assert job.lease_expires_at == clock.now + 10.0
+    assert store.claim("qa", "worker-b").params == {"question": "two"}
+    assert store.claim("qa", "worker-b") is None
+
+
+def test_finish_records_the_result_only_for_the_lease_holder(store: JobStore):
+    job = store.create("qa", {})
+    store.claim("qa", "worker-a")
+
+    assert store.finish(job.id, SUCCEEDED, worker="worker-b", result={"answer": 1}) is None
+    finished = store.finish(job.id, SUCCEEDED, worker="worker-a", result={"answer": 1})
+
+    assert finished.status == SUCCEEDED
+    assert store.get(job.id).to_dict(include_result=True)["result"] == {"answer": 1}
+
+
+def test_heartbeat_extends_the_lease(store: JobStore, clock: Clock):
+    job = store.create("qa", {})
+    store.claim("qa", "worker-a")
+
+    clock.now += 8
+    assert store.heartbeat("worker-a") == 1
+    clock.now += 8
+    assert store.requeue_expired() == (0, [])
+    assert store.get(job.id).lease_expires_at == clock.now - 8 + 10.0
+
+
+def test_expired_lease_is_requeued_and_the_old_worker_loses_it(store: JobStore, clock: Clock):
+    job = store.create("qa", {})
+    store.claim("qa", "worker-a")
+
+    clock.now += 11
+    assert store.requeue_expired() == (1, [])
+    requeued = store.get(job.id)
+    assert requeued.status == QUEUED and requeued.worker is None
+
+    assert store.claim("qa", "worker-b").attempts == 2
+    assert store.finish(job.id, SUCCEEDED, worker="worker-a", result="late") is None
+
+
+def test_job_fails_when_its_last_attempt_expires(store: JobStore, clock: Clock):
+    job = store.create("qa", {})
+    for _ in range(2):
+        store.claim("qa", "worker-a")
+        clock.now += 11
+        requeued, failed = store.requeue_expired()
+
+    assert requeued == 0
+    assert [failed_job.id for failed_job in failed] == [job.id]
+    assert failed[0].status == FAILED and "2 attempt(s)" in failed[0].error
+    assert store.claim("qa", "worker-a") is None
+
+
+def test_cancel_removes_a_queued_job(store: JobStore):
+    job = store.create("qa", {})
+
+    cancelled = store.cancel(job.id)
+
+    assert cancelled.status == CANCELLED and cancelled.cancel_requested
+    assert store.claim("qa", "worker-a") is None
+
+
+def test_cancelled_running_job_discards_its_outcome(store: JobStore):
+    job = store.create("qa", {})
+    store.claim("qa", "worker-a")
+
+    assert store.cancel(job.id).status == RUNNING
+    finished = store.finish(job.id, SUCCEEDED, worker="worker-a", result="ignored")
+
+    assert finished.status == CANCELLED and finished.error is None
+    assert store.get(job.id).to_dict(include_result=True).get("result") is None
+
+
+def test_cancel_of_an_unknown_job_returns_none(store: JobStore):
+    assert store.cancel("missing") is None
+
+
+def test_submit_needs_a_live_worker(store: JobStore, clock: Clock):
+    queue = JobQueue(store, default_concurrency=0)
+    queue.register("qa", lambda **params: params)
+
+    with pytest.raises(NoJobWorkersError):
+        queue.submit("qa", {})
+
+    store.heartbeat("worker-a")
+    assert queue.submit("qa", {}).status == QUEUED
+
+    clock.now += 11
+    with pytest.raises(NoJobWorkersError):
+        queue.submit("qa", {})
+
+
+def test_store_is_shared_through_the_database_file(tmp_path, clock: Clock):
+    path = str(tmp_path / "jobs.sqlite3")
+    job = JobStore(path, clock=clock).create("qa", {"question": "q"})
+
+    assert JobStore(path, clock=clock).claim("qa", "worker-a").id == job.id
@@ -0,0 +1,79 @@
+"""BM25 scoring and reciprocal rank fusion order."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from ai_ml.retrieval import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+
+
+def test_tokenize_keeps_identifiers_and_figures_whole():
+    assert tokenize("Ticket PRJ-4821 costs $420k, up 12.5% in v1.2") == [
+        "ticket",
+        "prj-4821",
+        "costs",
+        "$420k",
+        "up",
+        "12.5%",
+        "in",
+        "v1.2",
+    ]
+
+
+def test_bm25_ranks_exact_identifier_first():
+    index = BM25Index(
+        [
+            "Budget review notes for the quarter.",
+            "The budget for PRJ-4821 grew again.",
+            "Weather was mild all week.",
+        ]
+    )
+
+    assert [doc for doc, _ in index.search("PRJ-4821 budget", 3)] == [1, 0]
+
+
+def test_bm25_omits_texts_without_a_matching_term():
+    index = BM25Index(["alpha beta", "gamma delta"])
+
+    assert index.search("epsilon", 2) == []
+    assert index.scores("epsilon").tolist() == [0.0, 0.0]
+    assert [doc for doc, _ in index.search("gamma", 2)] == [1]
+
+
+def test_bm25_prefers_rare_terms_and_shorter_texts():
+    index = BM25Index(
+        [
+            "common common rare",
+            "common filler filler filler",
+            "common",
+        ]
+    )
+    scores = index.scores("rare common")
+
+    # The rare term outweighs the term every text shares.
+    assert scores[0] > scores[1] and scores[0] > scores[2]
+    # Same term frequency, so the shorter text wins on length normalisation.
+    assert scores[2] > scores[1]
+
+
+def test_bm25_search_handles_empty_index_and_zero_k():
+    assert BM25Index([]).search("anything", 3) == []
+    assert BM25Index(["alpha"]).search("alpha", 0) == []
+
+
+def test_rrf_orders_by_summed_reciprocal_rank():
+    # 1: 1/61 + 1/62, 3: 1/63 + 1/61, 2: 1/62, 4: 1/63
+    assert reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], rrf_k=60) == [1, 3, 2, 4]
+
+
+def test_rrf_favours_items_both_rankings_agree_on():
+    assert reciprocal_rank_fusion([[1, 2], [3, 2]], rrf_k=60) == [2, 1, 3]
+
+
+def test_rrf_ties_keep_first_seen_order():
+    assert reciprocal_rank_fusion([[1], [2]]) == [1, 2]
+    assert reciprocal_rank_fusion([[2], [1]]) == [2, 1]
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,110 @@
+"""SemanticQACache matching, TTL expiry and the cross-document sweep."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from ai_ml.cache.semantic_cache import SemanticQACache
+
+# Hand-picked embeddings: the two budget questions are near neighbours, the third is not.
+VECTORS: Dict[str, List[float]] = {
+    "what is the budget": [1.0, 0.0, 0.0],
+    "how large is the total budget": [0.96, 0.28, 0.0],
+    "who wrote it": [0.0, 0.0, 1.0],
+}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Embedder:
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def __call__(self, question: str) -> List[float]:
+        self.calls.append(question)
+        return VECTORS[question.lower().rstrip("?")]
+
+
+def make_cache(**kwargs) -> tuple:
+    clock = Clock()
+    return SemanticQACache(clock=clock, **kwargs), clock, Embedder()
+
+
+def test_exact_match_skips_embedding():
+    cache, _, embed = make_cache()
+    cache.store("doc", "What is the budget?", {"answer": "$1M"}, vector=VECTORS["what is the budget"])
+
+    result = cache.lookup("doc", "  what IS the   budget ", embed_query=embed)
+
+    assert result.hit and result.value == {"answer": "$1M"} and result.similarity == 1.0
+    assert embed.calls == []
+
+
+def test_paraphrase_hits_above_threshold_only():
+    cache, _, embed = make_cache(threshold=0.9)
+    cache.store("doc", "What is the budget?", "answer", vector=VECTORS["what is the budget"])
+
+    paraphrase = cache.lookup("doc", "How large is the total budget?", embed_query=embed)
+    unrelated = cache.lookup("doc", "Who wrote it?", embed_query=embed)
+
+    assert paraphrase.hit and paraphrase.question == "What is the budget?" and paraphrase.similarity == 0.96
+    assert not unrelated.hit and unrelated.vector == VECTORS["who wrote it"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_answers_are_scoped_to_their_document():
+    cache, _, embed = make_cache()
+    cache.store("doc a", "What is the budget?", "a", vector=VECTORS["what is the budget"])
+
+    assert not cache.lookup("doc b", "What is the budget?", embed_query=embed).hit
+
+
+def test_entries_expire_after_ttl():
+    cache, clock, embed = make_cache(ttl_seconds=100.0)
+    cache.store("doc", "What is the budget?", "answer", vector=VECTORS["what is the budget"])
+
+    clock.now += 100.0
+    assert cache.lookup("doc", "What is the budget?", embed_query=embed).hit
+
+    clock.now += 1.0
+    assert not cache.lookup("doc", "What is the budget?", embed_query=embed).hit
+    assert cache.stats()["entries"] == 0
+
+
+def test_store_sweeps_expired_entries_of_other_documents():
+    cache, clock, _ = make_cache(ttl_seconds=100.0)
+    cache.store("old doc", "What is the budget?", "old", vector=VECTORS["what is the budget"])
+    cache.store("other doc", "Who wrote it?", "other", vector=VECTORS["who wrote it"])
+
+    clock.now += 150.0
+    cache.store("new doc", "What is the budget?", "new", vector=VECTORS["what is the budget"])
+
+    assert cache.stats() == {"entries": 1, "documents": 1, "hits": 0, "misses": 0, "hit_rate": 0.0}
+
+
+def test_lookup_sweeps_other_documents_every_tenth_of_the_ttl():
+    cache, clock, embed = make_cache(ttl_seconds=100.0)
+    cache.store("old doc", "What is the budget?", "old", vector=VECTORS["what is the budget"])
+
+    clock.now += 101.0
+    cache.lookup("new doc", "Who wrote it?", embed_query=embed)
+
+    assert cache.stats()["documents"] == 0
+
+
+def test_lru_eviction_spans_documents():
+    cache, _, embed = make_cache(max_entries=2)
+    cache.store("doc a", "What is the budget?", "a", vector=VECTORS["what is the budget"])
+    cache.store("doc b", "What is the budget?", "b", vector=VECTORS["what is the budget"])
+    cache.lookup("doc a", "What is the budget?", embed_query=embed)  # doc a is now most recent
+    cache.store("doc c", "What is the budget?", "c", vector=VECTORS["what is the budget"])
+
+    assert cache.lookup("doc a", "What is the budget?", embed_query=embed).hit
+    assert not cache.lookup("doc b", "What is the budget?", embed_query=embed).hit
+    assert cache.stats()["entries"] == 2
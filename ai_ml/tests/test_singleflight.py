@@ -0,0 +1,102 @@
+"""SingleFlight coalescing: one computation per key, isolated results for followers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, List
+
+import pytest
+
+from ai_ml.core.singleflight import SingleFlight
+
+
+def run_with_followers(flight: SingleFlight, fn: Callable[[], Any], followers: int = 2) -> tuple:
+    """Run ``fn`` as leader while ``followers`` threads join the same key; returns (leader, followers)."""
+
+    release = threading.Event()
+    results: List[Any] = []
+    errors: List[BaseException] = []
+
+    def leader_fn() -> Any:
+        release.wait(5)
+        return fn()
+
+    def follow() -> None:
+        try:
+            results.append(flight.do("analyze", "doc", lambda: pytest.fail("follower ran the computation")))
+        except BaseException as exc:  # collected for the assertions
+            errors.append(exc)
+
+    outcome: dict = {}
+
+    def lead() -> None:
+        try:
+            outcome["value"] = flight.do("analyze", "doc", leader_fn)
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    threads = [threading.Thread(target=follow) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    call = flight._calls[("analyze", "doc")]
+    while call.followers < followers:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+    return outcome, results, errors
+
+
+def test_followers_share_one_computation():
+    flight = SingleFlight()
+    runs: List[int] = []
+
+    def compute() -> dict:
+        runs.append(1)
+        return {"summary": "s"}
+
+    outcome, results, errors = run_with_followers(flight, compute, followers=3)
+
+    assert runs == [1]
+    assert outcome["value"] == {"summary": "s"} and results == [{"summary": "s"}] * 3 and errors == []
+    assert flight.in_flight() == 0
+
+
+def test_followers_get_their_own_deep_copy():
+    flight = SingleFlight()
+    payload = {"topics": ["budget"], "nested": {"score": 1}}
+
+    outcome, results, _ = run_with_followers(flight, lambda: payload)
+    leader_result = outcome["value"]
+    leader_result["topics"].append("mutated by the leader's caller")
+    results[0]["nested"]["score"] = 99
+
+    assert leader_result is payload
+    assert results[0] is not payload and results[1] is not results[0]
+    assert results[1] == {"topics": ["budget"], "nested": {"score": 1}}
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    flight = SingleFlight()
+
+    def fail() -> None:
+        raise ValueError("provider down")
+
+    outcome, results, errors = run_with_followers(flight, fail)
+
+    assert isinstance(outcome["error"], ValueError)
+    assert results == [] and [str(error) for error in errors] == ["provider down"] * 2
+    assert flight.do("analyze", "doc", lambda: "fresh") == "fresh"
+
+
+def test_distinct_keys_run_independently():
+    flight = SingleFlight()
+
+    assert flight.do("analyze", "a", lambda: 1) == 1
+    assert flight.do("analyze", "b", lambda: 2) == 2
+    assert flight.do("qa", "a", lambda: 3) == 3
@@ -2,9 +2,11 @@
 
 from .document_tools import (
     ChunkConfig,
+    RetrievalConfig,
     build_vector_store,
     chunk_document,
     create_vector_retriever,
+    embed_chunks,
     DocumentSearchTool,
     InsightsExtractionTool,
 )
@@ -12,8 +14,10 @@ from .document_tools import (
 __all__ = [
     "build_vector_store",
     "create_vector_retriever",
+    "embed_chunks",
     "DocumentSearchTool",
     "InsightsExtractionTool",
     "chunk_document",
     "ChunkConfig",
+    "RetrievalConfig",
 ]
@@ -3,21 +3,21 @@
 from __future__ import annotations
 
 import json
+import logging
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
 
-from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.vectorstores import VectorStoreRetriever
-
-try:
-    from langchain_community.vectorstores import FAISS
-except ImportError:  # pragma: no cover - optional dependency
-    FAISS = None  # type: ignore
+from ai_ml.providers import get_embedding_model
+from ai_ml.providers.registry import MissingDependencyError
 
-from langchain.tools import Tool
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from langchain.schema import Document
+    from langchain.tools import Tool
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.retrievers import BaseRetriever
+    from langchain_core.vectorstores import VectorStoreRetriever
 
-from ai_ml.providers import get_embedding_model
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -26,9 +26,24 @@ class ChunkConfig:
     chunk_overlap: int = 80
 
 
+@dataclass
+class RetrievalConfig:
+    # mode is "hybrid" (dense + BM25 fused by RRF), "dense" or "bm25"; see ai_ml.retrieval.
+    mode: str = "hybrid"
+    top_k: int = 6
+    candidates: int = 20
+    rrf_k: int = 60
+    # Prompt context packing (ai_ml.retrieval.ContextBuilder): up to top_k chunks within the budget.
+    context_tokens: int = 1500
+    mmr_lambda: float = 0.7
+    similarity_cutoff: Optional[float] = None
+
+
 def chunk_document(text: str, *, config: ChunkConfig | None = None) -> List[Document]:
     """Split an arbitrary text document into LangChain ``Document`` chunks."""
 
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     cfg = config or ChunkConfig()
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=cfg.chunk_size,
@@ -43,14 +58,17 @@ def build_vector_store(
     embedding_provider: str = "huggingface",
     embedding_model: Optional[str] = None,
     config: ChunkConfig | None = None,
+    embeddings: Optional[Embeddings] = None,
 ) -> VectorStoreRetriever:
-    """Create an in-memory FAISS vector store retriever for a document."""
+    """Create an in-memory FAISS vector store retriever for a document.
 
-    if FAISS is None:
-        raise RuntimeError("langchain-community[faiss] is required to build FAISS retrievers.")
+    ``embeddings`` lets callers that own a registry pass their model instead of resolving
+    ``embedding_provider``/``embedding_model`` through the global registry.
+    """
 
+    FAISS = _load_faiss()
     documents = chunk_document(text, config=config)
-    embeddings = get_embedding_model(embedding_provider, model=embedding_model)
+    embeddings = embeddings or get_embedding_model(embedding_provider, model=embedding_model)
     store = FAISS.from_documents(documents, embeddings)
     return store.as_retriever(search_kwargs={"k": 6})
 
@@ -63,39 +81,71 @@ def create_vector_retriever(
 ) -> VectorStoreRetriever:
     """Expose a retriever for pre-chunked documents."""
 
-    if FAISS is None:
-        raise RuntimeError("langchain-community[faiss] is required to build FAISS retrievers.")
-
+    FAISS = _load_faiss()
     docs = list(documents)
     embeddings = get_embedding_model(embedding_provider, model=embedding_model)
     store = FAISS.from_documents(docs, embeddings)
     return store.as_retriever(search_kwargs={"k": 6})
 
 
+def embed_chunks(documents: Iterable[Document], *, embeddings: Embeddings) -> List[List[float]]:
+    """Embed chunk texts once so the vectors can be cached and reused across indexes."""
+
+    return embeddings.embed_documents([doc.page_content for doc in documents])
+
+
+def _load_faiss():
+    try:
+        from langchain_community.vectorstores import FAISS
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("langchain-community[faiss] is required to build FAISS retrievers.") from exc
+    return FAISS
+
+
 @dataclass
 class DocumentSearchTool:
-    """Simple semantic search tool that wraps a LangChain retriever."""
+    """Search tool that wraps a LangChain retriever (dense FAISS or hybrid BM25 + dense).
 
-    retriever: VectorStoreRetriever
+    With a ``reranker`` (:class:`ai_ml.retrieval.CrossEncoderReranker`), ``candidates``
+    chunks are retrieved and the ``top_n`` best by cross-encoder score are returned.
+    """
+
+    retriever: BaseRetriever
     name: str = "document_search"
     description: str = (
         "Semantic search over the currently loaded document. "
         "Use this to pull supporting quotes and context snippets."
     )
+    reranker: Any = None
+    candidates: int = 20
+    top_n: int = 6
 
     def __call__(self, query: str) -> str:
-        docs = self.retriever.get_relevant_documents(query)
+        hits = self._search(query)
         payload = [
             {
                 "source": doc.metadata.get("source", "document"),
                 "page": doc.metadata.get("page"),
                 "snippet": doc.page_content,
+                **({"score": round(score, 4)} if score is not None else {}),
             }
-            for doc in docs
+            for doc, score in hits
         ]
         return json.dumps(payload, ensure_ascii=True, indent=2)
 
+    def _search(self, query: str) -> List[Tuple[Document, Optional[float]]]:
+        if self.reranker is not None:
+            try:
+                pool = self.retriever.invoke(query, k=max(self.candidates, self.top_n))
+                return self.reranker.rerank(query, pool, top_n=self.top_n)
+            except MissingDependencyError as exc:
+                logger.warning("Reranking disabled for document search: %s", exc)
+                self.reranker = None
+        return [(doc, None) for doc in self.retriever.invoke(query)]
+
     def to_langchain_tool(self) -> Tool:
+        from langchain.tools import Tool
+
         return Tool(name=self.name, description=self.description, func=self.__call__)
 
 
@@ -115,4 +165,6 @@ class InsightsExtractionTool:
         return json.dumps(highlights, ensure_ascii=True, indent=2)
 
     def to_langchain_tool(self) -> Tool:
+        from langchain.tools import Tool
+
         return Tool(name=self.name, description=self.description, func=self.__call__)
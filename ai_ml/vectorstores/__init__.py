@@ -1,5 +1,19 @@
 """Vector store integrations for DocuThinker."""
 
-from .chroma_store import ChromaVectorClient, ChromaNotConfigured
+from .chroma_store import ChromaConfig, ChromaVectorClient, ChromaNotConfigured
+from .faiss_index import FAISS_INDEX_TYPES, FaissIndexConfig, build_faiss_store, empty_faiss_store, ensure_index
+from .quantization import STORAGE_DTYPES, RescoringIndex, VectorStorageConfig
 
-__all__ = ["ChromaVectorClient", "ChromaNotConfigured"]
+__all__ = [
+    "ChromaConfig",
+    "ChromaVectorClient",
+    "ChromaNotConfigured",
+    "FAISS_INDEX_TYPES",
+    "FaissIndexConfig",
+    "build_faiss_store",
+    "empty_faiss_store",
+    "ensure_index",
+    "RescoringIndex",
+    "STORAGE_DTYPES",
+    "VectorStorageConfig",
+]
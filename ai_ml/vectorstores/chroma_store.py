@@ -5,11 +5,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional
 
-try:
-    import chromadb
-except ImportError:  # pragma: no cover - optional dependency
-    chromadb = None  # type: ignore
-
 
 class ChromaNotConfigured(RuntimeError):
     """Raised when Chroma is not available or configured."""
@@ -25,10 +20,12 @@ class ChromaVectorClient:
     """Thin wrapper around a Chroma persistent collection."""
 
     def __init__(self, config: ChromaConfig) -> None:
-        if chromadb is None:
+        try:
+            import chromadb
+        except ImportError as exc:  # pragma: no cover - optional dependency
             raise ChromaNotConfigured(
                 "chromadb is not installed. Install the 'chromadb' package to enable persistent vector storage."
-            )
+            ) from exc
         if not config.persist_directory:
             raise ChromaNotConfigured("Chroma persist directory is not configured.")
         self._config = config
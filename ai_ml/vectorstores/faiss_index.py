@@ -0,0 +1,319 @@
+"""Configurable FAISS index types for the persistent LangChain FAISS store.
+
+LangChain's ``FAISS.from_texts`` always builds an exact ``IndexFlatL2``. Each query then
+scans every stored vector, and each document costs its full float32 vector in memory.
+That is the right choice for a small corpus but not for a growing one. This module builds
+the same LangChain store over one of:
+
+* ``flat``: exact search, the baseline;
+* ``ivf``: ``IVF<nlist>,Flat``. Vectors are bucketed by a k-means coarse quantizer and a
+  query scans ``nprobe`` buckets;
+* ``hnsw``: ``HNSW<m>``, a navigable small-world graph searched with ``efSearch``. It needs
+  no training but costs extra memory for graph links;
+* ``ivfpq``: ``IVF<nlist>,PQ<m>x<bits>``. It searches like IVF but stores each vector as
+  ``m`` bytes of product-quantization codes, so memory shrinks by ``4 * dim / m`` times.
+
+IVF variants are trained on a random sample of at most ``train_sample`` vectors. Below
+``min_vectors`` stored vectors exact search is already fast, so the store stays ``flat``
+until it grows past that point; :func:`ensure_index` then rebuilds it once. Search
+parameters (``nprobe``, ``efSearch``) are applied when a store is loaded, so they can be
+tuned without rebuilding.
+
+Any index type can also store compact vectors (float16 / int8, optionally PCA-reduced or
+truncated) with full-precision rescoring; see :mod:`ai_ml.vectorstores.quantization`.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence
+
+from ai_ml.vectorstores.quantization import RescoringIndex, VectorStorageConfig, reduce, storage_signature, unwrap
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+FAISS_INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+# k-means wants ~39 training points per centroid; fewer and faiss warns and clusters poorly.
+_POINTS_PER_CENTROID = 39
+
+
+@dataclass(frozen=True)
+class FaissIndexConfig:
+    """Index type plus the build and search knobs for each type."""
+
+    index_type: str = "flat"
+    # IVF lists; None picks ~4 * sqrt(n), capped so every centroid gets enough training points.
+    nlist: Optional[int] = None
+    nprobe: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+    # PQ sub-quantizers (bytes per vector at 8 bits); None picks the largest divisor of dim <= dim / 8.
+    pq_m: Optional[int] = None
+    pq_bits: int = 8
+    train_sample: int = 50_000
+    min_vectors: int = 10_000
+    seed: int = 0
+    storage: VectorStorageConfig = field(default_factory=VectorStorageConfig)
+
+    def __post_init__(self) -> None:
+        if self.index_type not in FAISS_INDEX_TYPES:
+            raise ValueError(f"Unsupported FAISS index type '{self.index_type}'; expected one of {FAISS_INDEX_TYPES}.")
+
+    @classmethod
+    def from_settings(cls, settings: Any, *, rescore_dir: Optional[str] = None) -> "FaissIndexConfig":
+        return cls(
+            index_type=settings.faiss_index_type,
+            nlist=settings.faiss_nlist,
+            nprobe=settings.faiss_nprobe,
+            hnsw_m=settings.faiss_hnsw_m,
+            ef_search=settings.faiss_ef_search,
+            pq_m=settings.faiss_pq_m,
+            train_sample=settings.faiss_train_sample,
+            min_vectors=settings.faiss_min_vectors,
+            storage=VectorStorageConfig(
+                dtype=settings.faiss_storage,
+                dimensions=settings.faiss_dimensions,
+                reduction=settings.faiss_reduction,
+                rescore_factor=settings.faiss_rescore_factor,
+                rescore_dir=rescore_dir,
+            ),
+        )
+
+    def for_count(self, count: int) -> "FaissIndexConfig":
+        """The config to build ``count`` vectors with: exact float32 ``flat`` until ``min_vectors``.
+
+        Small stores gain nothing from approximation, and IVF centroids, scalar-quantizer
+        ranges and PCA all need a reasonable training sample.
+        """
+
+        if count >= self.min_vectors:
+            return self
+        return replace(self, index_type="flat", storage=VectorStorageConfig())
+
+    def factory_string(self, dim: int, count: int, *, index_type: Optional[str] = None) -> str:
+        """FAISS factory string over ``dim`` (already reduced) dimensions, with compact codes if configured."""
+
+        kind = index_type or self.index_type
+        codes = self.storage.codes()
+        if kind == "flat":
+            return codes or "Flat"
+        if kind == "hnsw":
+            return f"HNSW{self.hnsw_m}_{codes}" if codes else f"HNSW{self.hnsw_m}"
+        nlist = self.nlist or _default_nlist(count)
+        if kind == "ivf":
+            return f"IVF{nlist},{codes or 'Flat'}"
+        return f"IVF{nlist},PQ{self._pq_m(dim)}x{self.pq_bits}"
+
+    def target_signature(self, dim: int, count: int) -> tuple:
+        """``(type, dtype, stored dimensions, rescored)`` an index of ``count`` vectors should have."""
+
+        cfg = self.for_count(count)
+        dtype = "pq" if cfg.index_type == "ivfpq" else cfg.storage.dtype
+        return cfg.index_type, dtype, cfg.storage.reduced_dim(dim), cfg.rescored
+
+    @property
+    def rescored(self) -> bool:
+        """Whether hits are rescored at full precision: compact storage, or PQ codes."""
+
+        lossy = self.storage.compact or self.index_type == "ivfpq"
+        return lossy and self.storage.rescore_factor > 0
+
+    def _pq_m(self, dim: int) -> int:
+        if self.pq_m is not None:
+            if dim % self.pq_m:
+                raise ValueError(f"pq_m={self.pq_m} must divide the embedding dimension {dim}.")
+            return self.pq_m
+        return max(m for m in range(1, max(1, dim // 8) + 1) if dim % m == 0)
+
+
+def _default_nlist(count: int) -> int:
+    return max(1, min(int(4 * math.sqrt(max(count, 1))), count // _POINTS_PER_CENTROID or 1))
+
+
+# ----------------------------------------------------------------------
+# Raw FAISS indexes
+
+
+def build_index(vectors: "np.ndarray", config: FaissIndexConfig, *, index_type: Optional[str] = None) -> Any:
+    """Create an empty index of ``index_type`` (default ``config.index_type``), trained on a sample of ``vectors``."""
+
+    import numpy as np
+
+    data = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = data.shape
+    kind = index_type or config.index_type
+    storage = config.storage
+    index = reduce(config.factory_string(storage.reduced_dim(dim), count, index_type=kind), dim, storage)
+    base = unwrap(index)
+    if kind == "hnsw":
+        base.hnsw.efConstruction = config.ef_construction
+    if kind == "ivfpq":
+        # Polysemous codes are never used at search time but multiply PQ training time many-fold.
+        base.do_polysemous_training = False
+    if replace(config, index_type=kind).rescored:
+        index = RescoringIndex(index, dim=dim, rescore_factor=storage.rescore_factor, rescore_dir=storage.rescore_dir)
+    if not index.is_trained:
+        rng = np.random.default_rng(config.seed)
+        sample = data if count <= config.train_sample else data[rng.choice(count, config.train_sample, replace=False)]
+        index.train(sample)
+    apply_search_params(index, config)
+    return index
+
+
+def apply_search_params(index: Any, config: FaissIndexConfig) -> None:
+    """Set ``nprobe`` / ``efSearch`` and the rescoring depth on ``index`` (no-op for plain flat indexes)."""
+
+    kind = index_kind(index)
+    base = unwrap(index)
+    if isinstance(index, RescoringIndex) and config.storage.rescore_factor > 0:
+        index.rescore_factor = config.storage.rescore_factor
+    if kind in {"ivf", "ivfpq"}:
+        base.nprobe = config.nprobe
+    elif kind == "hnsw":
+        base.hnsw.efSearch = config.ef_search
+
+
+def index_kind(index: Any) -> str:
+    import faiss
+
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def index_stats(index: Any) -> Dict[str, Any]:
+    """Type, storage, vector count and in-memory size, for logs and benchmarks.
+
+    ``bytes`` is the serialized size of what stays in memory: for a rescoring index with
+    on-disk full-precision vectors that is only the compact index.
+    """
+
+    import faiss
+
+    dtype, dims, rescored = storage_signature(index)
+    compact = index.compact if isinstance(index, RescoringIndex) else index
+    size = int(faiss.serialize_index(compact).size)
+    if isinstance(index, RescoringIndex) and index.path is None:
+        size += int(index.reconstruct_n(0, index.ntotal).nbytes)
+    return {
+        "type": index_kind(index),
+        "dtype": dtype,
+        "dimensions": dims,
+        "rescored": rescored,
+        "ntotal": int(index.ntotal),
+        "bytes": size,
+    }
+
+
+# ----------------------------------------------------------------------
+# LangChain stores
+
+
+def build_faiss_store(
+    texts: Sequence[str],
+    vectors: Sequence[Sequence[float]],
+    *,
+    embeddings: Embeddings,
+    metadatas: Optional[Iterable[Dict[str, Any]]] = None,
+    config: Optional[FaissIndexConfig] = None,
+) -> FAISS:
+    """LangChain ``FAISS`` store over pre-computed ``vectors`` using the index type for their count."""
+
+    import numpy as np
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    data = np.asarray(vectors, dtype=np.float32)
+    if data.ndim != 2 or not len(data):
+        raise ValueError("build_faiss_store needs at least one vector; use empty_faiss_store for an empty store.")
+    index = build_index(data, (config or FaissIndexConfig()).for_count(len(data)))
+    store = FAISS(embedding_function=embeddings, index=index, docstore=InMemoryDocstore(), index_to_docstore_id={})
+    store.add_embeddings(list(zip(texts, data.tolist())), metadatas=list(metadatas) if metadatas is not None else None)
+    return store
+
+
+def empty_faiss_store(embeddings: Embeddings) -> FAISS:
+    """An empty exact store; its dimension is probed from ``embeddings``."""
+
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    dim = len(embeddings.embed_query("dimension probe"))
+    return FAISS(embedding_function=embeddings, index=faiss.IndexFlatL2(dim), docstore=InMemoryDocstore(), index_to_docstore_id={})
+
+
+def ensure_index(store: FAISS, config: FaissIndexConfig, *, embeddings: Optional[Embeddings] = None) -> FAISS:
+    """Return ``store`` with the index type ``config`` calls for at its current size.
+
+    Rebuilds (and trains) only when the type or vector storage changes, typically the
+    one-off switch from ``flat`` once ``min_vectors`` is reached; otherwise only search
+    parameters are applied.
+    """
+
+    target = config.target_signature(int(store.index.d), int(store.index.ntotal))
+    if (index_kind(store.index), *storage_signature(store.index)) == target:
+        apply_search_params(store.index, config)
+        return store
+    rebuilt = rebuild_store(store, config, embeddings=embeddings)
+    logger.info("Rebuilt FAISS store as %s: %s", target[0], index_stats(rebuilt.index))
+    return rebuilt
+
+
+def rebuild_store(store: FAISS, config: FaissIndexConfig, *, embeddings: Optional[Embeddings] = None) -> FAISS:
+    """Rebuild ``store`` with ``config``, reusing stored vectors when the index holds them exactly."""
+
+    ids = [store.index_to_docstore_id[position] for position in range(int(store.index.ntotal))]
+    docs = [store.docstore.search(doc_id) for doc_id in ids]
+    texts = [doc.page_content for doc in docs]
+    embedder = embeddings or store.embeddings
+    vectors = _stored_vectors(store.index)
+    if vectors is None:
+        if embedder is None:
+            raise ValueError("The stored index is lossy; pass embeddings to re-embed its documents.")
+        vectors = embedder.embed_documents(texts)
+    return build_faiss_store(texts, vectors, embeddings=embedder, metadatas=[doc.metadata for doc in docs], config=config)
+
+
+def _stored_vectors(index: Any) -> Optional[List[List[float]]]:
+    import faiss
+
+    if not index.ntotal:
+        return None
+    if isinstance(index, RescoringIndex):
+        return index.reconstruct_n(0, index.ntotal).tolist()
+    dtype, dims, _ = storage_signature(index)
+    if dtype != "float32" or dims != index.d:
+        # PQ / scalar codes and reduced dimensions only approximate the originals; re-embed instead.
+        return None
+    if index_kind(index) == "ivf":
+        faiss.extract_index_ivf(index).make_direct_map()
+    return index.reconstruct_n(0, index.ntotal).tolist()
+
+
+__all__ = [
+    "FAISS_INDEX_TYPES",
+    "FaissIndexConfig",
+    "apply_search_params",
+    "build_faiss_store",
+    "build_index",
+    "empty_faiss_store",
+    "ensure_index",
+    "index_kind",
+    "index_stats",
+    "rebuild_store",
+]
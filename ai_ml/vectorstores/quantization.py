@@ -0,0 +1,252 @@
+"""Compact vector storage: float16 / int8 codes, optional dimension reduction, full-precision rescoring.
+
+A float32 index keeps ``4 * dim`` bytes per vector in memory and scores every query
+against all of them. :class:`VectorStorageConfig` describes a compact alternative for
+the FAISS indexes built by :mod:`ai_ml.vectorstores.faiss_index`:
+
+* ``dtype``: ``float16`` (2 bytes per dimension) or scalar-quantized ``int8`` (1 byte per
+  dimension, per-dimension ranges learned from a training sample). FAISS scores these codes
+  directly with SIMD kernels, so brute-force scoring also gets faster as vectors shrink;
+* ``dimensions`` with ``reduction``: ``pca`` projects onto the top principal components
+  (learned from the same sample), while ``truncate`` keeps the leading dimensions, which
+  suits Matryoshka-style embedding models trained so that prefixes remain useful;
+* ``rescore_factor``: the compact index fetches ``k * rescore_factor`` candidates, and
+  :class:`RescoringIndex` rescores them against the original float32 vectors. Those vectors
+  live in an append-only file on disk (``rescore_dir``) and are memory-mapped, so only the
+  rows being rescored are read and the resident set holds just the compact codes.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+REDUCTIONS = ("pca", "truncate")
+
+# FAISS index_factory suffixes for each compact dtype.
+_SQ_CODES = {"float16": "SQfp16", "int8": "SQ8"}
+
+# Suffix of the on-disk full-precision vector files written by RescoringIndex.
+FULL_VECTORS_SUFFIX = ".f32"
+
+
+@dataclass(frozen=True)
+class VectorStorageConfig:
+    """How vectors are stored in memory and whether top candidates are rescored."""
+
+    dtype: str = "float32"
+    dimensions: Optional[int] = None
+    reduction: str = "pca"
+    rescore_factor: int = 4
+    # Directory for full-precision vectors used by rescoring; None keeps them in memory.
+    rescore_dir: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported vector storage dtype '{self.dtype}'; expected one of {STORAGE_DTYPES}.")
+        if self.reduction not in REDUCTIONS:
+            raise ValueError(f"Unsupported dimension reduction '{self.reduction}'; expected one of {REDUCTIONS}.")
+
+    @property
+    def compact(self) -> bool:
+        return self.dtype != "float32" or self.dimensions is not None
+
+    def codes(self) -> Optional[str]:
+        """FAISS factory code for the dtype (``SQ8`` / ``SQfp16``), or None for float32."""
+
+        return _SQ_CODES.get(self.dtype)
+
+    def reduced_dim(self, dim: int) -> int:
+        if self.dimensions is None or self.dimensions >= dim:
+            return dim
+        return self.dimensions
+
+
+def reduce(index_factory: str, dim: int, config: VectorStorageConfig) -> Any:
+    """Build ``index_factory`` over ``config.reduced_dim(dim)`` dimensions, behind a PCA or truncation transform."""
+
+    import faiss
+
+    target = config.reduced_dim(dim)
+    if target == dim:
+        return faiss.index_factory(dim, index_factory)
+    if config.reduction == "pca":
+        return faiss.index_factory(dim, f"PCA{target},{index_factory}")
+    # Uniform=False keeps the leading ``target`` dimensions.
+    remap = faiss.RemapDimensionsTransform(dim, target, False)
+    return faiss.IndexPreTransform(remap, faiss.index_factory(target, index_factory))
+
+
+def unwrap(index: Any) -> Any:
+    """The innermost search index, below rescoring and dimension-reduction wrappers."""
+
+    import faiss
+
+    if isinstance(index, RescoringIndex):
+        index = index.compact
+    if isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def storage_signature(index: Any) -> Tuple[str, int, bool]:
+    """``(dtype, stored dimensions, rescored)`` of a built index; ``dtype`` is ``pq`` for PQ codes."""
+
+    import faiss
+
+    base = unwrap(index)
+    storage = faiss.downcast_index(base.storage) if isinstance(base, faiss.IndexHNSW) else base
+    dtype = "float32"
+    if isinstance(storage, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        dtype = {faiss.ScalarQuantizer.QT_fp16: "float16", faiss.ScalarQuantizer.QT_8bit: "int8"}.get(storage.sq.qtype, "sq")
+    elif isinstance(storage, faiss.IndexIVFPQ):
+        dtype = "pq"
+    return dtype, int(base.d), isinstance(index, RescoringIndex)
+
+
+# ----------------------------------------------------------------------
+# Full-precision rescoring
+
+
+class RescoringIndex:
+    """A compact FAISS index whose top ``k * rescore_factor`` hits are rescored at float32.
+
+    It implements the subset of the FAISS index interface LangChain's ``FAISS`` store uses
+    (``d``, ``ntotal``, ``is_trained``, ``add``, ``search``, ``reconstruct``), so it can back a
+    store directly. Distances are squared L2, like ``IndexFlatL2``.
+    """
+
+    def __init__(self, compact: Any, *, dim: int, rescore_factor: int = 4, rescore_dir: Optional[str] = None) -> None:
+        self.compact = compact
+        self.d = dim
+        self.rescore_factor = rescore_factor
+        self._path: Optional[str] = None
+        self._memory: Any = None
+        self._mapped: Any = None
+        if rescore_dir:
+            os.makedirs(rescore_dir, exist_ok=True)
+            self._path = os.path.join(rescore_dir, f"vectors-{uuid.uuid4().hex}{FULL_VECTORS_SUFFIX}")
+            open(self._path, "wb").close()
+
+    @property
+    def ntotal(self) -> int:
+        return int(self.compact.ntotal)
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.compact.is_trained)
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def train(self, vectors: "np.ndarray") -> None:
+        self.compact.train(vectors)
+
+    def add(self, vectors: "np.ndarray") -> None:
+        import numpy as np
+
+        data = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.compact.add(data)
+        if self._path is not None:
+            with open(self._path, "ab") as handle:
+                handle.write(data.tobytes())
+            self._mapped = None
+        else:
+            self._memory = data.copy() if self._memory is None else np.vstack([self._memory, data])
+
+    def search(self, queries: "np.ndarray", k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        fetch = min(self.ntotal, max(k, k * self.rescore_factor))
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+        if not fetch:
+            return distances, labels
+        _, candidates = self.compact.search(queries, fetch)
+        full = self._vectors()
+        for row, (query, ids) in enumerate(zip(queries, candidates)):
+            ids = ids[ids >= 0]
+            exact = ((full[ids] - query) ** 2).sum(axis=1)
+            best = np.argsort(exact)[:k]
+            distances[row, : len(best)] = exact[best]
+            labels[row, : len(best)] = ids[best]
+        return distances, labels
+
+    def reconstruct(self, key: int) -> "np.ndarray":
+        return self._vectors()[key].copy()
+
+    def reconstruct_n(self, start: int, count: int) -> "np.ndarray":
+        import numpy as np
+
+        return np.array(self._vectors()[start : start + count])
+
+    def remove_ids(self, ids: Any) -> int:
+        raise NotImplementedError("RescoringIndex is append-only; rebuild the store to delete vectors.")
+
+    def _vectors(self) -> Any:
+        import numpy as np
+
+        if self._path is None:
+            return self._memory if self._memory is not None else np.zeros((0, self.d), dtype=np.float32)
+        if not self.ntotal:
+            return np.zeros((0, self.d), dtype=np.float32)
+        if self._mapped is None or len(self._mapped) != self.ntotal:
+            self._mapped = np.memmap(self._path, dtype=np.float32, mode="r", shape=(self.ntotal, self.d))
+        return self._mapped
+
+    # Pickling keeps the compact codes and the path of the on-disk vectors, not the vectors themselves.
+    def __getstate__(self) -> dict:
+        import faiss
+
+        return {
+            "compact": faiss.serialize_index(self.compact),
+            "d": self.d,
+            "rescore_factor": self.rescore_factor,
+            "path": self._path,
+            "memory": self._memory if self._path is None else None,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        import faiss
+
+        self.compact = faiss.deserialize_index(state["compact"])
+        self.d = state["d"]
+        self.rescore_factor = state["rescore_factor"]
+        self._path = state["path"]
+        self._memory = state["memory"]
+        self._mapped = None
+
+
+def prune_full_vectors(rescore_dir: str, *, keep: Optional[str]) -> int:
+    """Delete full-precision vector files in ``rescore_dir`` other than ``keep``; returns the count removed."""
+
+    removed = 0
+    if not rescore_dir or not os.path.isdir(rescore_dir):
+        return removed
+    for name in os.listdir(rescore_dir):
+        path = os.path.join(rescore_dir, name)
+        if name.endswith(FULL_VECTORS_SUFFIX) and (keep is None or os.path.abspath(path) != os.path.abspath(keep)):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+__all__ = [
+    "FULL_VECTORS_SUFFIX",
+    "REDUCTIONS",
+    "RescoringIndex",
+    "STORAGE_DTYPES",
+    "VectorStorageConfig",
+    "prune_full_vectors",
+    "reduce",
+    "storage_signature",
+    "unwrap",
+]
@@ -0,0 +1,138 @@
+"""Prewarm DocuThinker's models so a fresh worker serves its first request at full speed.
+
+Run ``python -m ai_ml.warmup`` while building an image or before a worker starts taking
+traffic, or rely on the FastAPI startup hook which calls :func:`start_background_warmup`
+and reports progress through ``/ready``.
+
+The process is only marked ready when every step in :data:`REQUIRED_STEPS` succeeded;
+otherwise it is marked failed and ``/ready`` keeps answering 503 with the failing steps.
+LLM and translator steps are reported but do not gate readiness, since a provider outage
+is handled by fallbacks and circuit breakers at request time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ai_ml.services import DocumentIntelligenceService, get_document_service
+
+logger = logging.getLogger(__name__)
+
+# Steps without which the worker cannot serve any request; "reranker" only runs when configured.
+REQUIRED_STEPS = ("pipeline_graph", "embeddings", "vector_store", "reranker")
+
+
+class WarmupState:
+    """Thread-safe record of warmup progress used by readiness probes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.status = "pending"
+        self.report: Dict[str, Any] = {}
+        self.failed_steps: List[str] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = "running"
+            self.started_at = time.time()
+
+    def mark_ready(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self.status = "ready"
+            self.report = report
+            self.failed_steps = []
+            self.finished_at = time.time()
+
+    def mark_failed(self, report: Dict[str, Any], failed_steps: List[str]) -> None:
+        with self._lock:
+            self.status = "failed"
+            self.report = report
+            self.failed_steps = list(failed_steps)
+            self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = None
+            if self.started_at is not None:
+                elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+            snapshot = {"status": self.status, "elapsed_seconds": elapsed, "steps": dict(self.report)}
+            if self.failed_steps:
+                snapshot["failed_steps"] = list(self.failed_steps)
+            return snapshot
+
+
+_STATE = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """Return the process-wide warmup state."""
+
+    return _STATE
+
+
+def run_warmup(
+    service: Optional[DocumentIntelligenceService] = None,
+    *,
+    languages: Optional[List[str]] = None,
+    ping_llms: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Warm the shared service synchronously; mark the process ready only if required steps succeeded."""
+
+    state = get_warmup_state()
+    state.mark_running()
+    report: Dict[str, Any] = {}
+    try:
+        report = (service or get_document_service()).warmup(languages=languages, ping_llms=ping_llms)
+    except Exception as exc:  # pragma: no cover - runtime safety
+        logger.exception("Warmup aborted: %s", exc)
+        report = {"service": {"status": "error", "error": str(exc)}}
+    failed = [name for name, step in report.items() if step.get("status") != "ok"]
+    blocking = [name for name in failed if name == "service" or name in REQUIRED_STEPS]
+    if blocking:
+        logger.error("Warmup failed on required steps %s; the process will not report ready", blocking)
+        state.mark_failed(report, blocking)
+    else:
+        state.mark_ready(report)
+    logger.info("Warmup finished (%d steps, %d failed)", len(report), len(failed))
+    return report
+
+
+def start_background_warmup(service: Optional[DocumentIntelligenceService] = None) -> threading.Thread:
+    """Run :func:`run_warmup` on a daemon thread so the server can bind its port immediately."""
+
+    thread = threading.Thread(target=run_warmup, kwargs={"service": service}, name="docuthinker-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Prewarm DocuThinker models, tokenizers and provider clients")
+    parser.add_argument("--languages", help="Comma-separated translation languages to load (default: all configured)")
+    parser.add_argument("--ping-llms", action="store_true", default=None, help="Send one tiny prompt to every LLM role")
+    parser.add_argument("--no-ping-llms", dest="ping_llms", action="store_false", help="Only build the LLM clients")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if any warmup step fails")
+    args = parser.parse_args(argv)
+
+    languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()] if args.languages else None
+    report = run_warmup(languages=languages, ping_llms=args.ping_llms)
+    print(json.dumps(report, ensure_ascii=True, indent=2))
+    if args.strict and any(step.get("status") != "ok" for step in report.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual launch helper
+    sys.exit(main())